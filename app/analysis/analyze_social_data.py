@@ -1,35 +1,205 @@
+import hashlib
+import html
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 # Chemin du fichier des données sociales
 INPUT_CSV_PATH = "data/reddit_data.csv"
 OUTPUT_CSV_PATH = "data/reddit_data_analyzed.csv"
+NEWS_OUTPUT_CSV_PATH = "data/news_analyzed.csv"
+# Cache persistant des scores, indexé par l'empreinte du texte
+SENTIMENT_CACHE_PATH = "data/sentiment_cache.sqlite"
+
+# Colonnes identifiant une ligne (post, article), par ordre de préférence ; l'empreinte du texte
+# ne sert que de clé du cache des scores : deux posts au texte identique restent deux événements
+ROW_ID_COLUMNS = ["item_id", "url", "link"]
+
+PARALLEL_MIN_TEXTS = 2000  # En dessous, le coût de démarrage des processus dépasse le gain
+CHUNK_SIZE = 500
+
+_analyzer = None
+
+
+def text_hash(text):
+    """Empreinte SHA-1 d'un texte (espaces de début et de fin ignorés)."""
+    return hashlib.sha1(str(text).strip().encode("utf-8")).hexdigest()
+
+
+def row_ids(data, text_column):
+    """
+    Identifiant de chaque ligne : première valeur non vide des colonnes ROW_ID_COLUMNS présentes,
+    à défaut l'empreinte du texte.
+    """
+    columns = [column for column in ROW_ID_COLUMNS if column in data.columns]
+    ids = []
+    rows = data[columns].to_numpy(dtype=object) if columns else [()] * len(data)
+    for values, text in zip(rows, data[text_column].fillna("")):
+        ids.append(next((f"{column}:{value}" for column, value in zip(columns, values)
+                         if not pd.isna(value) and str(value) != ""), f"text:{text_hash(text)}"))
+    return pd.Series(ids, index=data.index, dtype=object)
+
+
+def clean_text(text):
+    """Retire les balises HTML et les entités des descriptions d'actualités."""
+    if not isinstance(text, str):
+        return ""
+    return re.sub(r"\s+", " ", html.unescape(re.sub(r"<[^>]+>", " ", text))).strip()
+
+
+def _score_chunk(texts):
+    """Scores 'compound' VADER d'une liste de textes (exécuté dans un processus du pool)."""
+    global _analyzer
+    if _analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return [_analyzer.polarity_scores(text)["compound"] for text in texts]
+
+
+class SentimentCache:
+    """
+    Cache SQLite des scores de sentiment, indexé par l'empreinte du texte :
+    un texte déjà analysé (même titre republié, relance du script) n'est jamais réévalué.
+    """
+
+    def __init__(self, path=SENTIMENT_CACHE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS scores (hash TEXT PRIMARY KEY, compound REAL NOT NULL)")
+
+    def get_many(self, hashes):
+        """:return: Dictionnaire {empreinte: score} des empreintes présentes dans le cache."""
+        found = {}
+        hashes = list(hashes)
+        for start in range(0, len(hashes), CHUNK_SIZE):
+            chunk = hashes[start:start + CHUNK_SIZE]
+            rows = self.connection.execute(
+                f"SELECT hash, compound FROM scores WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        return found
+
+    def put_many(self, scores):
+        """Enregistre un dictionnaire {empreinte: score}."""
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?)", scores.items())
 
-def analyze_social_data():
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+def score_texts(texts, cache=None, workers=None):
+    """
+    Scores de sentiment (VADER 'compound') d'une liste de textes.
+    Les doublons ne sont évalués qu'une fois, les textes déjà en cache ne sont pas réévalués,
+    et les nouveaux textes sont répartis sur un pool de processus s'ils sont nombreux.
+    :param cache: SentimentCache à utiliser (None : pas de cache persistant).
+    :param workers: Nombre de processus (None : nombre de cœurs).
+    :return: Tableau des scores, dans l'ordre des textes.
+    """
+    texts = ["" if text is None or (isinstance(text, float) and np.isnan(text)) else str(text) for text in texts]
+    hashes = [text_hash(text) for text in texts]
+    unique = dict(zip(hashes, texts))  # Une entrée par texte distinct
+
+    scores = cache.get_many(unique) if cache is not None else {}
+    missing = [h for h in unique if h not in scores]
+    if missing:
+        missing_texts = [unique[h] for h in missing]
+        if len(missing_texts) >= PARALLEL_MIN_TEXTS and workers != 1:
+            chunks = [missing_texts[i:i + CHUNK_SIZE] for i in range(0, len(missing_texts), CHUNK_SIZE)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                new_scores = [score for chunk in executor.map(_score_chunk, chunks) for score in chunk]
+        else:
+            new_scores = _score_chunk(missing_texts)
+        computed = dict(zip(missing, new_scores))
+        if cache is not None:
+            cache.put_many(computed)
+        scores.update(computed)
+
+    print(f"Sentiment : {len(texts)} textes, {len(unique)} distincts, {len(missing)} nouveaux évalués.")
+    return np.array([scores[h] for h in hashes], dtype=np.float64)
+
+
+def _append_new_rows(data, text_column, output_path, cache_path, workers):
+    """Évalue les lignes absentes du fichier de sortie et les y ajoute. :return: lignes ajoutées."""
+    data = data.assign(text_hash=[text_hash(text) for text in data[text_column].fillna("")],
+                       row_id=row_ids(data, text_column))
+    data = data.drop_duplicates("row_id")
+
+    exists = os.path.exists(output_path)
+    if exists:
+        header = pd.read_csv(output_path, nrows=0).columns
+        if "row_id" not in header:
+            # Fichier d'un ancien format : ajout unique des colonnes d'empreinte et d'identifiant
+            previous = pd.read_csv(output_path)
+            previous["text_hash"] = [text_hash(text) for text in previous[text_column].fillna("")]
+            previous["row_id"] = row_ids(previous, text_column)
+            previous.to_csv(output_path, index=False)
+            header = previous.columns
+        done = set(pd.read_csv(output_path, usecols=["row_id"])["row_id"])
+        data = data[~data["row_id"].isin(done)]
+    if data.empty:
+        print(f"Aucune nouvelle ligne à analyser pour {output_path}.")
+        return data
+
+    cache = SentimentCache(cache_path)
+    try:
+        data = data.assign(sentiment_score=score_texts(data[text_column].tolist(), cache, workers))
+    finally:
+        cache.close()
+
+    # Ajout incrémental : les lignes déjà analysées ne sont pas réécrites
+    if exists:
+        data.reindex(columns=header).to_csv(output_path, mode="a", header=False, index=False)
+    else:
+        data.to_csv(output_path, index=False)
+    print(f"{len(data)} lignes ajoutées à {output_path}.")
+    return data
+
+
+def analyze_social_data(input_path=INPUT_CSV_PATH, output_path=OUTPUT_CSV_PATH, text_column="title",
+                        cache_path=SENTIMENT_CACHE_PATH, workers=None):
+    """
+    Ajoute le score de sentiment des nouvelles discussions Reddit au fichier enrichi.
+    :return: DataFrame des lignes ajoutées, ou None si le fichier d'entrée est introuvable.
+    """
     print("Chargement des données sociales...")
     try:
-        data = pd.read_csv(INPUT_CSV_PATH)
+        data = pd.read_csv(input_path)
     except FileNotFoundError:
-        print(f"Erreur : Le fichier {INPUT_CSV_PATH} est introuvable.")
+        print(f"Erreur : Le fichier {input_path} est introuvable.")
         return
 
     print("Données chargées. Analyse de sentiment en cours...")
-    
-    # Initialiser l'analyseur de sentiment
-    analyzer = SentimentIntensityAnalyzer()
-    
-    # Ajouter une colonne de sentiment
-    sentiments = []
-    for title in data['title']:
-        sentiment_score = analyzer.polarity_scores(title)
-        sentiments.append(sentiment_score['compound'])  # Utiliser le score 'compound'
-    
-    data['sentiment_score'] = sentiments
-
-    # Sauvegarder les données enrichies
-    print("Sauvegarde des données enrichies...")
-    data.to_csv(OUTPUT_CSV_PATH, index=False)
-    print(f"Données enrichies sauvegardées dans {OUTPUT_CSV_PATH}.")
+    return _append_new_rows(data, text_column, output_path, cache_path, workers)
+
+
+def analyze_news(news_items, output_path=NEWS_OUTPUT_CSV_PATH, cache_path=SENTIMENT_CACHE_PATH, workers=None):
+    """
+    Score de sentiment des actualités (titre + description), telles que retournées par
+    ingest_feed (ingestion.py) ou fetch_rss_feed (fetch_coinmarketcap_news.py).
+    :param news_items: Liste de dictionnaires avec au moins 'title' et 'description'.
+    :return: DataFrame des actualités ajoutées (avec 'sentiment_score').
+    """
+    data = pd.DataFrame(news_items)
+    if data.empty:
+        return data
+    if "description" not in data.columns:
+        data["description"] = ""
+    data["text"] = [
+        ". ".join(part for part in (clean_text(title), clean_text(description)) if part)
+        for title, description in zip(data["title"], data["description"])
+    ]
+    return _append_new_rows(data, "text", output_path, cache_path, workers)
+
 
 if __name__ == "__main__":
-    analyze_social_data()
\ No newline at end of file
+    analyze_social_data()
@@ -0,0 +1,175 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+
+def load_price_matrix(source):
+    """
+    Retourne un tableau 2-D (n_symbols, n_bars) à partir d'un tableau, d'une liste ou d'un fichier .npy.
+    Les fichiers .npy sont ouverts en mémoire mappée (aucune lecture complète).
+    """
+    if isinstance(source, str):
+        source = np.load(source, mmap_mode="r")
+    array = np.asarray(source)
+    return array.reshape(1, -1) if array.ndim == 1 else array
+
+
+def _as_float(prices):
+    return np.asarray(load_price_matrix(prices), dtype=np.float64)
+
+
+def _ema_rows(values, length):
+    """EMA ligne par ligne (amorcée par la moyenne simple des `length` premières valeurs), NaN pendant la chauffe."""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] < length:
+        return out
+    alpha = 2.0 / (length + 1)
+    seed = values[:, :length].mean(axis=1)
+    out[:, length - 1] = seed
+    # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], l'état initial porte la moyenne simple
+    out[:, length:], _ = lfilter(
+        [alpha], [1.0, alpha - 1.0], values[:, length:], axis=1, zi=((1.0 - alpha) * seed)[:, None]
+    )
+    return out
+
+
+def _wilder_sum(values, length):
+    """Somme pondérée par (1 - 1/length)^k, calculée par filtre récursif sur chaque ligne."""
+    decay = 1.0 - 1.0 / length
+    return lfilter([1.0], [1.0, -decay], values, axis=1)
+
+
+class BatchIndicators:
+    """
+    Indicateurs techniques vectorisés sur des matrices de prix (n_symbols, n_bars).
+
+    Les récurrences (EMA, lissage de Wilder) sont évaluées par des filtres
+    récursifs SciPy sur l'axe du temps, pour toutes les paires à la fois,
+    sans DataFrame par paire. Comme `TechnicalIndicators`, les valeurs de la
+    période de chauffe valent 0.
+    """
+
+    @staticmethod
+    def ema(prices, length=10):
+        """
+        EMA de chaque ligne (même définition que `ta.ema`).
+        :return: Tableau (n_symbols, n_bars).
+        """
+        return np.nan_to_num(_ema_rows(_as_float(prices), length))
+
+    @staticmethod
+    def rsi(prices, period=14):
+        """
+        RSI de chaque ligne (même résultat que `TechnicalIndicators.calculate_rsi`).
+        :return: Tableau (n_symbols, n_bars).
+        """
+        prices = _as_float(prices)
+        change = np.diff(prices, axis=1)
+        gains = _wilder_sum(np.maximum(change, 0.0), period)
+        losses = _wilder_sum(np.maximum(-change, 0.0), period)
+        total = gains + losses
+        rsi = np.zeros(prices.shape)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rsi[:, 1:] = np.where(total > 0, 100.0 * gains / total, 0.0)
+        rsi[:, :period] = 0.0
+        return rsi
+
+    @staticmethod
+    def macd(prices, fast=12, slow=26, signal=9):
+        """
+        MACD de chaque ligne (même résultat que `TechnicalIndicators.calculate_macd`).
+        :return: Tuple de tableaux (MACD, Signal, Histogram), chacun (n_symbols, n_bars).
+        """
+        prices = _as_float(prices)
+        macd = _ema_rows(prices, fast) - _ema_rows(prices, slow)
+        signal_line = np.full(prices.shape, np.nan)
+        first_valid = max(fast, slow) - 1
+        signal_line[:, first_valid:] = _ema_rows(macd[:, first_valid:], signal)
+        histogram = macd - signal_line
+        return np.nan_to_num(macd), np.nan_to_num(signal_line), np.nan_to_num(histogram)
+
+    @staticmethod
+    def bollinger(prices, length=20, std=2.0):
+        """
+        Bandes de Bollinger (moyenne mobile simple +/- `std` écarts-types de population).
+        :return: Tuple (bande basse, moyenne, bande haute), chacun (n_symbols, n_bars).
+        """
+        prices = _as_float(prices)
+        lower, middle, upper = (np.zeros(prices.shape) for _ in range(3))
+        if prices.shape[1] >= length:
+            windows = sliding_window_view(prices, length, axis=1)  # Vue, aucune copie
+            mean = windows.mean(axis=2)
+            deviation = windows.std(axis=2)
+            middle[:, length - 1:] = mean
+            lower[:, length - 1:] = mean - std * deviation
+            upper[:, length - 1:] = mean + std * deviation
+        return lower, middle, upper
+
+    @staticmethod
+    def atr(high, low, close, length=14):
+        """
+        ATR (Average True Range) avec lissage de Wilder, comme `ta.atr`.
+        :return: Tableau (n_symbols, n_bars).
+        """
+        high, low, close = _as_float(high), _as_float(low), _as_float(close)
+        previous_close = close[:, :-1]
+        true_range = np.maximum.reduce([
+            high[:, 1:] - low[:, 1:],
+            np.abs(high[:, 1:] - previous_close),
+            np.abs(low[:, 1:] - previous_close),
+        ])
+        # Moyenne pondérée = somme pondérée / somme des poids
+        decay = 1.0 - 1.0 / length
+        weights = (1.0 - decay ** np.arange(1, true_range.shape[1] + 1)) / (1.0 - decay)
+        atr = np.zeros(close.shape)
+        atr[:, 1:] = _wilder_sum(true_range, length) / weights
+        atr[:, :length] = 0.0
+        return atr
+
+    @staticmethod
+    def vwap(high, low, close, volume, length=None, timestamps=None):
+        """
+        VWAP sur le prix typique (high + low + close) / 3.
+        :param length: Fenêtre glissante en nombre de bougies ; si None, VWAP cumulée.
+        :param timestamps: Timestamps (ms) des bougies, communs à toutes les lignes ;
+                           si fournis (et length None), la VWAP repart de zéro chaque jour UTC comme `ta.vwap`.
+        :return: Tableau (n_symbols, n_bars).
+        """
+        high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+        price_volume = (high + low + close) / 3.0 * volume
+        cum_pv = np.cumsum(price_volume, axis=1)
+        cum_volume = np.cumsum(volume, axis=1)
+
+        if length is not None:
+            cum_pv[:, length:] = cum_pv[:, length:] - cum_pv[:, :-length]
+            cum_volume[:, length:] = cum_volume[:, length:] - cum_volume[:, :-length]
+        elif timestamps is not None:
+            day = np.asarray(timestamps, dtype=np.int64) // 86_400_000
+            # Indice de la première bougie de chaque jour, propagé à toutes les bougies du jour
+            day_start = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+            start_index = day_start[np.searchsorted(day_start, np.arange(len(day)), side="right") - 1]
+            previous = start_index - 1
+            has_previous = previous >= 0
+            cum_pv[:, has_previous] -= cum_pv[:, previous[has_previous]]
+            cum_volume[:, has_previous] -= cum_volume[:, previous[has_previous]]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(cum_volume > 0, cum_pv / cum_volume, 0.0)
+        if length is not None:
+            vwap[:, :length - 1] = 0.0
+        return vwap
+
+    @staticmethod
+    def compute_in_blocks(indicator, source, block_rows=256, **kwargs):
+        """
+        Applique un indicateur à une matrice (ou un fichier .npy mappé) par blocs de lignes,
+        pour borner la mémoire de travail sur des milliers de paires.
+        :param indicator: Méthode de BatchIndicators prenant une matrice de prix (ex. BatchIndicators.rsi).
+        :return: Résultat concaténé (tableau ou tuple de tableaux).
+        """
+        matrix = load_price_matrix(source)
+        blocks = [indicator(matrix[start:start + block_rows], **kwargs)
+                  for start in range(0, matrix.shape[0], block_rows)]
+        if isinstance(blocks[0], tuple):
+            return tuple(np.concatenate(parts, axis=0) for parts in zip(*blocks))
+        return np.concatenate(blocks, axis=0)
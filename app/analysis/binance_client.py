@@ -0,0 +1,230 @@
+import hashlib
+import hmac
+import os
+import random
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Adresses de l'API ; surchargeables (ex. serveur local de test) via BINANCE_API_URL / BINANCE_FUTURES_URL
+SPOT_URL = "https://api.binance.com"
+FUTURES_URL = "https://fapi.binance.com"
+
+# Limites de poids par minute (spot et futures ont des compteurs séparés)
+SPOT_WEIGHT_PER_MINUTE = 1200
+FUTURES_WEIGHT_PER_MINUTE = 2400
+
+# Poids Binance des requêtes utilisées par le projet
+ENDPOINT_WEIGHTS = {
+    "/api/v3/klines": 2,
+    "/api/v3/depth": 5,  # limit <= 100
+    "/api/v3/aggTrades": 2,
+    "/fapi/v1/fundingRate": 1,
+    "/fapi/v1/forceOrders": 20,
+}
+
+RETRY_STATUSES = {418, 429, 500, 502, 503, 504}
+
+
+class BinanceAPIError(Exception):
+    """Erreur renvoyée par l'API Binance (code HTTP et code Binance)."""
+
+    def __init__(self, status_code, code=None, message=""):
+        super().__init__(f"Binance API {status_code} (code={code}) : {message}")
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+
+
+class RequestWeightBudget:
+    """
+    Seau à jetons limitant le poids des requêtes envoyées par minute, partagé entre threads.
+    Le seau peut être recalé sur le poids réellement consommé que Binance renvoie
+    dans l'en-tête X-MBX-USED-WEIGHT-1M (autres processus, autres clients sur la même IP).
+    """
+
+    def __init__(self, weight_per_minute=1200):
+        self.capacity = weight_per_minute
+        self.tokens = float(weight_per_minute)
+        self.refill_rate = weight_per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def acquire(self, weight):
+        """Bloque jusqu'à ce que `weight` jetons soient disponibles, puis les consomme."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = (weight - self.tokens) / self.refill_rate
+            time.sleep(wait)
+
+    def observe_used_weight(self, used_weight):
+        """Limite les jetons disponibles au poids restant annoncé par le serveur."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, float(self.capacity - used_weight))
+
+    def pause(self, seconds):
+        """Vide le seau pour que les prochaines requêtes attendent au moins `seconds` secondes."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.refill_rate)
+
+
+def backoff_delay(attempt, backoff=1.0, max_delay=60.0):
+    """Délai exponentiel avec gigue aléatoire pour la tentative `attempt` (0, 1, 2...)."""
+    return min(max_delay, backoff * 2 ** attempt) * (0.5 + random.random() / 2)
+
+
+class BinanceRestClient:
+    """
+    Client REST Binance léger et partagé entre threads.
+
+    Une seule `requests.Session` conserve un pool de connexions keep-alive
+    (pas de nouvelle poignée de main TLS à chaque appel). Chaque requête
+    consomme son poids dans le seau de l'API visée (spot ou futures), recalé
+    sur l'en-tête X-MBX-USED-WEIGHT-1M ; les erreurs réseau, 429/418 et 5xx
+    sont réessayées avec un délai exponentiel et une gigue, en respectant
+    Retry-After. Les méthodes reprennent les noms de binance.client.Client
+    utilisés par le projet.
+    """
+
+    def __init__(self, api_key=None, api_secret=None, base_url=None, futures_url=None, pool_size=16,
+                 timeout=30, retries=5, backoff=1.0, weight_per_minute=SPOT_WEIGHT_PER_MINUTE,
+                 futures_weight_per_minute=FUTURES_WEIGHT_PER_MINUTE):
+        """
+        :param base_url: Adresse de l'API spot (par défaut BINANCE_API_URL ou api.binance.com).
+        :param futures_url: Adresse de l'API futures (par défaut BINANCE_FUTURES_URL ou fapi.binance.com).
+        :param pool_size: Nombre de connexions conservées par hôte.
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = (base_url or os.getenv("BINANCE_API_URL", SPOT_URL)).rstrip("/")
+        self.futures_url = (futures_url or os.getenv("BINANCE_FUTURES_URL", FUTURES_URL)).rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.budgets = {
+            self.base_url: RequestWeightBudget(weight_per_minute),
+            self.futures_url: RequestWeightBudget(futures_weight_per_minute),
+        }
+        # Le téléchargeur de bougies utilise directement ce seau au lieu d'en créer un
+        self.weight_budget = self.budgets[self.base_url]
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if api_key:
+            self.session.headers["X-MBX-APIKEY"] = api_key
+
+    def close(self):
+        self.session.close()
+
+    def _sign(self, params):
+        params = dict(params, timestamp=int(time.time() * 1000))
+        query = urlencode(params)
+        params["signature"] = hmac.new(self.api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+        return params
+
+    def request(self, base_url, path, params=None, signed=False, weight=None):
+        """
+        Envoie une requête GET et retourne le JSON décodé.
+        :raises ValueError: Requête signée sans clés API configurées.
+        :raises BinanceAPIError: Erreur non réessayable ou échec après toutes les tentatives.
+        """
+        if signed and not (self.api_key and self.api_secret):
+            raise ValueError(f"{path} : les clés API Binance ne sont pas configurées "
+                             "(BINANCE_API_KEY / BINANCE_SECRET_KEY).")
+        budget = self.budgets[base_url]
+        weight = ENDPOINT_WEIGHTS.get(path, 1) if weight is None else weight
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        last_error = None
+
+        for attempt in range(self.retries):
+            budget.acquire(weight)
+            try:
+                response = self.session.get(
+                    base_url + path, params=self._sign(params) if signed else params, timeout=self.timeout
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+                if attempt + 1 < self.retries:
+                    delay = backoff_delay(attempt, self.backoff)
+                    print(f"{path} : erreur réseau {attempt + 1}/{self.retries} ({e}). Nouvelle tentative dans {delay:.1f} s...")
+                    time.sleep(delay)
+                continue
+
+            used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M") or response.headers.get("X-MBX-USED-WEIGHT")
+            if used_weight is not None:
+                budget.observe_used_weight(int(used_weight))
+
+            if response.status_code < 400:
+                return response.json()
+
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            last_error = BinanceAPIError(response.status_code, body.get("code"), body.get("msg", response.text))
+            if response.status_code not in RETRY_STATUSES or attempt + 1 == self.retries:
+                raise last_error
+
+            delay = backoff_delay(attempt, self.backoff)
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is not None:
+                # 429/418 : Binance indique combien de temps attendre ; tous les threads patientent
+                delay = max(delay, float(retry_after))
+                budget.pause(delay)
+            print(f"{path} : HTTP {response.status_code} {attempt + 1}/{self.retries}. Nouvelle tentative dans {delay:.1f} s...")
+            time.sleep(delay)
+
+        raise BinanceAPIError(getattr(last_error, "status_code", None), None,
+                              f"Échec de {path} après {self.retries} tentatives ({last_error})")
+
+    def get_klines(self, **params):
+        return self.request(self.base_url, "/api/v3/klines", params)
+
+    def get_order_book(self, **params):
+        # Le poids de /api/v3/depth dépend du nombre de niveaux demandés
+        limit = int(params.get("limit", 100))
+        weight = 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+        return self.request(self.base_url, "/api/v3/depth", params, weight=weight)
+
+    def get_aggregate_trades(self, **params):
+        return self.request(self.base_url, "/api/v3/aggTrades", params)
+
+    def futures_funding_rate(self, **params):
+        return self.request(self.futures_url, "/fapi/v1/fundingRate", params)
+
+    def futures_liquidation_orders(self, **params):
+        return self.request(self.futures_url, "/fapi/v1/forceOrders", params, signed=True)
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Client partagé par toutes les fonctions fetch_* du processus (un seul pool de connexions
+    et un seul budget de poids), créé au premier appel à partir de BINANCE_API_KEY / BINANCE_SECRET_KEY.
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = BinanceRestClient(
+                api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_SECRET_KEY")
+            )
+        return _shared_client
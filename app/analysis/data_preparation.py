@@ -1,33 +1,203 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import MinMaxScaler
 import glob
+import json
+import os
+
+def load_close_series(data_folder, exclude_files=None):
+    """
+    Charge la colonne 'close' de tous les fichiers CSV du dossier dans un seul tableau float32 contigu.
+    :param data_folder: Chemin vers le dossier contenant les fichiers CSV.
+    :param exclude_files: Fichiers à ignorer (chemins ou noms de fichiers), ex. ceux déjà utilisés pour l'entraînement.
+    :return: (série des clôtures, liste des fichiers chargés, limites de chaque fichier dans la série).
+    """
+    excluded = set(exclude_files or ())
+    series_parts = []
+    loaded_files = []
+
+    for file in sorted(glob.glob(f"{data_folder}/*.csv")):
+        if file in excluded or os.path.basename(file) in excluded:
+            continue
+        # Seule la colonne 'close' est analysée, directement en float32
+        df = pd.read_csv(file, usecols=lambda column: column == "close", dtype={"close": np.float32})
+        if "close" in df.columns:  # Vérifiez que la colonne 'close' existe
+            series_parts.append(df["close"].to_numpy())
+            loaded_files.append(file)
+
+    series = np.concatenate(series_parts) if series_parts else np.empty(0, dtype=np.float32)
+    bounds = np.cumsum([0] + [len(part) for part in series_parts])
+    return series, loaded_files, bounds
+
+def make_windows(series, sequence_length=50):
+    """
+    Construit les séquences d'entraînement comme des vues sur la série, sans copie.
+    :param series: Tableau 1-D contigu (normalisé).
+    :param sequence_length: Longueur des séquences pour le modèle.
+    :return: X de forme (N, sequence_length, 1) et y de forme (N, 1), tous deux des vues sur `series`.
+    """
+    if len(series) <= sequence_length:
+        return (np.empty((0, sequence_length, 1), dtype=series.dtype),
+                np.empty((0, 1), dtype=series.dtype))
+    X = sliding_window_view(series[:-1], sequence_length)[..., np.newaxis]
+    y = series[sequence_length:, np.newaxis]
+    return X, y
+
+def make_windows_by_bounds(series, bounds, sequence_length=50):
+    """
+    Construit les séquences de chaque segment [bounds[k], bounds[k + 1]) de la série (un fichier, une paire),
+    sans fenêtre ni cible à cheval sur deux segments.
+    :param bounds: Limites croissantes des segments, de 0 à len(series).
+    :return: X et y comme make_windows ; des vues si un seul segment fournit des fenêtres, sinon une copie.
+    """
+    windows = [make_windows(series[start:end], sequence_length) for start, end in zip(bounds[:-1], bounds[1:])]
+    windows = [(X, y) for X, y in windows if len(X)]
+    if not windows:
+        return make_windows(series[:0], sequence_length)
+    if len(windows) == 1:
+        return windows[0]
+    return np.concatenate([X for X, _ in windows]), np.concatenate([y for _, y in windows])
+
+def iter_window_batches(series, sequence_length=50, batch_size=32):
+    """
+    Génère les séquences par batchs : seule la mémoire d'un batch est matérialisée à la fois.
+    :return: Générateur de tuples (X_batch, y_batch).
+    """
+    X, y = make_windows(series, sequence_length)
+    for start in range(0, len(X), batch_size):
+        yield np.ascontiguousarray(X[start:start + batch_size]), y[start:start + batch_size]
+
+def make_tf_dataset(series, sequence_length=50, batch_size=32, shuffle=False):
+    """
+    Construit un pipeline tf.data qui découpe les séquences à la volée avec préchargement.
+    :return: tf.data.Dataset de batchs (X, y).
+    """
+    import tensorflow as tf
+
+    dataset = tf.keras.utils.timeseries_dataset_from_array(
+        data=series[:, np.newaxis],
+        targets=series[sequence_length:, np.newaxis],
+        sequence_length=sequence_length,
+        batch_size=batch_size,
+        shuffle=shuffle,
+    )
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+def normalize_series(series):
+    """
+    Normalise une série float32 sur place entre 0 et 1.
+    :return: (série normalisée, scaler ajusté).
+    """
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    if len(series):
+        scaler.fit(series.reshape(-1, 1))
+        series *= scaler.scale_[0]
+        series += scaler.min_[0]
+    return series, scaler
+
+def save_scaler(scaler, path):
+    """
+    Sauvegarde un MinMaxScaler ajusté au format JSON, à côté du modèle qu'il accompagne.
+    """
+    state = {
+        "feature_range": list(scaler.feature_range),
+        "data_min": scaler.data_min_.tolist(),
+        "data_max": scaler.data_max_.tolist(),
+    }
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def load_scaler(path):
+    """
+    Recharge un MinMaxScaler sauvegardé par save_scaler, sans le réajuster.
+    :return: MinMaxScaler, ou None si le fichier n'existe pas.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    scaler = MinMaxScaler(feature_range=tuple(state["feature_range"]))
+    # fit sur les bornes enregistrées : reconstruit exactement scale_ et min_
+    scaler.fit(np.array([state["data_min"], state["data_max"]], dtype=np.float64))
+    return scaler
+
+def apply_scaler(series, scaler):
+    """
+    Normalise une série float32 sur place avec un scaler déjà ajusté (feature 0).
+    """
+    series *= scaler.scale_[0]
+    series += scaler.min_[0]
+    return series
+
+def scaler_path_for(model_path):
+    """
+    Chemin du scaler sauvegardé avec un modèle : models/lstm_model.keras (ou .npz) -> models/lstm_model_scaler.json.
+    """
+    return os.path.splitext(model_path)[0] + "_scaler.json"
+
+def scaled_predict_fn(predict_fn, scaler):
+    """
+    Enveloppe la fonction de prédiction d'un modèle entraîné sur des prix normalisés :
+    elle reçoit des prix bruts (batch, seq_length, 1) et retourne des prix.
+    :param scaler: Scaler sauvegardé avec le modèle ; None : fonction retournée telle quelle (prix bruts).
+    """
+    if scaler is None:
+        return predict_fn
+    scale, offset = np.float32(scaler.scale_[0]), np.float32(scaler.min_[0])
+
+    def predict(X):
+        y = np.asarray(predict_fn(np.asarray(X, dtype=np.float32) * scale + offset))
+        return (y - offset) / scale
+
+    return predict
+
+def _prepare_files(data_folder, sequence_length, exclude_files):
+    series, files, bounds = load_close_series(data_folder, exclude_files)
+
+    # Normaliser sur place : pas de copie supplémentaire de la série
+    series, scaler = normalize_series(series)
+
+    # Créer des séquences, sans traverser les limites de fichiers
+    X, y = make_windows_by_bounds(series, bounds, sequence_length)
+    return X, y, scaler, files
 
 def prepare_data(data_folder, sequence_length=50):
     """
     Charge toutes les données collectées et les prépare pour l'entraînement.
+    Avec un seul fichier, X et y sont des vues sur la série normalisée (mémoire proportionnelle à la série brute) ;
+    avec plusieurs, chaque fichier est découpé séparément et les fenêtres sont copiées une fois.
     :param data_folder: Chemin vers le dossier contenant les fichiers CSV.
     :param sequence_length: Longueur des séquences pour le modèle.
     :return: X (features), y (targets), scaler utilisé pour normaliser.
     """
-    all_files = glob.glob(f"{data_folder}/*.csv")
-    all_data = []
-
-    # Charger les données de chaque fichier CSV
-    for file in all_files:
-        df = pd.read_csv(file)
-        if "close" in df.columns:  # Vérifiez que la colonne 'close' existe
-            all_data.extend(df["close"].values.tolist())
+    X, y, scaler, _ = _prepare_files(data_folder, sequence_length, None)
+    return X, y, scaler
 
-    # Convertir en DataFrame et normaliser
-    all_data = pd.DataFrame(all_data, columns=["close"])
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    normalized_data = scaler.fit_transform(all_data)
+def prepare_new_data(data_folder, exclude_files, sequence_length=50):
+    """
+    Comme prepare_data, en ignorant les fichiers déjà utilisés pour l'entraînement.
+    :param exclude_files: Fichiers à ignorer (chemins ou noms de fichiers).
+    :return: X (features), y (targets), scaler utilisé pour normaliser, nouveaux fichiers chargés.
+    """
+    return _prepare_files(data_folder, sequence_length, exclude_files)
 
-    # Créer des séquences
-    X, y = [], []
-    for i in range(len(normalized_data) - sequence_length):
-        X.append(normalized_data[i:i+sequence_length])
-        y.append(normalized_data[i+sequence_length])
+def prepare_data_from_store(symbols, interval="1m", sequence_length=50, start_ms=None, end_ms=None, store_root=None):
+    """
+    Prépare les données d'entraînement depuis le stockage binaire (data/store) au lieu des CSV.
+    Les clôtures sont lues par tranches de temps mappées en mémoire, puis copiées une seule fois en float32.
+    Un seul scaler est ajusté sur toutes les paires, mais chaque paire est découpée séparément :
+    aucune fenêtre ne mêle les prix de deux paires.
+    :param symbols: Liste des paires à utiliser.
+    :return: X (features), y (targets), scaler utilisé pour normaliser.
+    """
+    from app.storage.column_store import MarketDataStore, STORE_ROOT
 
-    return np.array(X), np.array(y), scaler
\ No newline at end of file
+    store = MarketDataStore(store_root or STORE_ROOT)
+    parts = [store.close_series(symbol, interval, start_ms, end_ms) for symbol in symbols]
+    series = np.concatenate(parts).astype(np.float32, copy=False) if parts else np.empty(0, dtype=np.float32)
+    series, scaler = normalize_series(series)
+    bounds = np.cumsum([0] + [len(part) for part in parts])
+    X, y = make_windows_by_bounds(series, bounds, sequence_length)
+    return X, y, scaler
@@ -0,0 +1,151 @@
+import os
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from sklearn.preprocessing import MinMaxScaler
+
+SOCIAL_CSV_PATH = "data/reddit_data_analyzed.csv"
+NEWS_CSV_PATH = "data/news_analyzed.csv"
+
+# Colonnes de date reconnues dans les fichiers d'événements, par ordre de préférence
+EVENT_TIME_COLUMNS = ["created", "published", "datePublished", "published_date", "pubDate"]
+
+
+def load_sentiment_events(path, score_column="sentiment_score"):
+    """
+    Charge des événements datés et leur score de sentiment (sorties de analyze_social_data / analyze_news).
+    :return: (timestamps en millisecondes triés, scores), tableaux vides si le fichier est absent.
+    """
+    if not os.path.exists(path):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    header = pd.read_csv(path, nrows=0).columns
+    time_column = next((column for column in EVENT_TIME_COLUMNS if column in header), None)
+    if time_column is None or score_column not in header:
+        raise ValueError(f"{path} : colonnes de date ou de score introuvables.")
+
+    df = pd.read_csv(path, usecols=[time_column, score_column]).dropna()
+    times = df[time_column]
+    if pd.api.types.is_numeric_dtype(times):
+        milliseconds = (times.to_numpy(dtype=np.float64) * 1000).astype(np.int64)  # Secondes Unix
+    else:
+        milliseconds = pd.to_datetime(times, utc=True, errors="coerce").to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    valid = milliseconds > 0
+    order = np.argsort(milliseconds[valid], kind="stable")
+    return milliseconds[valid][order], df[score_column].to_numpy(dtype=np.float64)[valid][order]
+
+
+def bucket_events(bar_timestamps, interval_ms, event_timestamps, values):
+    """
+    Affecte chaque événement à la bougie pendant laquelle il a eu lieu (jointure as-of par recherche
+    dichotomique sur la grille triée des bougies), sans boucle sur les lignes.
+    Les événements antérieurs à la première bougie ou postérieurs à la dernière sont ignorés.
+    :return: (nombre d'événements par bougie, somme des valeurs par bougie).
+    """
+    bar_timestamps = np.asarray(bar_timestamps, dtype=np.int64)
+    event_timestamps = np.asarray(event_timestamps, dtype=np.int64)
+    n_bars = len(bar_timestamps)
+    if n_bars == 0:
+        return np.zeros(0), np.zeros(0)
+    index = np.searchsorted(bar_timestamps, event_timestamps, side="right") - 1
+    inside = (index >= 0) & (event_timestamps < bar_timestamps[-1] + interval_ms)
+    counts = np.bincount(index[inside], minlength=n_bars).astype(np.float64)
+    sums = np.bincount(index[inside], weights=np.asarray(values)[inside], minlength=n_bars)
+    return counts, sums
+
+
+def rolling_sum(values, window):
+    """Somme glissante sur `window` bougies (bougie courante incluse), par sommes cumulées."""
+    cumulative = np.cumsum(values)
+    result = cumulative.copy()
+    result[window:] -= cumulative[:-window]
+    return result
+
+
+def decayed_sum(values, half_life):
+    """Somme pondérée par une décroissance exponentielle de demi-vie `half_life` bougies (filtre récursif)."""
+    decay = 0.5 ** (1.0 / half_life)
+    return lfilter([1.0], [1.0, -decay], values)
+
+
+def sentiment_features(bar_timestamps, interval_ms, event_timestamps, scores, window=60, half_life=30):
+    """
+    Agrégats glissants d'une source d'événements sur la grille des bougies.
+    :param window: Fenêtre (en bougies) du nombre d'événements et du score moyen.
+    :param half_life: Demi-vie (en bougies) du score pondéré par décroissance.
+    :return: Tableau (n_bars, 3) : nombre d'événements, score 'compound' moyen, score pondéré par décroissance.
+    """
+    counts, sums = bucket_events(bar_timestamps, interval_ms, event_timestamps, scores)
+    window_counts = rolling_sum(counts, window)
+    window_sums = rolling_sum(sums, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_score = np.where(window_counts > 0, window_sums / window_counts, 0.0)
+    return np.column_stack([window_counts, mean_score, decayed_sum(sums, half_life)])
+
+
+def build_feature_matrix(bars, interval_ms, sources, window=60, half_life=30):
+    """
+    Construit la matrice des features alignées sur les bougies.
+    :param bars: DataFrame (ou dictionnaire) avec les colonnes 'timestamp' (ms) et 'close'.
+    :param sources: Dictionnaire {nom: (timestamps ms, scores)} des sources d'événements.
+    :return: (matrice float32 (n_bars, F), noms des features) ; la première feature est 'close'.
+    """
+    timestamps = np.asarray(bars["timestamp"], dtype=np.int64)
+    columns = [np.asarray(bars["close"], dtype=np.float64)]
+    names = ["close"]
+    for name, (event_timestamps, scores) in sources.items():
+        columns.append(sentiment_features(timestamps, interval_ms, event_timestamps, scores, window, half_life))
+        names += [f"{name}_count", f"{name}_mean", f"{name}_decay"]
+    matrix = np.column_stack(columns).astype(np.float32)
+    return matrix, names
+
+
+def make_feature_windows(features, sequence_length=50):
+    """
+    Séquences multi-features sous forme de vues (sans copie) sur la matrice des features.
+    La cible est la première feature (clôture) de la bougie suivant chaque séquence.
+    :return: X de forme (N, sequence_length, F) et y de forme (N, 1).
+    """
+    n_bars, n_features = features.shape
+    if n_bars <= sequence_length:
+        return (np.empty((0, sequence_length, n_features), dtype=features.dtype),
+                np.empty((0, 1), dtype=features.dtype))
+    X = sliding_window_view(features[:-1], sequence_length, axis=0).transpose(0, 2, 1)
+    y = features[sequence_length:, :1]
+    return X, y
+
+
+def normalize_features(features):
+    """Normalise chaque feature sur place entre 0 et 1. :return: (features, scaler ajusté)."""
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    if len(features):
+        scaler.fit(features)
+        features *= scaler.scale_.astype(features.dtype)
+        features += scaler.min_.astype(features.dtype)
+    return features, scaler
+
+
+def prepare_feature_data(symbol, interval="1m", sequence_length=50, social_csv=SOCIAL_CSV_PATH,
+                         news_csv=NEWS_CSV_PATH, window=60, half_life=30, start_ms=None, end_ms=None,
+                         store_root=None):
+    """
+    Prépare des tenseurs d'entraînement (N, sequence_length, F) : clôture + features de sentiment
+    (Reddit et actualités) alignées sur les bougies du stockage binaire.
+    :return: X, y, scaler (ajusté sur toutes les features), noms des features.
+             La clôture est la feature 0 : prix = (y - scaler.min_[0]) / scaler.scale_[0].
+    """
+    from app.analysis.kline_downloader import INTERVAL_MS
+    from app.storage.column_store import STORE_ROOT, MarketDataStore
+
+    store = MarketDataStore(store_root or STORE_ROOT)
+    bars = store.table(symbol, interval).read(["timestamp", "close"], start_ms, end_ms)
+    sources = {}
+    for name, path in (("social", social_csv), ("news", news_csv)):
+        if path:
+            sources[name] = load_sentiment_events(path)
+
+    features, names = build_feature_matrix(bars, INTERVAL_MS[interval], sources, window, half_life)
+    features, scaler = normalize_features(features)
+    X, y = make_feature_windows(features, sequence_length)
+    return X, y, scaler, names
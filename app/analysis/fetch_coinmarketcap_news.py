@@ -1,3 +1,4 @@
+import os
 import requests
 import pandas as pd
 
@@ -38,11 +39,15 @@ def fetch_rss_feed():
     return []
 
 if __name__ == "__main__":
-    news = fetch_rss_feed()
+    from app.analysis.analyze_social_data import analyze_news
+    from app.analysis.ingestion import ingest_feed
+
+    # Requête conditionnelle : seuls les articles jamais vus sont récupérés et ajoutés
+    news = ingest_feed(RSS_FEED_URL)
     if news:
-        # Sauvegarde dans un fichier CSV
-        df = pd.DataFrame(news)
-        df.to_csv("data/rss_feed_latest_news.csv", index=False)
-        print("Les dernières actualités ont été sauvegardées dans rss_feed_latest_news.csv")
+        path = "data/rss_feed_latest_news.csv"
+        pd.DataFrame(news).to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+        print(f"{len(news)} nouvelles actualités ajoutées à {path}")
+        analyze_news(news)
     else:
-        print("Aucune actualité récupérée.")
\ No newline at end of file
+        print("Aucune nouvelle actualité.")
\ No newline at end of file
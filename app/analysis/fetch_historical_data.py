@@ -1,71 +1,26 @@
 import pandas as pd
-from binance.client import Client
 from dotenv import load_dotenv
 import os
-from datetime import datetime, timedelta, timezone
-from time import sleep
-from binance.exceptions import BinanceAPIException
+from concurrent.futures import ThreadPoolExecutor
+from app.analysis.binance_client import BinanceAPIError, get_client
+from app.analysis.kline_downloader import download_klines, load_klines, parse_start_time
+from app.storage.stream_tables import save_stream_tables
 
 # Charger les variables d'environnement
 load_dotenv(dotenv_path="/Users/nasser/crypto_trading_tool/.env")
 
-def retry_request(func, retries=5, delay=10, **kwargs):
-    """
-    Réessayer une requête API en cas d'échec.
-    """
-    for attempt in range(retries):
-        try:
-            return func(**kwargs)
-        except requests.exceptions.ReadTimeout as e:
-            print(f"Timeout lors de la tentative {attempt + 1}/{retries}. Nouvelle tentative dans {delay} secondes...")
-            sleep(delay)
-        except Exception as e:
-            print(f"Erreur inattendue : {e}")
-            break
-    raise Exception("Échec après plusieurs tentatives")
-
-def fetch_historical_data(symbol="PEPEUSDT", interval="1m", start_time="5 years ago UTC"):
+def fetch_historical_data(symbol="PEPEUSDT", interval="1m", start_time="5 years ago UTC", max_workers=8):
     """
     Récupère les données historiques de Binance pour une paire donnée.
+    Les tranches sont téléchargées en parallèle et mises en cache dans data/klines/ ;
+    une nouvelle exécution ne récupère que les plages manquantes.
     """
-    api_key = os.getenv("BINANCE_API_KEY")
-    api_secret = os.getenv("BINANCE_SECRET_KEY")
-    if not api_key or not api_secret:
-        raise ValueError("Les clés API Binance ne sont pas configurées.")
-
-    client = Client(api_key=api_key, api_secret=api_secret, requests_params={"timeout": 60})
-
-    if "ago" in start_time:
-        years = int(start_time.split(" ")[0])
-        start_datetime = datetime.now(timezone.utc) - timedelta(days=years * 365)
-    else:
-        start_datetime = pd.to_datetime(start_time).tz_localize("UTC")
+    client = get_client()
 
-    klines = []
-    end_datetime = datetime.now(timezone.utc)
-    current_start = start_datetime
+    start_ms = parse_start_time(start_time)
+    download_klines(client, symbol=symbol, interval=interval, start_time=start_ms, max_workers=max_workers)
 
-    while current_start < end_datetime:
-        try:
-            current_end = min(current_start + timedelta(minutes=1000), end_datetime)
-            print(f"Récupération des données de {current_start} à {current_end}...")
-            klines += retry_request(
-                client.get_historical_klines,
-                symbol=symbol,
-                interval=interval,
-                start_str=current_start.strftime("%d %b %Y %H:%M:%S"),
-                end_str=current_end.strftime("%d %b %Y %H:%M:%S")
-            )
-            current_start = current_end
-        except BinanceAPIException as e:
-            print(f"Erreur API Binance : {e}. Attente de 60 secondes...")
-            sleep(60)
-
-    df = pd.DataFrame(klines, columns=[
-        "timestamp", "open", "high", "low", "close", "volume", "close_time",
-        "quote_asset_volume", "number_of_trades", "taker_buy_base_asset_volume",
-        "taker_buy_quote_asset_volume", "ignore"
-    ])
+    df = load_klines(symbol, interval, start_ms=start_ms)
     df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
     df["type"] = "historical"
     return df[["timestamp", "type", "open", "high", "low", "close", "volume"]]
@@ -74,8 +29,7 @@ def fetch_order_book(symbol="PEPEUSDT", limit=100):
     """
     Récupère les données du carnet d'ordres pour une paire donnée.
     """
-    client = Client(api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_SECRET_KEY"))
-    order_book = retry_request(client.get_order_book, symbol=symbol, limit=limit)
+    order_book = get_client().get_order_book(symbol=symbol, limit=limit)
     bids = pd.DataFrame(order_book["bids"], columns=["price", "quantity"])
     bids["type"] = "order_book_bid"
     asks = pd.DataFrame(order_book["asks"], columns=["price", "quantity"])
@@ -86,9 +40,8 @@ def fetch_funding_rate(symbol="PEPEUSDT"):
     """
     Récupère les taux de financement des contrats perpétuels.
     """
-    client = Client(api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_SECRET_KEY"))
     try:
-        funding_rates = retry_request(client.futures_funding_rate, symbol=symbol)
+        funding_rates = get_client().futures_funding_rate(symbol=symbol)
         
         if not funding_rates:
             print(f"Aucune donnée de financement trouvée pour {symbol}.")
@@ -97,7 +50,7 @@ def fetch_funding_rate(symbol="PEPEUSDT"):
         df = pd.DataFrame(funding_rates)
         df["type"] = "funding_rate"
         return df[["fundingTime", "fundingRate", "type"]]
-    except BinanceAPIException as e:
+    except BinanceAPIError as e:
         print(f"Erreur Binance API : {e}")
         return pd.DataFrame()
     except Exception as e:
@@ -108,19 +61,17 @@ def fetch_aggregate_trades(symbol="PEPEUSDT", limit=500):
     """
     Récupère les données de trading agrégées.
     """
-    client = Client(api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_SECRET_KEY"))
-    trades = retry_request(client.get_aggregate_trades, symbol=symbol, limit=limit)
+    trades = get_client().get_aggregate_trades(symbol=symbol, limit=limit)
     df = pd.DataFrame(trades)
     df["type"] = "trades"
-    return df[["T", "type", "p", "q"]]
+    return df[["T", "a", "type", "p", "q"]]
 
 def fetch_liquidations(symbol="PEPEUSDT", limit=50):
     """
     Récupère les liquidations massives sur Binance.
     """
-    client = Client(api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_SECRET_KEY"))
     try:
-        liquidations = retry_request(client.futures_liquidation_orders, symbol=symbol, limit=limit)
+        liquidations = get_client().futures_liquidation_orders(symbol=symbol, limit=limit)
         if not liquidations:
             print(f"Aucune liquidation trouvée pour {symbol}.")
             return pd.DataFrame()
@@ -138,9 +89,26 @@ def fetch_liquidations(symbol="PEPEUSDT", limit=50):
         print(f"Erreur lors de la récupération des liquidations : {e}")
         return pd.DataFrame()
 
+def fetch_market_snapshot(symbol="PEPEUSDT", start_time="5 years ago UTC", max_workers=5):
+    """
+    Récupère tous les flux d'une paire en un seul lot concurrent, via le client partagé.
+    :return: Dictionnaire {flux: DataFrame} utilisable tel quel par save_stream_tables.
+    """
+    tasks = {
+        "klines": (fetch_historical_data, {"symbol": symbol, "start_time": start_time}),
+        "order_book": (fetch_order_book, {"symbol": symbol}),
+        "funding_rate": (fetch_funding_rate, {"symbol": symbol}),
+        "trades": (fetch_aggregate_trades, {"symbol": symbol}),
+        "liquidations": (fetch_liquidations, {"symbol": symbol}),
+    }
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {stream: executor.submit(func, **kwargs) for stream, (func, kwargs) in tasks.items()}
+        return {stream: future.result() for stream, future in futures.items()}
+
 def save_combined_data(file_path, *dataframes):
     """
     Combine et sauvegarde plusieurs DataFrames dans un seul fichier CSV.
+    Format historique : préférer save_stream_tables (une table typée par flux).
     """
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     combined_df = pd.concat(dataframes, ignore_index=True)
@@ -149,10 +117,5 @@ def save_combined_data(file_path, *dataframes):
 
 if __name__ == "__main__":
     print("Récupération des données depuis Binance...")
-    historical_data = fetch_historical_data()
-    order_book_data = fetch_order_book()
-    funding_rate_data = fetch_funding_rate()
-    trades_data = fetch_aggregate_trades()
-    liquidations_data = fetch_liquidations()
-
-    save_combined_data("data/combined_data_PEPEUSDT.csv", historical_data, order_book_data, funding_rate_data, trades_data, liquidations_data)
\ No newline at end of file
+    snapshot = fetch_market_snapshot("PEPEUSDT")
+    save_stream_tables("PEPEUSDT", **snapshot)
\ No newline at end of file
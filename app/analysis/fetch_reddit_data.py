@@ -18,6 +18,7 @@ def fetch_reddit_data(subreddit="cryptocurrency", limit=100):
     data = []
     for post in subreddit.hot(limit=limit):
         data.append({
+            "item_id": post.id,
             "title": post.title,
             "score": post.score,
             "comments": post.num_comments,
@@ -30,10 +31,21 @@ def fetch_reddit_data(subreddit="cryptocurrency", limit=100):
 
 def save_reddit_to_csv(dataframe, file_path="data/reddit_data.csv"):
     """
-    Sauvegarde les données Reddit dans un fichier CSV.
+    Ajoute les données Reddit à un fichier CSV ; les posts déjà présents (même identifiant `item_id`) sont ignorés.
+    Deux posts distincts pointant vers la même URL sont conservés tous les deux.
     """
-    dataframe.to_csv(file_path, index=False)
-    print(f"Données Reddit sauvegardées dans {file_path}")
+    dataframe = dataframe.drop_duplicates("item_id")
+    if os.path.exists(file_path):
+        existing = pd.read_csv(file_path, dtype={"item_id": str})
+        if "item_id" not in existing.columns:
+            # Fichier d'un ancien format (sans identifiant) : réécrit une fois avec la colonne item_id
+            existing.insert(0, "item_id", None)
+            existing.to_csv(file_path, index=False)
+        dataframe = dataframe[~dataframe["item_id"].isin(set(existing["item_id"].dropna()))]
+        dataframe.reindex(columns=existing.columns).to_csv(file_path, mode="a", header=False, index=False)
+    else:
+        dataframe.to_csv(file_path, index=False)
+    print(f"{len(dataframe)} nouveaux posts Reddit sauvegardés dans {file_path}")
     print("Aperçu des données :")
     print(dataframe.head())
 
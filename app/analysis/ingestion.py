@@ -0,0 +1,223 @@
+import os
+import sqlite3
+import time
+
+import pandas as pd
+import requests
+
+# Base SQLite des éléments collectés (Reddit, flux RSS) et de l'état de chaque source
+INGESTION_DB_PATH = "data/ingestion.sqlite"
+
+ITEM_COLUMNS = ["source", "item_id", "title", "description", "url", "published", "score", "comments", "fetched_at"]
+
+_session = None
+
+
+def get_session():
+    """Session HTTP partagée (connexions keep-alive) pour les flux."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def _timestamp(value):
+    """Convertit une date (ISO 8601, RFC 822 ou timestamp Unix) en secondes Unix, None si illisible."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = pd.to_datetime(value, utc=True, errors="coerce")
+    return None if pd.isna(parsed) else parsed.timestamp()
+
+
+class IngestionStore:
+    """
+    Stockage indexé des éléments collectés.
+
+    Chaque élément est identifié par (source, item_id) — identifiant du post
+    Reddit, ou identifiant/URL de l'article — et n'est inséré qu'une fois.
+    Pour chaque source, la table `sources` conserve les validateurs HTTP
+    (ETag, Last-Modified) utilisés pour les requêtes conditionnelles des flux,
+    et la marque haute (date du plus récent post vu) du listing Reddit `new`.
+    """
+
+    def __init__(self, path=INGESTION_DB_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS items (
+                    source TEXT NOT NULL, item_id TEXT NOT NULL, title TEXT, description TEXT, url TEXT,
+                    published REAL, score INTEGER, comments INTEGER, fetched_at REAL,
+                    PRIMARY KEY (source, item_id)
+                );
+                CREATE INDEX IF NOT EXISTS items_published ON items (source, published);
+                CREATE INDEX IF NOT EXISTS items_url ON items (url);
+                CREATE TABLE IF NOT EXISTS sources (
+                    source TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, high_water REAL, last_checked REAL
+                );
+            """)
+
+    def source_state(self, source):
+        """:return: Dictionnaire {etag, last_modified, high_water, last_checked} (valeurs None si source inconnue)."""
+        row = self.connection.execute(
+            "SELECT etag, last_modified, high_water, last_checked FROM sources WHERE source = ?", (source,)
+        ).fetchone()
+        return dict(zip(("etag", "last_modified", "high_water", "last_checked"), row or (None,) * 4))
+
+    def update_source(self, source, **fields):
+        state = self.source_state(source)
+        state.update(fields)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                (source, state["etag"], state["last_modified"], state["high_water"], state["last_checked"]),
+            )
+
+    def add_items(self, source, items):
+        """
+        Insère les éléments absents du stockage.
+        :param items: Liste de dictionnaires avec au moins 'item_id'.
+        :return: Liste des éléments réellement ajoutés.
+        """
+        fetched_at = time.time()
+        added = []
+        with self.connection:
+            for item in items:
+                row = [source] + [item.get(column) for column in ITEM_COLUMNS[1:-1]] + [fetched_at]
+                cursor = self.connection.execute(f"INSERT OR IGNORE INTO items VALUES ({','.join('?' * len(row))})", row)
+                if cursor.rowcount:
+                    added.append(item)
+        return added
+
+    def items(self, source, since=None, limit=None):
+        """Éléments d'une source (publiés après `since`, en secondes Unix), du plus récent au plus ancien."""
+        query = "SELECT * FROM items WHERE source = ?"
+        params = [source]
+        if since is not None:
+            query += " AND published > ?"
+            params.append(since)
+        query += " ORDER BY published DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return pd.read_sql_query(query, self.connection, params=params)
+
+    def close(self):
+        self.connection.close()
+
+
+def _feed_item(item):
+    """Normalise un article de flux JSON (formats rss.app / JSON Feed et politepol)."""
+    url = item.get("url") or item.get("link")
+    return {
+        "item_id": str(item.get("id") or item.get("guid") or url),
+        "title": item.get("title"),
+        "description": item.get("description") or item.get("content_text") or item.get("summary"),
+        "url": url,
+        "published": _timestamp(item.get("datePublished") or item.get("date_published") or item.get("pubDate")),
+    }
+
+
+def ingest_feed(url, store=None, source=None, session=None, timeout=30):
+    """
+    Récupère un flux JSON avec une requête conditionnelle (If-None-Match / If-Modified-Since)
+    et n'ajoute au stockage que les articles jamais vus (par identifiant, quelle que soit leur
+    date : un article antidaté ou indexé en retard est conservé).
+    Si le flux n'a pas changé, le serveur répond 304 sans corps.
+    :param store: IngestionStore ; sans stockage, la base par défaut est ouverte puis refermée.
+    :param source: Nom de la source dans le stockage (par défaut l'URL).
+    :return: Liste des nouveaux articles (dictionnaires), du plus récent au plus ancien.
+    """
+    if store is None:
+        store = IngestionStore()
+        try:
+            return ingest_feed(url, store, source, session, timeout)
+        finally:
+            store.close()
+    source = source or url
+    session = session or get_session()
+    state = store.source_state(source)
+
+    headers = {}
+    if state["etag"]:
+        headers["If-None-Match"] = state["etag"]
+    if state["last_modified"]:
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            store.update_source(source, last_checked=time.time())
+            print(f"{source} : inchangé (304).")
+            return []
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Erreur lors de la récupération du flux {source} : {e}")
+        return []
+
+    items = [_feed_item(item) for item in data.get("items", [])]
+    added = store.add_items(source, items)  # Les articles déjà stockés sont ignorés par identifiant
+    store.update_source(
+        source,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        last_checked=time.time(),
+    )
+    print(f"{source} : {len(added)} nouveaux articles sur {len(items)}.")
+    return sorted(added, key=lambda item: item["published"] or 0, reverse=True)
+
+
+def ingest_reddit(store=None, subreddit="cryptocurrency", limit=100, reddit=None):
+    """
+    Ajoute au stockage les nouveaux posts d'un subreddit.
+    Les posts sont lus du plus récent au plus ancien (listing `new`, paginé par praw) et la lecture
+    s'arrête au premier post antérieur à la marque haute : tous les posts publiés depuis le dernier
+    passage sont téléchargés, quel que soit leur nombre. Les posts de la même seconde que la marque
+    sont relus, les doublons étant ignorés par identifiant.
+    :param store: IngestionStore ; sans stockage, la base par défaut est ouverte puis refermée.
+    :param limit: Nombre de posts lus au premier passage, tant qu'aucune marque haute n'existe.
+    :param reddit: Instance praw.Reddit (ou compatible) ; créée à partir de l'environnement si None.
+    :return: DataFrame des nouveaux posts (colonnes de fetch_reddit_data).
+    """
+    if store is None:
+        store = IngestionStore()
+        try:
+            return ingest_reddit(store, subreddit, limit, reddit)
+        finally:
+            store.close()
+    if reddit is None:
+        import praw
+
+        reddit = praw.Reddit(
+            client_id=os.getenv("REDDIT_CLIENT_ID"),
+            client_secret=os.getenv("REDDIT_SECRET"),
+            user_agent="crypto_trading_tool",
+        )
+    source = f"reddit/{subreddit}"
+    high_water = store.source_state(source)["high_water"]
+
+    posts = []
+    for post in reddit.subreddit(subreddit).new(limit=limit if high_water is None else None):
+        if high_water is not None and post.created_utc < high_water:
+            break
+        posts.append({
+            "item_id": post.id,
+            "title": post.title,
+            "url": post.url,
+            "published": float(post.created_utc),
+            "score": post.score,
+            "comments": post.num_comments,
+        })
+
+    added = store.add_items(source, posts)
+    newest = max([post["published"] for post in posts], default=high_water)
+    store.update_source(source, high_water=newest, last_checked=time.time())
+    print(f"{source} : {len(added)} nouveaux posts.")
+
+    df = pd.DataFrame(added, columns=["item_id", "title", "score", "comments", "published", "url"])
+    df = df.rename(columns={"published": "created"})
+    df["created"] = pd.to_datetime(df["created"], unit="s")
+    return df[["item_id", "title", "score", "comments", "created", "url"]]
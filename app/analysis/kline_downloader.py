@@ -0,0 +1,234 @@
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.analysis.binance_client import RequestWeightBudget, backoff_delay
+
+# Dossier racine des partitions : data/klines/<SYMBOL>/<interval>/<debut_ms>_<fin_ms>.parquet
+KLINES_ROOT = "data/klines"
+
+KLINE_COLUMNS = [
+    "timestamp", "open", "high", "low", "close", "volume", "close_time",
+    "quote_asset_volume", "number_of_trades", "taker_buy_base_asset_volume",
+    "taker_buy_quote_asset_volume", "ignore"
+]
+KLINE_DTYPES = {
+    "timestamp": np.int64, "open": np.float64, "high": np.float64, "low": np.float64,
+    "close": np.float64, "volume": np.float64, "close_time": np.int64,
+    "quote_asset_volume": np.float64, "number_of_trades": np.int64,
+    "taker_buy_base_asset_volume": np.float64, "taker_buy_quote_asset_volume": np.float64,
+}
+
+INTERVAL_MS = {
+    "1s": 1_000, "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000, "8h": 28_800_000,
+    "12h": 43_200_000, "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
+}
+# Décalage de la grille par rapport à l'époque Unix (un jeudi) : les bougies 1w s'ouvrent le lundi 00:00 UTC
+INTERVAL_OFFSET_MS = {"1w": 345_600_000}
+# Les bougies 1M n'ont pas de durée fixe : elles s'ouvrent le premier jour de chaque mois à 00:00 UTC
+CALENDAR_INTERVALS = {"1M"}
+
+BARS_PER_REQUEST = 1000  # Maximum accepté par GET /api/v3/klines
+KLINES_REQUEST_WEIGHT = 2  # Poids Binance d'une requête klines
+
+
+def parse_start_time(start_time):
+    """
+    Convertit "5 years ago UTC" ou une date en timestamp UTC (millisecondes).
+    Un timestamp déjà en millisecondes est retourné tel quel.
+    """
+    if isinstance(start_time, (int, np.integer)):
+        return int(start_time)
+    if "ago" in start_time:
+        years = int(start_time.split(" ")[0])
+        start_datetime = datetime.now(timezone.utc) - timedelta(days=years * 365)
+    else:
+        start_datetime = pd.to_datetime(start_time).tz_localize("UTC")
+    return int(start_datetime.timestamp() * 1000)
+
+
+def partition_dir(symbol, interval, root=KLINES_ROOT):
+    return os.path.join(root, symbol, interval)
+
+
+def _month_index(timestamp_ms):
+    """:return: Nombre de mois écoulés depuis janvier 1970 jusqu'au mois contenant timestamp_ms."""
+    moment = datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc)
+    return (moment.year - 1970) * 12 + moment.month - 1
+
+
+def _month_start_ms(index):
+    """:return: Début (ms, UTC) du mois numéro `index` depuis janvier 1970."""
+    return int(datetime(1970 + index // 12, index % 12 + 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def bar_open_ms(timestamp_ms, interval):
+    """:return: Heure d'ouverture (ms) de la bougie `interval` qui contient timestamp_ms."""
+    if interval in CALENDAR_INTERVALS:
+        return _month_start_ms(_month_index(timestamp_ms))
+    offset = INTERVAL_OFFSET_MS.get(interval, 0)
+    return timestamp_ms - (timestamp_ms - offset) % INTERVAL_MS[interval]
+
+
+def plan_chunks(start_ms, end_ms, interval):
+    """
+    Découpe [start_ms, end_ms) en tranches de BARS_PER_REQUEST bougies alignées sur une grille fixe,
+    pour que deux exécutions successives produisent les mêmes partitions. Pour 1M, la grille suit
+    le calendrier (tranches de BARS_PER_REQUEST mois).
+    :return: Liste de (debut_ms, fin_ms) avec fin exclusive.
+    """
+    if interval in CALENDAR_INTERVALS:
+        first = _month_index(start_ms) // BARS_PER_REQUEST * BARS_PER_REQUEST
+        return [(_month_start_ms(index), min(_month_start_ms(index + BARS_PER_REQUEST), end_ms))
+                for index in range(first, _month_index(end_ms - 1) + 1, BARS_PER_REQUEST)]
+    chunk_ms = INTERVAL_MS[interval] * BARS_PER_REQUEST
+    offset = INTERVAL_OFFSET_MS.get(interval, 0)
+    first = start_ms - (start_ms - offset) % chunk_ms
+    return [(chunk_start, min(chunk_start + chunk_ms, end_ms)) for chunk_start in range(first, end_ms, chunk_ms)]
+
+
+def existing_partitions(symbol, interval, root=KLINES_ROOT):
+    """
+    :return: Dictionnaire {debut_ms: fin_ms} des partitions déjà écrites.
+    """
+    partitions = {}
+    for path in glob.glob(os.path.join(partition_dir(symbol, interval, root), "*.parquet")):
+        start, end = os.path.splitext(os.path.basename(path))[0].split("_")
+        partitions[int(start)] = max(int(end), partitions.get(int(start), 0))
+    return partitions
+
+
+def missing_chunks(symbol, interval, start_ms, end_ms, root=KLINES_ROOT):
+    """
+    Tranches du plan qui ne sont pas encore couvertes (ou seulement partiellement) sur le disque.
+    """
+    partitions = existing_partitions(symbol, interval, root)
+    return [(start, end) for start, end in plan_chunks(start_ms, end_ms, interval) if partitions.get(start, 0) < end]
+
+
+def klines_to_frame(klines):
+    """Convertit la réponse brute de l'API en DataFrame typé."""
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS).drop(columns=["ignore"])
+    return df.astype(KLINE_DTYPES)
+
+
+def _fetch_chunk(client, budget, symbol, interval, chunk, retries, backoff):
+    start, end = chunk
+    for attempt in range(retries):
+        if budget is not None:
+            budget.acquire(KLINES_REQUEST_WEIGHT)
+        try:
+            return client.get_klines(
+                symbol=symbol, interval=interval, startTime=start, endTime=end - 1, limit=BARS_PER_REQUEST
+            )
+        except Exception as e:
+            if attempt + 1 == retries:
+                raise
+            delay = backoff_delay(attempt, backoff)
+            print(f"Tranche {start}: échec {attempt + 1}/{retries} ({e}). Nouvelle tentative dans {delay:.1f} s...")
+            time.sleep(delay)
+
+
+def _write_partition(df, symbol, interval, chunk, root):
+    folder = partition_dir(symbol, interval, root)
+    os.makedirs(folder, exist_ok=True)
+    start, end = chunk
+    path = os.path.join(folder, f"{start}_{end}.parquet")
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)  # Écriture atomique : une tranche est complète ou absente
+    # Une partition plus courte pour la même tranche (fin de plage précédente) est remplacée
+    for old_path in glob.glob(os.path.join(folder, f"{start}_*.parquet")):
+        if old_path != path:
+            os.remove(old_path)
+    return path
+
+
+def download_klines(client, symbol="PEPEUSDT", interval="1m", start_time="5 years ago UTC", end_ms=None,
+                    root=KLINES_ROOT, max_workers=8, weight_per_minute=1200, retries=5, backoff=1.0):
+    """
+    Télécharge les bougies manquantes en parallèle et écrit chaque tranche dans sa propre partition Parquet.
+    Une exécution interrompue peut être relancée : seules les tranches absentes sont récupérées.
+    :param client: Client Binance (BinanceRestClient, binance.client.Client ou compatible).
+    :param start_time: "5 years ago UTC", une date ou un timestamp en millisecondes (voir parse_start_time).
+    :param max_workers: Nombre de requêtes simultanées.
+    :param weight_per_minute: Budget de poids Binance consommé par minute par ce téléchargement,
+                              si le client ne limite pas déjà lui-même ses requêtes (weight_budget).
+    :param retries: Tentatives par tranche, si le client ne réessaie pas déjà lui-même.
+    :return: Nombre de tranches téléchargées.
+    :raises: La première erreur d'une tranche, une fois les tranches déjà reçues écrites ; les tranches
+             pas encore commencées sont annulées et seront récupérées à la prochaine exécution.
+    """
+    start_ms = parse_start_time(start_time)
+    if end_ms is None:
+        end_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    end_ms = bar_open_ms(end_ms, interval)  # Ignorer la bougie en cours
+
+    chunks = missing_chunks(symbol, interval, start_ms, end_ms, root)
+    total = len(plan_chunks(start_ms, end_ms, interval))
+    print(f"{symbol} {interval} : {len(chunks)} tranches à télécharger sur {total}.")
+    if not chunks:
+        return 0
+
+    # BinanceRestClient applique déjà son propre budget partagé et ses propres tentatives à chaque requête
+    self_managed = hasattr(client, "weight_budget")
+    budget = None if self_managed else RequestWeightBudget(weight_per_minute)
+    retries = 1 if self_managed else retries
+    done = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_fetch_chunk, client, budget, symbol, interval, chunk, retries, backoff): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            chunk = futures[future]
+            try:
+                klines = future.result()
+            except Exception as e:
+                if not failed:
+                    # Ne pas dépenser de poids pour des tranches qui ne seraient pas écrites
+                    for pending in futures:
+                        pending.cancel()
+                failed.append((chunk, e))
+                continue
+            _write_partition(klines_to_frame(klines), symbol, interval, chunk, root)
+            done += 1
+            if done % 100 == 0 or done == len(chunks):
+                print(f"{symbol} {interval} : {done}/{len(chunks)} tranches écrites.")
+    if failed:
+        ranges = ", ".join(f"{start}-{end}" for (start, end), _ in sorted(failed, key=lambda item: item[0]))
+        print(f"{symbol} {interval} : {done} tranches écrites, échec de {ranges} ; "
+              f"{len(chunks) - done} tranches à reprendre à la prochaine exécution.")
+        raise failed[0][1]
+    return done
+
+
+def load_klines(symbol="PEPEUSDT", interval="1m", start_ms=None, end_ms=None, root=KLINES_ROOT):
+    """
+    Relit les partitions d'une paire, éventuellement restreintes à [start_ms, end_ms).
+    Seules les partitions qui recoupent la plage demandée sont lues.
+    """
+    frames = []
+    for start, end in sorted(existing_partitions(symbol, interval, root).items()):
+        if (end_ms is not None and start >= end_ms) or (start_ms is not None and end <= start_ms):
+            continue
+        path = os.path.join(partition_dir(symbol, interval, root), f"{start}_{end}.parquet")
+        frames.append(pd.read_parquet(path))
+    if not frames:
+        return pd.DataFrame(columns=list(KLINE_DTYPES)).astype(KLINE_DTYPES)
+
+    df = pd.concat(frames, ignore_index=True).drop_duplicates("timestamp").sort_values("timestamp")
+    if start_ms is not None:
+        df = df[df["timestamp"] >= start_ms]
+    if end_ms is not None:
+        df = df[df["timestamp"] < end_ms]
+    return df.reset_index(drop=True)
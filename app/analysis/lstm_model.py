@@ -7,7 +7,11 @@ class LSTMModel:
     def __init__(self, input_shape):
         """
         Initialise un modèle LSTM avec la forme d'entrée spécifiée.
+        :param input_shape: (sequence_length, n_features) ; n_features = 1 pour la clôture seule,
+                            plus pour les tenseurs de feature_pipeline.prepare_feature_data.
         """
+        if isinstance(input_shape, int):
+            input_shape = (input_shape, 1)
         self.model = tf.keras.Sequential([
             tf.keras.layers.Input(shape=input_shape),
             tf.keras.layers.LSTM(50, return_sequences=True),
@@ -15,6 +19,7 @@ class LSTMModel:
             tf.keras.layers.Dense(1)
         ])
         self.model.compile(optimizer='adam', loss='mean_squared_error')
+        self._inference_fn = None
 
     def train(self, X_train, y_train, X_val, y_val, epochs=10, batch_size=32, checkpoint_path="models/lstm_checkpoint.h5"):
         """
@@ -39,12 +44,38 @@ class LSTMModel:
         )
         return history
 
+    @property
+    def n_features(self):
+        """Nombre de features par pas de temps attendu par le modèle."""
+        return self.model.input_shape[-1]
+
     def predict(self, X):
         """
         Fait des prédictions à l'aide du modèle.
         """
         return self.model.predict(X)
 
+    def compile_inference(self):
+        """
+        Prépare la fonction d'inférence basse latence utilisée par `predict_fast`.
+        """
+        self._inference_fn = build_inference_fn(self.model)
+        return self._inference_fn
+
+    def predict_fast(self, X):
+        """
+        Fait des prédictions via le graphe compilé, sans passer par `model.predict`.
+        """
+        if self._inference_fn is None:
+            self.compile_inference()
+        return self._inference_fn(X)
+
+    def export_inference(self, path):
+        """
+        Exporte un artefact d'inférence (SavedModel) chargeable sans Keras.
+        """
+        export_inference_artifact(self.model, path)
+
     def save_model(self, path):
         """
         Sauvegarde le modèle dans le chemin spécifié.
@@ -57,6 +88,7 @@ class LSTMModel:
         Charge un modèle depuis le chemin spécifié.
         """
         self.model = tf.keras.models.load_model(path)
+        self._inference_fn = None
         print(f"Modèle chargé depuis le fichier : {path}")
 
     @staticmethod
@@ -81,4 +113,50 @@ class LSTMModel:
             batch_size=batch_size,
             callbacks=[checkpoint_callback]
         )
-        return model, history
\ No newline at end of file
+        return model, history
+
+def build_inference_fn(model):
+    """
+    Compile l'appel direct du modèle en `tf.function` avec une signature d'entrée fixe.
+
+    Contrairement à `model.predict`, aucun adaptateur de données ni boucle de
+    prédiction n'est construit à chaque appel : le graphe est tracé une seule
+    fois (dimension de batch variable) puis réutilisé.
+    :param model: Modèle Keras chargé.
+    :return: Fonction prenant un tableau NumPy (batch, seq_length, features) et retournant un tableau NumPy.
+    """
+    signature = [tf.TensorSpec(shape=(None,) + tuple(model.input_shape[1:]), dtype=tf.float32)]
+
+    @tf.function(input_signature=signature)
+    def serve(x):
+        return model(x, training=False)
+
+    def predict(X):
+        return serve(tf.convert_to_tensor(X, dtype=tf.float32)).numpy()
+
+    return predict
+
+
+def export_inference_artifact(model, path):
+    """
+    Exporte le modèle au format SavedModel (signature `serve`) à côté du fichier .keras.
+    :param model: Modèle Keras chargé.
+    :param path: Dossier de destination (ex. "models/lstm_model_serving").
+    """
+    model.export(path)
+    print(f"Artefact d'inférence exporté dans le dossier : {path}")
+
+
+def load_inference_artifact(path):
+    """
+    Charge un artefact SavedModel avec `tf.saved_model.load`, sans reconstruire le modèle Keras.
+    :param path: Dossier créé par `export_inference_artifact`.
+    :return: Fonction prenant un tableau NumPy et retournant un tableau NumPy.
+    """
+    artifact = tf.saved_model.load(path)
+
+    def predict(X):
+        # La référence à `artifact` garde ses variables en vie
+        return artifact.serve(tf.convert_to_tensor(X, dtype=tf.float32)).numpy()
+
+    return predict
@@ -0,0 +1,197 @@
+import json
+
+import numpy as np
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(x / 6.0 + 0.5, 0.0, 1.0)
+
+
+ACTIVATIONS = {
+    "sigmoid": _sigmoid,
+    "hard_sigmoid": _hard_sigmoid,
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "linear": lambda x: x,
+}
+
+
+def export_weights_npz(model, npz_path):
+    """
+    Exporte l'architecture et les poids d'un modèle Keras séquentiel dans un fichier .npz.
+    Seule cette étape nécessite TensorFlow ; le fichier produit se charge avec NumPy uniquement.
+    :param model: Modèle Keras chargé, ou chemin vers un fichier .keras.
+    :param npz_path: Chemin du fichier .npz à créer (ex. "models/lstm_model.npz").
+    """
+    if isinstance(model, str):
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model)
+
+    layers = []
+    arrays = {}
+    for layer in model.layers:
+        kind = type(layer).__name__
+        config = layer.get_config()
+        if kind == "LSTM":
+            kernel, recurrent_kernel, bias = layer.get_weights()
+            spec = {
+                "type": "lstm",
+                "units": config["units"],
+                "activation": config["activation"],
+                "recurrent_activation": config["recurrent_activation"],
+                "return_sequences": config["return_sequences"],
+            }
+            weights = {"kernel": kernel, "recurrent_kernel": recurrent_kernel, "bias": bias}
+        elif kind == "Dense":
+            kernel, bias = layer.get_weights()
+            spec = {"type": "dense", "units": config["units"], "activation": config["activation"]}
+            weights = {"kernel": kernel, "bias": bias}
+        elif kind in ("Dropout", "InputLayer"):
+            # Sans effet en inférence
+            continue
+        else:
+            raise ValueError(f"Couche non supportée pour l'export NumPy : {kind}")
+
+        index = len(layers)
+        for name, value in weights.items():
+            arrays[f"{index}_{name}"] = value.astype(np.float32)
+        layers.append(spec)
+
+    architecture = {"input_shape": list(model.input_shape[1:]), "layers": layers}
+    np.savez(npz_path, architecture=np.array(json.dumps(architecture)), **arrays)
+    print(f"Poids exportés dans le fichier : {npz_path}")
+
+
+class NumpyLSTMModel:
+    """
+    Implémentation NumPy (sans TensorFlow) de l'inférence des modèles LSTM du projet :
+    empilement de couches LSTM puis de couches Dense (ex. LSTM(50) -> LSTM(50) -> Dense(25, relu) -> Dense(1)).
+    Les portes suivent l'ordre de Keras : entrée, oubli, cellule, sortie.
+    """
+
+    def __init__(self, architecture, weights):
+        self.input_shape = tuple(architecture["input_shape"])
+        self.layers = []
+        for index, spec in enumerate(architecture["layers"]):
+            layer = dict(spec)
+            layer["kernel"] = weights[f"{index}_kernel"]
+            layer["bias"] = weights[f"{index}_bias"]
+            if spec["type"] == "lstm":
+                layer["recurrent_kernel"] = weights[f"{index}_recurrent_kernel"]
+                layer["recurrent_activation_fn"] = ACTIVATIONS[spec["recurrent_activation"]]
+            layer["activation_fn"] = ACTIVATIONS[spec["activation"]]
+            self.layers.append(layer)
+
+    @classmethod
+    def load(cls, npz_path):
+        """
+        Charge un modèle exporté par `export_weights_npz`.
+        """
+        with np.load(npz_path) as data:
+            architecture = json.loads(str(data["architecture"]))
+            weights = {name: data[name] for name in data.files if name != "architecture"}
+        print(f"Modèle NumPy chargé depuis le fichier : {npz_path}")
+        return cls(architecture, weights)
+
+    def predict(self, X):
+        """
+        Fait des prédictions sur un batch de séquences.
+        :param X: Tableau (batch, seq_length, features).
+        :return: Tableau (batch, sorties).
+        """
+        out = np.asarray(X, dtype=np.float32)
+        for layer in self.layers:
+            if layer["type"] == "lstm":
+                out = self._lstm_forward(layer, out)
+            else:
+                out = layer["activation_fn"](out @ layer["kernel"] + layer["bias"])
+        return out
+
+    def _lstm_forward(self, layer, X):
+        batch, steps, _ = X.shape
+        units = layer["units"]
+        # Projection des entrées calculée en une seule fois pour tous les pas de temps
+        projected = X @ layer["kernel"] + layer["bias"]
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        sequences = np.empty((batch, steps, units), dtype=np.float32) if layer["return_sequences"] else None
+        for t in range(steps):
+            h, c = self._lstm_cell(layer, projected[:, t], h, c)
+            if sequences is not None:
+                sequences[:, t] = h
+        return sequences if sequences is not None else h
+
+    @staticmethod
+    def _lstm_cell(layer, projected_input, h, c):
+        units = layer["units"]
+        z = projected_input + h @ layer["recurrent_kernel"]
+        i = layer["recurrent_activation_fn"](z[:, :units])
+        f = layer["recurrent_activation_fn"](z[:, units:2 * units])
+        g = layer["activation_fn"](z[:, 2 * units:3 * units])
+        o = layer["recurrent_activation_fn"](z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * layer["activation_fn"](c)
+        return h, c
+
+    def init_state(self, batch_size=1):
+        """
+        Crée un état (h, c) nul pour chaque couche LSTM, utilisé par `step`.
+        """
+        return [
+            (np.zeros((batch_size, layer["units"]), dtype=np.float32),
+             np.zeros((batch_size, layer["units"]), dtype=np.float32))
+            for layer in self.layers if layer["type"] == "lstm"
+        ]
+
+    def step(self, x, state):
+        """
+        Avance le modèle d'un seul pas de temps en réutilisant l'état caché (mode stateful).
+
+        Coût constant par tick au lieu de rejouer les `seq_length` pas. L'état
+        accumule tout l'historique depuis `init_state` : le résultat n'est donc
+        identique à `predict` sur la fenêtre glissante que pendant les
+        `seq_length` premiers pas.
+        :param x: Tableau (batch, features) du nouveau pas de temps.
+        :param state: État retourné par `init_state` ou par l'appel précédent.
+        :return: (prédictions (batch, sorties), nouvel état).
+        """
+        out = np.asarray(x, dtype=np.float32)
+        new_state = []
+        lstm_index = 0
+        for layer in self.layers:
+            if layer["type"] == "lstm":
+                h, c = state[lstm_index]
+                h, c = self._lstm_cell(layer, out @ layer["kernel"] + layer["bias"], h, c)
+                new_state.append((h, c))
+                lstm_index += 1
+                out = h
+            else:
+                out = layer["activation_fn"](out @ layer["kernel"] + layer["bias"])
+        return out, new_state
+
+
+def compare_with_keras(keras_model, numpy_model, samples=64, seed=0):
+    """
+    Compare les sorties Keras et NumPy sur des séquences aléatoires.
+    :return: Écart absolu maximal entre les deux implémentations.
+    """
+    X = np.random.default_rng(seed).random((samples,) + numpy_model.input_shape, dtype=np.float32)
+    expected = keras_model.predict(X, verbose=0)
+    return float(np.abs(expected - numpy_model.predict(X)).max())
+
+
+if __name__ == "__main__":
+    import sys
+
+    import tensorflow as tf
+
+    keras_path = sys.argv[1] if len(sys.argv) > 1 else "models/lstm_model.keras"
+    npz_path = sys.argv[2] if len(sys.argv) > 2 else keras_path.replace(".keras", ".npz")
+    keras_model = tf.keras.models.load_model(keras_path)
+    export_weights_npz(keras_model, npz_path)
+    max_error = compare_with_keras(keras_model, NumpyLSTMModel.load(npz_path))
+    print(f"Écart maximal Keras / NumPy : {max_error:.2e}")
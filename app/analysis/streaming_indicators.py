@@ -0,0 +1,125 @@
+class StreamingEMA:
+    """
+    EMA incrémentale en O(1) par nouvelle clôture, identique à `ta.ema` :
+    la première valeur est la moyenne simple des `length` premières clôtures,
+    puis ema = alpha * close + (1 - alpha) * ema_précédente avec alpha = 2 / (length + 1).
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2.0 / (length + 1)
+        self.value = None  # None tant que `length` clôtures n'ont pas été reçues
+        self._warmup_sum = 0.0
+        self._count = 0
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def update(self, close):
+        """
+        Ajoute une clôture.
+        :return: Nouvelle valeur de l'EMA, ou None pendant la période de chauffe.
+        """
+        self._count += 1
+        if self.value is None:
+            self._warmup_sum += close
+            if self._count == self.length:
+                self.value = self._warmup_sum / self.length
+        else:
+            self.value = self.alpha * close + (1.0 - self.alpha) * self.value
+        return self.value
+
+    def seed(self, prices):
+        """Initialise l'état à partir d'un historique de clôtures."""
+        for close in prices:
+            self.update(close)
+        return self
+
+
+class StreamingRSI:
+    """
+    RSI incrémental en O(1) par nouvelle clôture, identique à `TechnicalIndicators.calculate_rsi`.
+
+    Les moyennes des hausses et des baisses utilisent le lissage de Wilder
+    (alpha = 1 / period) sous la forme pondérée de `ta.rsi` (ewm ajustée) :
+    on maintient la somme pondérée et la somme des poids, mises à jour en
+    temps constant.
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.decay = 1.0 - 1.0 / period
+        self.value = 0.0  # 0 pendant la période de chauffe, comme la version batch
+        self._previous = None
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._count = 0  # Nombre de variations reçues
+
+    @property
+    def ready(self):
+        return self._count >= self.period
+
+    def update(self, close):
+        """
+        Ajoute une clôture.
+        :return: Nouvelle valeur du RSI (0 tant que `period` variations n'ont pas été reçues).
+        """
+        if self._previous is not None:
+            change = close - self._previous
+            self._gain_sum = self._gain_sum * self.decay + max(change, 0.0)
+            self._loss_sum = self._loss_sum * self.decay + max(-change, 0.0)
+            self._count += 1
+            if self.ready:
+                total = self._gain_sum + self._loss_sum
+                self.value = 100.0 * self._gain_sum / total if total > 0 else 0.0
+        self._previous = close
+        return self.value
+
+    def seed(self, prices):
+        """Initialise l'état à partir d'un historique de clôtures."""
+        for close in prices:
+            self.update(close)
+        return self
+
+
+class StreamingMACD:
+    """
+    MACD incrémental en O(1) par nouvelle clôture, identique à `TechnicalIndicators.calculate_macd` :
+    MACD = EMA(fast) - EMA(slow), Signal = EMA(signal) du MACD, Histogram = MACD - Signal.
+    """
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast_ema = StreamingEMA(fast)
+        self.slow_ema = StreamingEMA(slow)
+        self.signal_ema = StreamingEMA(signal)
+        # 0 pendant la période de chauffe, comme la version batch
+        self.macd = 0.0
+        self.signal = 0.0
+        self.histogram = 0.0
+
+    @property
+    def ready(self):
+        return self.signal_ema.ready
+
+    def update(self, close):
+        """
+        Ajoute une clôture.
+        :return: Tuple (MACD, Signal, Histogram).
+        """
+        fast = self.fast_ema.update(close)
+        slow = self.slow_ema.update(close)
+        if fast is not None and slow is not None:
+            self.macd = fast - slow
+            signal = self.signal_ema.update(self.macd)
+            if signal is not None:
+                self.signal = signal
+                self.histogram = self.macd - signal
+        return self.macd, self.signal, self.histogram
+
+    def seed(self, prices):
+        """Initialise l'état à partir d'un historique de clôtures."""
+        for close in prices:
+            self.update(close)
+        return self
+
@@ -1,81 +1,238 @@
+import glob
+import hashlib
+import json
 import os
+import shutil
+import time
+
 import numpy as np
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.callbacks import EarlyStopping
-from app.analysis.data_preparation import prepare_data
+import pandas as pd
+
+from app.analysis.data_preparation import (apply_scaler, load_scaler, make_tf_dataset, normalize_series, save_scaler,
+                                           scaler_path_for)
 
 # Paramètres
 DATA_FOLDER = "data"  # Chemin vers le dossier contenant les fichiers CSV
 SEQUENCE_LENGTH = 50
-EPOCHS = 50
+EPOCHS = 50  # Premier entraînement
+FINE_TUNE_EPOCHS = 5  # Mises à jour incrémentales
 BATCH_SIZE = 32
+VALIDATION_FRACTION = 0.2
 MODEL_PATH = "models/lstm_model.keras"
-TRAINED_FILES_LOG = "trained_files.log"
-
-# Charger la liste des fichiers déjà utilisés
-def load_trained_files_log(log_path):
-    if os.path.exists(log_path):
-        with open(log_path, "r") as f:
-            return set(f.read().splitlines())
-    return set()
-
-# Sauvegarder la liste des fichiers déjà utilisés
-def save_trained_files_log(log_path, trained_files):
-    with open(log_path, "w") as f:
-        f.write("\n".join(trained_files))
-
-# Charger les fichiers déjà utilisés
-trained_files = load_trained_files_log(TRAINED_FILES_LOG)
-
-# Charger et préparer les nouvelles données
-print("Chargement et préparation des données...")
-X, y, scaler, new_files = prepare_data(DATA_FOLDER, sequence_length=SEQUENCE_LENGTH, exclude_files=trained_files)
-
-# Vérifier si de nouvelles données existent
-if not new_files:
-    print("Aucune nouvelle donnée à entraîner. Fin du script.")
-    exit()
-
-print(f"Fichiers ajoutés : {new_files}")
-print(f"Dimensions des données : X={X.shape}, y={y.shape}")
-
-# Charger le modèle existant ou en créer un nouveau
-if os.path.exists(MODEL_PATH):
-    print("Chargement du modèle existant...")
-    model = load_model(MODEL_PATH)
-else:
-    print("Construction d'un nouveau modèle LSTM...")
+TRAINED_FILES_LOG = "trained_files.log"  # Ancien suivi par nom de fichier du modèle principal, repris dans le manifeste
+
+
+def _hash_values(values):
+    return hashlib.sha256(np.ascontiguousarray(values).tobytes()).hexdigest()
+
+
+def training_paths(model_path=MODEL_PATH):
+    """
+    Fichiers accompagnant un modèle, dérivés de son chemin (models/lstm_model.keras -> models/lstm_model_*) :
+    deux modèles entraînés séparément ne partagent ni scaler, ni manifeste, ni état de reprise.
+    """
+    base = os.path.splitext(model_path)[0]
+    return {
+        "npz": base + ".npz",  # Poids pour le backend NumPy
+        "scaler": scaler_path_for(model_path),  # Figé avec le modèle : jamais réajusté lors des mises à jour
+        "manifest": base + "_manifest.json",
+        "checkpoint": base + "_checkpoint.keras",
+        "backup": base + "_backup",  # État d'un entraînement interrompu (reprise à l'époque suivante)
+    }
+
+
+def load_manifest(path, legacy_log=None):
+    """
+    Charge le manifeste des données apprises : empreinte, nombre de lignes et plage de temps par fichier.
+    Sans manifeste, les fichiers listés dans l'ancien suivi `legacy_log` sont considérés comme appris.
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    manifest = {"files": {}, "runs": []}
+    if legacy_log and os.path.exists(legacy_log):
+        with open(legacy_log) as f:
+            for name in filter(None, f.read().splitlines()):
+                manifest["files"][name] = {"legacy": True}
+    return manifest
+
+
+def save_manifest(manifest, path):
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def load_file_series(path):
+    """
+    Charge les clôtures (float32) d'un fichier CSV, et sa plage de temps si une colonne 'timestamp' existe.
+    :return: (série, (début, fin) ou None), ou (None, None) si le fichier n'a pas de colonne 'close'.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    if "close" not in header:
+        return None, None
+    columns = ["close"] + (["timestamp"] if "timestamp" in header else [])
+    df = pd.read_csv(path, usecols=columns, dtype={"close": np.float32}).dropna(subset=["close"])
+    time_range = None
+    if "timestamp" in df.columns and len(df):
+        time_range = (str(df["timestamp"].iloc[0]), str(df["timestamp"].iloc[-1]))
+    return df["close"].to_numpy(), time_range
+
+
+def plan_increment(data_folder, manifest, sequence_length=SEQUENCE_LENGTH):
+    """
+    Compare les fichiers du dossier au manifeste (empreintes de contenu) et retourne les segments à apprendre.
+    Un fichier complété par de nouvelles lignes ne fournit que ses nouvelles fenêtres (avec
+    `sequence_length` lignes de contexte) ; un fichier nouveau ou réécrit est appris en entier.
+    :return: Liste de dictionnaires {path, series, start, fingerprint}.
+    """
+    segments = []
+    for path in sorted(glob.glob(f"{data_folder}/*.csv")):
+        series, time_range = load_file_series(path)
+        if series is None or len(series) <= sequence_length:
+            continue
+        fingerprint = {"hash": _hash_values(series), "rows": len(series), "time_range": time_range}
+        known = manifest["files"].get(os.path.basename(path))
+        if known and known.get("legacy"):
+            manifest["files"][os.path.basename(path)] = fingerprint  # Appris avant le manifeste
+            continue
+        if known and known["hash"] == fingerprint["hash"]:
+            continue  # Contenu déjà appris
+
+        start = 0
+        if known and known["rows"] < len(series) and _hash_values(series[:known["rows"]]) == known["hash"]:
+            start = known["rows"] - sequence_length  # Ajout en fin de fichier : seules les nouvelles fenêtres
+        segments.append({"path": path, "series": series, "start": start, "fingerprint": fingerprint})
+    return segments
+
+
+def build_model(sequence_length=SEQUENCE_LENGTH, n_features=1, units=50, dropout=0.2):
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+
     model = Sequential([
-        LSTM(50, return_sequences=True, input_shape=(SEQUENCE_LENGTH, 1)),
-        Dropout(0.2),
-        LSTM(50, return_sequences=False),
-        Dropout(0.2),
-        Dense(25, activation="relu"),
+        Input(shape=(sequence_length, n_features)),
+        LSTM(units, return_sequences=True),
+        Dropout(dropout),
+        LSTM(units, return_sequences=False),
+        Dropout(dropout),
+        Dense(max(units // 2, 1), activation="relu"),
         Dense(1)
     ])
     model.compile(optimizer="adam", loss="mean_squared_error")
-    print(model.summary())
-
-# Entraîner le modèle
-print("Début de l'entraînement...")
-early_stopping = EarlyStopping(monitor="val_loss", patience=10, restore_best_weights=True)
-
-history = model.fit(
-    X, y,
-    epochs=EPOCHS,
-    batch_size=BATCH_SIZE,
-    validation_split=0.2,
-    callbacks=[early_stopping],
-    verbose=1
-)
-
-# Sauvegarder le modèle
-print(f"Sauvegarde du modèle dans {MODEL_PATH}...")
-model.save(MODEL_PATH)
-
-# Mettre à jour la liste des fichiers déjà utilisés
-trained_files.update(new_files)
-save_trained_files_log(TRAINED_FILES_LOG, trained_files)
-
-print("Entraînement terminé et modèle sauvegardé.")
\ No newline at end of file
+    return model
+
+
+def _segment_datasets(segments, sequence_length, batch_size):
+    """
+    Pipelines tf.data (découpage à la volée, préchargement) des nouvelles fenêtres.
+    Les fenêtres ne traversent pas les limites de fichiers ; les dernières fenêtres
+    de chaque segment (ordre chronologique) servent à la validation.
+    """
+    train, validation = None, None
+    for segment in segments:
+        series = segment["normalized"][segment["start"]:]
+        n_windows = len(series) - sequence_length
+        split = int(n_windows * (1 - VALIDATION_FRACTION))
+        parts = [(series[:split + sequence_length], True), (series[split:], False)]
+        for part, is_train in parts:
+            if len(part) <= sequence_length:
+                continue
+            dataset = make_tf_dataset(part, sequence_length, batch_size, shuffle=is_train)
+            if is_train:
+                train = dataset if train is None else train.concatenate(dataset)
+            else:
+                validation = dataset if validation is None else validation.concatenate(dataset)
+    return train, validation
+
+
+def train_incremental(data_folder=DATA_FOLDER, model_path=MODEL_PATH, epochs=None, batch_size=BATCH_SIZE,
+                      sequence_length=SEQUENCE_LENGTH, full_retrain=False):
+    """
+    Entraîne le modèle sur les données arrivées depuis le dernier entraînement.
+    Premier entraînement : ajustement du scaler (sauvegardé avec le modèle) et `EPOCHS` époques.
+    Ensuite : le modèle et le scaler existants sont rechargés et seules les nouvelles fenêtres
+    sont apprises pendant `FINE_TUNE_EPOCHS` époques. Un entraînement interrompu reprend à
+    l'époque suivante (BackupAndRestore) ; le meilleur état est conservé dans le checkpoint.
+    Scaler, manifeste, checkpoint et état de reprise sont propres au modèle (voir training_paths).
+    :param full_retrain: Ignore le manifeste, le scaler, le modèle et l'état de reprise existants.
+    :return: Historique Keras, ou None s'il n'y a aucune nouvelle donnée.
+    """
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import BackupAndRestore, EarlyStopping, ModelCheckpoint
+
+    os.makedirs(os.path.dirname(model_path) or ".", exist_ok=True)
+    paths = training_paths(model_path)
+    if full_retrain:
+        shutil.rmtree(paths["backup"], ignore_errors=True)  # Ne pas reprendre un entraînement précédent
+    manifest = {"files": {}, "runs": []} if full_retrain else load_manifest(
+        paths["manifest"], TRAINED_FILES_LOG if model_path == MODEL_PATH else None)
+    print("Recherche des nouvelles données...")
+    segments = plan_increment(data_folder, manifest, sequence_length)
+    if not segments:
+        if manifest["files"]:
+            save_manifest(manifest, paths["manifest"])
+        print("Aucune nouvelle donnée à entraîner. Fin du script.")
+        return None
+
+    scaler = None if full_retrain else load_scaler(paths["scaler"])
+    resume = not full_retrain and os.path.exists(model_path)
+    if scaler is None:
+        # Premier entraînement (ou ancien modèle sans scaler sauvegardé) : ajustement sur les nouvelles clôtures
+        all_series = np.concatenate([segment["series"] for segment in segments])
+        _, scaler = normalize_series(all_series.copy())
+        save_scaler(scaler, paths["scaler"])
+    for segment in segments:
+        segment["normalized"] = apply_scaler(segment["series"].copy(), scaler)
+
+    new_windows = sum(len(segment["series"]) - segment["start"] - sequence_length for segment in segments)
+    print(f"Fichiers à apprendre : {[os.path.basename(segment['path']) for segment in segments]}")
+    print(f"Nouvelles fenêtres : {new_windows}")
+
+    if resume:
+        print("Chargement du modèle existant (mise à jour incrémentale)...")
+        model = tf.keras.models.load_model(model_path)
+        epochs = epochs or FINE_TUNE_EPOCHS
+    else:
+        print("Construction d'un nouveau modèle LSTM...")
+        model = build_model(sequence_length)
+        model.summary()
+        epochs = epochs or EPOCHS
+
+    train_dataset, validation_dataset = _segment_datasets(segments, sequence_length, batch_size)
+    monitor = "val_loss" if validation_dataset is not None else "loss"
+    callbacks = [
+        BackupAndRestore(backup_dir=paths["backup"]),
+        ModelCheckpoint(filepath=paths["checkpoint"], save_best_only=True, monitor=monitor, mode="min", verbose=1),
+        EarlyStopping(monitor=monitor, patience=10, restore_best_weights=True),
+    ]
+
+    print("Début de l'entraînement...")
+    started = time.time()
+    history = model.fit(train_dataset, validation_data=validation_dataset, epochs=epochs,
+                        callbacks=callbacks, verbose=1)
+
+    # Sauvegarder le modèle (et ses poids NumPy pour le backend sans TensorFlow)
+    print(f"Sauvegarde du modèle dans {model_path}...")
+    model.save(model_path)
+    from app.analysis.numpy_lstm import export_weights_npz
+    export_weights_npz(model, paths["npz"])
+
+    # Le manifeste n'est mis à jour qu'après un entraînement complet
+    for segment in segments:
+        manifest["files"][os.path.basename(segment["path"])] = segment["fingerprint"]
+    manifest["runs"].append({
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "mode": "fine-tune" if resume else "full",
+        "windows": int(new_windows),
+        "epochs": len(history.history["loss"]),
+        "seconds": round(time.time() - started, 1),
+        "final_loss": float(history.history["loss"][-1]),
+    })
+    save_manifest(manifest, paths["manifest"])
+    print("Entraînement terminé et modèle sauvegardé.")
+    return history
+
+
+if __name__ == "__main__":
+    train_incremental()
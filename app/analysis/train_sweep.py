@@ -0,0 +1,242 @@
+import glob
+import itertools
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from app.analysis.data_preparation import apply_scaler, normalize_series, save_scaler
+from app.analysis.train_lstm import DATA_FOLDER, VALIDATION_FRACTION, _hash_values, build_model, load_file_series
+
+SWEEP_DIR = "models/sweep"  # dataset/ (série mappée en mémoire), checkpoints/, results.csv, best.keras
+EPOCHS = 10
+PATIENCE = 3
+
+# --- Jeu de données partagé ---
+
+
+def prepare_sweep_dataset(data_folder=DATA_FOLDER, output_dir=os.path.join(SWEEP_DIR, "dataset")):
+    """
+    Prépare une seule fois les données du balayage : les clôtures de tous les fichiers CSV sont
+    normalisées (scaler ajusté sur l'ensemble) et écrites bout à bout dans series.npy, avec les
+    limites de chaque fichier dans meta.json. Les fenêtres ne sont jamais matérialisées : chaque
+    configuration les découpe à la volée sur la série mappée en mémoire, quelle que soit sa
+    longueur de séquence. Le jeu existant est réutilisé si les fichiers n'ont pas changé.
+    :return: Dossier du jeu de données.
+    """
+    paths = sorted(glob.glob(f"{data_folder}/*.csv"))
+    parts, files = [], []
+    for path in paths:
+        series, _ = load_file_series(path)
+        if series is None or len(series) < 2:
+            continue
+        parts.append(series)
+        files.append({"name": os.path.basename(path), "rows": len(series), "hash": _hash_values(series)})
+    if not parts:
+        raise ValueError(f"Aucun fichier CSV avec une colonne 'close' dans {data_folder}.")
+
+    meta_path = os.path.join(output_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f)["files"] == files:
+                print(f"Jeu de données inchangé, réutilisé : {output_dir}")
+                return output_dir
+
+    os.makedirs(output_dir, exist_ok=True)
+    series = np.concatenate(parts)
+    _, scaler = normalize_series(series.copy())
+    stored = np.lib.format.open_memmap(os.path.join(output_dir, "series.npy"), mode="w+", dtype=np.float32,
+                                       shape=series.shape)
+    stored[:] = series
+    apply_scaler(stored, scaler)
+    stored.flush()
+    del stored
+    save_scaler(scaler, os.path.join(output_dir, "scaler.json"))
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump({"files": files, "bounds": np.cumsum([0] + [file["rows"] for file in files]).tolist()}, f, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+    print(f"Jeu de données préparé : {len(series)} clôtures de {len(files)} fichiers dans {output_dir}")
+    return output_dir
+
+
+def window_starts(bounds, sequence_length):
+    """
+    Débuts des fenêtres (indices dans la série), sans traverser les limites de fichiers.
+    Les dernières fenêtres de chaque fichier (ordre chronologique) servent à la validation.
+    :return: (débuts d'entraînement, débuts de validation).
+    """
+    train, validation = [], []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        n_windows = end - start - sequence_length
+        if n_windows <= 0:
+            continue
+        split = int(n_windows * (1 - VALIDATION_FRACTION))
+        starts = np.arange(start, start + n_windows, dtype=np.int64)
+        train.append(starts[:split])
+        validation.append(starts[split:])
+    empty = np.empty(0, dtype=np.int64)
+    return (np.concatenate(train) if train else empty), (np.concatenate(validation) if validation else empty)
+
+
+def config_grid(sequence_lengths=(50,), units=(50,), dropouts=(0.2,), batch_sizes=(32,)):
+    """:return: Liste des configurations (produit cartésien des valeurs)."""
+    return [{"sequence_length": int(s), "units": int(u), "dropout": float(d), "batch_size": int(b)}
+            for s, u, d, b in itertools.product(sequence_lengths, units, dropouts, batch_sizes)]
+
+
+def config_name(config):
+    return (f"seq{config['sequence_length']}_u{config['units']}_d{config['dropout']:g}"
+            f"_b{config['batch_size']}")
+
+
+# --- Processus d'entraînement ---
+
+_worker_series = None
+_worker_bounds = None
+
+
+def _init_worker(dataset_dir, threads):
+    """
+    Limite les threads de calcul du processus avant l'import de TensorFlow (sinon chaque processus
+    utilise tous les cœurs) et ouvre la série partagée en lecture seule, sans copie.
+    """
+    global _worker_series, _worker_bounds
+    threads = str(threads)
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[variable] = threads
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(int(threads))
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _worker_series = np.load(os.path.join(dataset_dir, "series.npy"), mmap_mode="r")
+    with open(os.path.join(dataset_dir, "meta.json")) as f:
+        _worker_bounds = json.load(f)["bounds"]
+
+
+def _window_dataset(starts, sequence_length, batch_size, shuffle, seed, threads):
+    """Pipeline tf.data : seuls les indices sont mélangés, chaque batch est lu dans la série mappée."""
+    import tensorflow as tf
+
+    offsets = np.arange(sequence_length)
+
+    def gather(batch_starts):
+        X = _worker_series[batch_starts[:, np.newaxis] + offsets]
+        y = _worker_series[batch_starts + sequence_length]
+        return X[..., np.newaxis], y[:, np.newaxis]
+
+    def load_batch(batch_starts):
+        X, y = tf.numpy_function(gather, [batch_starts], (tf.float32, tf.float32))
+        return tf.ensure_shape(X, (None, sequence_length, 1)), tf.ensure_shape(y, (None, 1))
+
+    dataset = tf.data.Dataset.from_tensor_slices(starts)
+    if shuffle:
+        dataset = dataset.shuffle(len(starts), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(load_batch).prefetch(2)
+    options = tf.data.Options()
+    options.threading.private_threadpool_size = threads  # tf.data respecte aussi la limite du processus
+    return dataset.with_options(options)
+
+
+def _train_config(config, checkpoint_dir, epochs, threads, seed):
+    """Entraîne une configuration dans un processus du pool. :return: Ligne du tableau des résultats."""
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+
+    name = config_name(config)
+    row = {"name": name, **config}
+    try:
+        tf.keras.utils.set_random_seed(seed)
+        train_starts, validation_starts = window_starts(_worker_bounds, config["sequence_length"])
+        if not len(train_starts) or not len(validation_starts):
+            raise ValueError("pas assez de données pour cette longueur de séquence")
+        train = _window_dataset(train_starts, config["sequence_length"], config["batch_size"], True, seed, threads)
+        validation = _window_dataset(validation_starts, config["sequence_length"], 1024, False, seed, threads)
+
+        model = build_model(config["sequence_length"], units=config["units"], dropout=config["dropout"])
+        checkpoint_path = os.path.join(checkpoint_dir, f"{name}.keras")
+        callbacks = [
+            ModelCheckpoint(filepath=checkpoint_path, save_best_only=True, monitor="val_loss", mode="min"),
+            EarlyStopping(monitor="val_loss", patience=PATIENCE, restore_best_weights=True),
+        ]
+        started = time.perf_counter()
+        history = model.fit(train, validation_data=validation, epochs=epochs, callbacks=callbacks, verbose=0)
+        seconds = time.perf_counter() - started
+        epochs_run = len(history.history["loss"])
+        row.update({
+            "val_loss": float(min(history.history["val_loss"])),
+            "loss": float(history.history["loss"][-1]),
+            "epochs": epochs_run,
+            "train_windows": int(len(train_starts)),
+            "seconds": round(seconds, 2),
+            # Débit d'entraînement (validation comprise) : fenêtres apprises par seconde
+            "windows_per_s": round(len(train_starts) * epochs_run / seconds, 1),
+            "parameters": int(model.count_params()),
+            "checkpoint": checkpoint_path,
+            "error": None,
+        })
+    except Exception as e:
+        row.update({"val_loss": np.nan, "error": f"{type(e).__name__}: {e}"})
+    return row
+
+
+def run_sweep(configs, data_folder=DATA_FOLDER, output_dir=SWEEP_DIR, epochs=EPOCHS, workers=None,
+              threads_per_worker=1, seed=42):
+    """
+    Entraîne toutes les configurations en parallèle sur un pool de processus partageant le même
+    jeu de données mappé en mémoire. Chaque processus est limité à `threads_per_worker` threads
+    de calcul : par défaut, un processus par groupe de cœurs, sans sursouscription du CPU.
+    Le meilleur checkpoint (perte de validation minimale) est copié dans `output_dir/best.keras`,
+    avec sa configuration et le scaler du jeu de données.
+    :param configs: Liste de configurations (voir config_grid).
+    :param workers: Nombre de processus (par défaut nombre de cœurs // threads_per_worker).
+    :return: DataFrame des résultats trié par perte de validation.
+    """
+    dataset_dir = prepare_sweep_dataset(data_folder, os.path.join(output_dir, "dataset"))
+    checkpoint_dir = os.path.join(output_dir, "checkpoints")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+    workers = min(workers, len(configs))
+    print(f"Balayage de {len(configs)} configurations sur {workers} processus "
+          f"({threads_per_worker} thread(s) chacun)...")
+
+    rows = []
+    started = time.perf_counter()
+    # "spawn" : chaque processus importe TensorFlow après avoir fixé ses limites de threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                             initargs=(dataset_dir, threads_per_worker)) as executor:
+        futures = [executor.submit(_train_config, config, checkpoint_dir, epochs, threads_per_worker, seed)
+                   for config in configs]
+        for future in futures:
+            row = future.result()
+            rows.append(row)
+            status = row["error"] or f"val_loss {row['val_loss']:.6f}, {row['windows_per_s']:.0f} fenêtres/s"
+            print(f"  [{len(rows)}/{len(configs)}] {row['name']} : {status}")
+
+    results = pd.DataFrame(rows).sort_values("val_loss", na_position="last").reset_index(drop=True)
+    results.to_csv(os.path.join(output_dir, "results.csv"), index=False)
+    print(f"Balayage terminé en {time.perf_counter() - started:.1f} s.")
+
+    best = results.iloc[0]
+    if pd.notna(best["val_loss"]):
+        shutil.copyfile(best["checkpoint"], os.path.join(output_dir, "best.keras"))
+        shutil.copyfile(os.path.join(dataset_dir, "scaler.json"), os.path.join(output_dir, "best_scaler.json"))
+        with open(os.path.join(output_dir, "best.json"), "w") as f:
+            json.dump({key: best[key].item() if hasattr(best[key], "item") else best[key]
+                       for key in ("name", "sequence_length", "units", "dropout", "batch_size", "val_loss")},
+                      f, indent=2)
+        print(f"Meilleure configuration : {best['name']} (val_loss {best['val_loss']:.6f}) -> "
+              f"{os.path.join(output_dir, 'best.keras')}")
+    return results
+
+
+if __name__ == "__main__":
+    results = run_sweep(config_grid(sequence_lengths=(30, 50), units=(32, 50), dropouts=(0.0, 0.2)))
+    print(results.drop(columns=["checkpoint"]).to_string(index=False))
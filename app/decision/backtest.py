@@ -0,0 +1,212 @@
+import itertools
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from app.decision.strategy import Strategy
+
+# Codes de sortie d'un trade
+TAKE_PROFIT = 1
+STOP_LOSS = -1
+TIMEOUT = 0
+
+
+def _sparse_tables(values, levels, reduce):
+    """
+    Table creuse (sparse table) : table[k][p] = reduce(values[p:p + 2**k]).
+    Les positions dont l'intervalle dépasse la fin du tableau sont remplies par l'élément neutre.
+    :return: Tableau (levels, n).
+    """
+    neutral = np.inf if reduce is np.minimum else -np.inf
+    n = len(values)
+    table = np.full((levels, n), neutral, dtype=np.float64)
+    table[0] = values
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        if n - half <= 0:
+            break
+        table[k, :n - half] = reduce(table[k - 1, :n - half], table[k - 1, half:])
+    return table
+
+
+class Backtester:
+    """
+    Backtest vectorisé de stratégies long avec Stop-Loss / Take-Profit (niveaux de
+    `Strategy.calculate_entry`) sur des tableaux OHLC.
+
+    Pour chaque entrée, la première bougie qui touche le Stop-Loss ou le
+    Take-Profit est trouvée par « binary lifting » sur des tables creuses de
+    minima des plus bas et de maxima des plus hauts : O(log max_holding)
+    opérations NumPy pour toutes les entrées à la fois, sans boucle Python
+    par bougie. Les entrées se font à la clôture de la bougie du signal ;
+    si une même bougie touche les deux niveaux, le Stop-Loss est retenu
+    (hypothèse prudente). Sans contact, le trade est clôturé au bout de
+    `max_holding` bougies. Une seule position est ouverte à la fois : un
+    signal reçu pendant un trade est ignoré.
+    """
+
+    def __init__(self, high, low, close, max_holding=1440, fee_percentage=0.0, tables=None):
+        """
+        :param max_holding: Durée maximale d'un trade, en bougies.
+        :param fee_percentage: Frais par ordre, en pourcentage (appliqués à l'entrée et à la sortie).
+        :param tables: Tables (min des plus bas, max des plus hauts) déjà calculées, ex. mappées en mémoire.
+        """
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.max_holding = max_holding
+        self.fee_percentage = fee_percentage
+        self.levels = int(np.ceil(np.log2(max_holding + 1)))
+        if tables is None:
+            tables = (_sparse_tables(self.low, self.levels, np.minimum),
+                      _sparse_tables(self.high, self.levels, np.maximum))
+        self.min_low, self.max_high = tables
+
+    def __len__(self):
+        return len(self.close)
+
+    def first_touch(self, entries, stop_levels, take_levels):
+        """
+        Première bougie (après l'entrée) touchant le Stop-Loss ou le Take-Profit de chaque entrée.
+        :return: (indice de sortie, code de sortie) pour chaque entrée.
+        """
+        n = len(self.close)
+        entries = np.asarray(entries, dtype=np.int64)
+        position = entries + 1
+        limit = np.minimum(entries + 1 + self.max_holding, n)
+        for k in range(self.levels - 1, -1, -1):
+            step = 1 << k
+            can_jump = position + step <= limit
+            index = np.minimum(position, n - 1)
+            # Saut de 2**k bougies si aucune ne touche un des deux niveaux
+            untouched = (self.min_low[k, index] > stop_levels) & (self.max_high[k, index] < take_levels)
+            position = np.where(can_jump & untouched, position + step, position)
+
+        timed_out = position >= limit
+        exit_index = np.where(timed_out, limit - 1, position)
+        outcome = np.where(self.low[exit_index] <= stop_levels, STOP_LOSS,
+                           np.where(self.high[exit_index] >= take_levels, TAKE_PROFIT, TIMEOUT))
+        outcome[timed_out] = TIMEOUT
+        return exit_index, outcome
+
+    def run(self, signals, stop_loss_percentage, take_profit_percentage):
+        """
+        Rejoue une stratégie.
+        :param signals: Tableau booléen (n_bars,) : True si la stratégie veut entrer à la clôture de la bougie.
+        :return: (métriques, DataFrame des trades).
+        """
+        candidates = np.flatnonzero(np.asarray(signals, dtype=bool)[:-1])
+        levels = Strategy.calculate_entry(self.close[candidates], stop_loss_percentage, take_profit_percentage)
+        exit_index, outcome = self.first_touch(candidates, levels["stop_loss"], levels["take_profit"])
+
+        # Enchaînement sans chevauchement : prochain signal strictement après la sortie
+        taken = []
+        position = np.searchsorted(candidates, 0)
+        while position < len(candidates):
+            taken.append(position)
+            position = np.searchsorted(candidates, exit_index[position], side="right")
+        taken = np.asarray(taken, dtype=np.int64)
+
+        entry = levels["entry"][taken]
+        exit_price = np.where(outcome[taken] == TAKE_PROFIT, levels["take_profit"][taken],
+                              np.where(outcome[taken] == STOP_LOSS, levels["stop_loss"][taken],
+                                       self.close[exit_index[taken]]))
+        fee = self.fee_percentage / 100
+        returns = exit_price * (1 - fee) / (entry * (1 + fee)) - 1
+        trades = pd.DataFrame({
+            "entry_index": candidates[taken],
+            "exit_index": exit_index[taken],
+            "entry": entry,
+            "exit": exit_price,
+            "outcome": outcome[taken],
+            "return": returns,
+        })
+        return trade_metrics(returns, trades["exit_index"] - trades["entry_index"]), trades
+
+
+def trade_metrics(returns, holding_bars=None):
+    """PnL composé, drawdown maximal, taux de réussite et statistiques d'une série de rendements par trade."""
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) == 0:
+        return {"trades": 0, "pnl_percentage": 0.0, "max_drawdown_percentage": 0.0, "hit_rate": 0.0,
+                "mean_return_percentage": 0.0, "profit_factor": 0.0, "mean_holding_bars": 0.0}
+    equity = np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(np.r_[1.0, equity])[1:]
+    gains, losses = returns[returns > 0].sum(), -returns[returns < 0].sum()
+    return {
+        "trades": len(returns),
+        "pnl_percentage": 100 * float(equity[-1] - 1),
+        "max_drawdown_percentage": 100 * float(np.max(1 - equity / peak)),
+        "hit_rate": float(np.mean(returns > 0)),
+        "mean_return_percentage": 100 * float(returns.mean()),
+        "profit_factor": float(gains / losses) if losses > 0 else float("inf"),
+        "mean_holding_bars": float(np.mean(holding_bars)) if holding_bars is not None else 0.0,
+    }
+
+
+def signals_from_predictions(close, predictions, threshold_percentage=0.0):
+    """
+    Signal d'achat quand la clôture prédite pour la bougie suivante dépasse la clôture actuelle
+    d'au moins `threshold_percentage` %.
+    :param predictions: Prédiction faite à la clôture de chaque bougie (alignée sur `close`).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    return np.asarray(predictions, dtype=np.float64).reshape(-1) > close * (1 + threshold_percentage / 100)
+
+
+# --- Balayage de paramètres en parallèle ---
+
+_worker_backtester = None
+_worker_signals = None
+
+
+def _init_worker(folder, max_holding, fee_percentage):
+    """Ouvre les tableaux partagés (mappés en mémoire, sans copie) dans chaque processus."""
+    global _worker_backtester, _worker_signals
+    arrays = {name: np.load(os.path.join(folder, f"{name}.npy"), mmap_mode="r")
+              for name in ("high", "low", "close", "min_low", "max_high", "signals")}
+    _worker_backtester = Backtester(arrays["high"], arrays["low"], arrays["close"], max_holding, fee_percentage,
+                                    tables=(arrays["min_low"], arrays["max_high"]))
+    _worker_signals = arrays["signals"]
+
+
+def _run_parameters(parameters):
+    results = []
+    for stop_loss, take_profit in parameters:
+        metrics, _ = _worker_backtester.run(_worker_signals, stop_loss, take_profit)
+        results.append({"stop_loss_percentage": stop_loss, "take_profit_percentage": take_profit, **metrics})
+    return results
+
+
+def sweep(backtester, signals, stop_loss_percentages, take_profit_percentages, workers=None, chunk_size=4):
+    """
+    Évalue toutes les combinaisons Stop-Loss / Take-Profit en parallèle sur plusieurs processus.
+    Les tableaux et les tables creuses sont écrits une fois dans un dossier temporaire et
+    mappés en mémoire par chaque processus.
+    :return: DataFrame des métriques par combinaison, trié par PnL décroissant.
+    """
+    grid = list(itertools.product(stop_loss_percentages, take_profit_percentages))
+    chunks = [grid[i:i + chunk_size] for i in range(0, len(grid), chunk_size)]
+    with tempfile.TemporaryDirectory() as folder:
+        arrays = {"high": backtester.high, "low": backtester.low, "close": backtester.close,
+                  "min_low": backtester.min_low, "max_high": backtester.max_high,
+                  "signals": np.asarray(signals, dtype=bool)}
+        for name, array in arrays.items():
+            np.save(os.path.join(folder, f"{name}.npy"), array)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(folder, backtester.max_holding, backtester.fee_percentage)) as executor:
+            results = [row for chunk in executor.map(_run_parameters, chunks) for row in chunk]
+    return pd.DataFrame(results).sort_values("pnl_percentage", ascending=False).reset_index(drop=True)
+
+
+def load_backtester(symbol, interval="1m", start_ms=None, end_ms=None, store_root=None, **kwargs):
+    """Crée un Backtester à partir des bougies du stockage binaire (data/store)."""
+    from app.storage.column_store import STORE_ROOT, MarketDataStore
+
+    bars = MarketDataStore(store_root or STORE_ROOT).table(symbol, interval).read(
+        ["timestamp", "high", "low", "close"], start_ms, end_ms
+    )
+    return Backtester(bars["high"], bars["low"], bars["close"], **kwargs), bars["timestamp"]
@@ -1,173 +1,594 @@
-import sys
+import argparse
+import asyncio
+import logging
 import os
-from dotenv import load_dotenv
-from binance.client import Client
-import numpy as np
-from tensorflow.keras.models import load_model
-import requests
+import sys
+import time
+from contextlib import contextmanager
 
 # Configuration des chemins pour les modules
 print("Configuration des chemins PYTHONPATH...")
 sys.path.append(os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
 sys.path.append('/Users/nasser/crypto_trading_tool')
 
-from app.data.market_data import MarketData
-from app.analysis.data_preparation import prepare_data
-from app.analysis.technical_indicators import TechnicalIndicators
-from app.decision.strategy import Strategy
-from app.data.websocket_data import WebSocketClient
-from app.analysis.fetch_reddit_data import fetch_reddit_data, save_reddit_to_csv
+# Les dépendances lourdes (TensorFlow, binance, praw, pandas_ta) sont importées
+# uniquement par les sous-commandes qui en ont besoin.
 
-# Charger le modèle LSTM sauvegardé
 MODEL_PATH = "models/lstm_model.keras"
-print(f"Chargement du modèle LSTM depuis {MODEL_PATH}...")
-lstm_model = load_model(MODEL_PATH)
-
-# Buffer pour les prix reçus en temps réel
+MODEL_NPZ_PATH = "models/lstm_model.npz"
+DEFAULT_SYMBOLS = os.getenv("SYMBOLS", "BTCUSDT")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "graph")  # "graph" (TensorFlow), "numpy" ou "server"
+PREDICTION_SERVER = os.getenv("PREDICTION_SERVER", "http://127.0.0.1:8765")  # Adresse du backend "server"
+COALESCE_MS = int(os.getenv("COALESCE_MS", "50"))  # Fenêtre de coalescence des ticks avant une passe d'inférence
+BAR_INTERVAL = os.getenv("BAR_INTERVAL", "1m")  # Intervalle des bougies envoyées au modèle (1s, 1m, 5m...)
+BAR_FLUSH_GRACE_MS = 500  # Délai laissé aux trades retardataires avant de clôturer une bougie sans trade
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Port du point d'accès /metrics local (0 : désactivé)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+RSS_URL = "https://rss.app/feeds/v1.1/NwlnGRWbp6iFjlca.json"
 seq_length = 50
-price_buffer = []
+
+# Moteur d'inférence partagé et agrégateur de bougies, créés par la sous-commande `stream`
+SYMBOLS = []
+inference_engine = None
+candle_aggregator = None
+bar_indicators = {}  # {symbole: (StreamingRSI, StreamingMACD)}
+# Instrumentation du flux : registre de métriques et journal échantillonné du chemin critique
+logger = logging.getLogger("app.stream")
+metrics = None
+sampled_log = None
+measure_ws_lag = True  # Désactivé au rejeu : l'heure des événements enregistrés est ancienne
+
+
+class StartupTimer:
+    """
+    Mesure la durée de chaque phase du démarrage (imports, chargement du modèle, connexions).
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        """Affiche la durée de chaque phase et le temps total écoulé depuis le lancement."""
+        total = time.perf_counter() - self.started_at
+        print("Temps de démarrage par phase :")
+        for name, duration in self.phases:
+            print(f"  {name:<32} {duration * 1000:9.1f} ms")
+        print(f"  {'total':<32} {total * 1000:9.1f} ms")
+
+
+timer = StartupTimer()
+
+
+def load_predict_fn(backend):
+    """
+    Charge le modèle avec le backend demandé et retourne sa fonction de prédiction.
+    Le backend "numpy" n'importe pas TensorFlow ; le backend "server" délègue au
+    serveur de prédiction local (`serve`), qui regroupe les requêtes de tous ses clients.
+    """
+    if backend == "server":
+        from app.serving.prediction_server import PredictionClient
+
+        client = PredictionClient(PREDICTION_SERVER)
+        print(f"Prédictions déléguées au serveur {PREDICTION_SERVER} (modèle {client.models()['current']}).")
+        return client.predict_fn()
+
+    if backend == "numpy":
+        with timer.phase("import numpy_lstm"):
+            from app.analysis.numpy_lstm import NumpyLSTMModel
+        with timer.phase("chargement du modèle (npz)"):
+            return with_model_scaler(NumpyLSTMModel.load(MODEL_NPZ_PATH).predict, MODEL_NPZ_PATH)
+
+    with timer.phase("import tensorflow"):
+        from tensorflow.keras.models import load_model
+        from app.analysis.lstm_model import build_inference_fn
+
+    print(f"Chargement du modèle LSTM depuis {MODEL_PATH}...")
+    with timer.phase("chargement du modèle (keras)"):
+        lstm_model = load_model(MODEL_PATH)
+        # Graphe compilé, sans la machinerie de model.predict
+        return with_model_scaler(build_inference_fn(lstm_model), MODEL_PATH)
+
+
+def with_model_scaler(predict_fn, model_path):
+    """
+    Applique le scaler sauvegardé avec le modèle par `train` : le moteur envoie des prix bruts
+    et reçoit des prix. Sans scaler (ancien modèle), les prix sont transmis tels quels.
+    """
+    from app.analysis.data_preparation import load_scaler, scaled_predict_fn, scaler_path_for
+
+    scaler = load_scaler(scaler_path_for(model_path))
+    if scaler is None:
+        print(f"Aucun scaler sauvegardé pour {model_path} : prix bruts transmis au modèle.")
+    return scaled_predict_fn(predict_fn, scaler)
+
+
+def handle_prediction(symbol, last_price, predicted_price):
+    """Journalise la prédiction d'une paire."""
+    metrics.inc("predictions")
+    sampled_log.info(f"prediction {symbol}", "[%s] Prédiction du prochain prix : %.2f USD (dernier prix : %s)",
+                     symbol, predicted_price, last_price)
+
+
+def handle_closed_bar(symbol, bar):
+    """Envoie la clôture d'une bougie terminée au moteur d'inférence et aux indicateurs."""
+    close = float(bar["close"])
+    metrics.inc("bars")
+    # Le modèle reçoit une clôture par bougie, comme à l'entraînement
+    inference_engine.push(symbol, close)
+    with metrics.timer("indicators"):
+        rsi, macd = bar_indicators[symbol]
+        rsi_value = rsi.update(close)
+        macd_value, signal, _ = macd.update(close)
+    logger.info("[%s] Bougie %s clôturée : %s (%d trades) | RSI %.2f | MACD %.6f / %.6f", symbol,
+                candle_aggregator.interval, close, int(bar["trades"]), rsi_value, macd_value, signal)
+
 
 def handle_realtime_data(data):
     """Traite les données reçues en temps réel."""
+    start = time.perf_counter_ns()
+    metrics.inc("ticks")
     try:
         price = float(data['p'])  # Prix reçu via le WebSocket
-        print(f"Prix en temps réel : {price}")
+        symbol = data.get('s', SYMBOLS[0])  # Paire indiquée dans le message de trade
+        if measure_ws_lag and 'E' in data:
+            # Retard de réception : heure de l'événement côté Binance -> traitement local
+            metrics.observe("ws_lag", max(0.0, time.time() - data['E'] / 1000))
+        sampled_log.debug(f"tick {symbol}", "[%s] Prix en temps réel : %s", symbol, price)
 
-        # Mettre à jour le buffer
-        price_buffer.append(price)
-        if len(price_buffer) > seq_length:
-            price_buffer.pop(0)
+        # Agréger le trade dans la bougie en cours ; le moteur ne reçoit que les bougies clôturées
+        candle_aggregator.on_trade_message(data)
 
-        # Effectuer une prédiction si le buffer est plein
-        if len(price_buffer) == seq_length:
-            input_data = np.array(price_buffer).reshape((1, seq_length, 1))
-            predicted_price = lstm_model.predict(input_data)[0, 0]
-            print(f"Prédiction du prochain prix : {predicted_price:.2f} USD")
+    except KeyError as e:
+        metrics.inc("errors")
+        sampled_log.warning("missing key", "Clé %s manquante dans les données reçues : %s", e, data)
+    finally:
+        metrics.histogram("tick_handler").record_ns(time.perf_counter_ns() - start)
 
-    except KeyError:
-        print("Clé 'p' manquante dans les données reçues :", data)
 
-def fetch_latest_news(rss_url):
-    """
-    Récupère les dernières actualités à partir d'un flux RSS.
-    :param rss_url: URL du flux RSS (JSON)
-    :return: Liste des articles avec titre, lien, et description
-    """
+def run_inference_step():
+    """Passe d'inférence mesurée ; les erreurs sont comptées puis remontées au runtime."""
     try:
-        response = requests.get(rss_url)
-        response.raise_for_status()
-        data = response.json()
-
-        news_list = []
-        for item in data.get("items", []):
-            news = {
-                "title": item.get("title"),
-                "link": item.get("url"),
-                "description": item.get("description"),
-                "published_date": item.get("datePublished")
-            }
-            news_list.append(news)
-
-        return news_list
-
-    except requests.exceptions.RequestException as e:
-        print(f"Erreur lors de la récupération des actualités : {e}")
-        return []
-
-def main():
-    print("Démarrage de l'application de trading...")
+        with metrics.timer("inference_step"):
+            return inference_engine.step()
+    except Exception:
+        metrics.inc("errors")
+        raise
 
-    # Charger les variables d'environnement
-    load_dotenv()
-    API_KEY = os.getenv("BINANCE_API_KEY")
-    API_SECRET = os.getenv("BINANCE_SECRET_KEY")
 
-    # Vérification des clés API
-    if not API_KEY or not API_SECRET:
-        print("Clés API Binance manquantes dans le fichier .env.")
-        return
+def flush_closed_bars(request_step):
+    """
+    Clôture les bougies terminées sans nouveau trade (marché calme).
+    :param request_step: Fonction demandant une passe d'inférence au runtime (qui l'exécute lui-même).
+    """
+    if candle_aggregator.flush(int(time.time() * 1000) - BAR_FLUSH_GRACE_MS):
+        request_step()
 
-    # Récupération des actualités Reddit
-    print("Récupération des discussions Reddit...")
-    try:
-        reddit_data = fetch_reddit_data(subreddit="cryptocurrency", limit=10)
-        save_reddit_to_csv(reddit_data, "data/reddit_data.csv")
-        print("Discussions Reddit récupérées :")
-        print(reddit_data.head())
-    except Exception as e:
-        print(f"Erreur lors de la récupération des discussions Reddit : {e}")
 
-    # Initialisation du client Binance
-    print("Initialisation du client Binance...")
-    client = Client(API_KEY, API_SECRET)
+def load_api_keys():
+    """Charge les clés API Binance depuis le fichier .env."""
+    with timer.phase("import dotenv"):
+        from dotenv import load_dotenv
+    load_dotenv()
+    return os.getenv("BINANCE_API_KEY"), os.getenv("BINANCE_SECRET_KEY")
 
-    # Récupération des actualités via le flux RSS
-    rss_url = "https://rss.app/feeds/v1.1/NwlnGRWbp6iFjlca.json"
+
+def print_news(rss_url):
+    """Récupère et affiche les nouvelles actualités du flux RSS (requête conditionnelle, articles déjà vus ignorés)."""
     print("Récupération des actualités...")
-    news_list = fetch_latest_news(rss_url)
+    with timer.phase("flux RSS"):
+        from app.analysis.ingestion import ingest_feed
+        news_list = ingest_feed(rss_url)
     if news_list:
+        try:
+            with timer.phase("sentiment des actualités"):
+                from app.analysis.analyze_social_data import analyze_news
+                analyze_news(news_list)  # Seules les nouvelles actualités sont évaluées
+        except Exception as e:
+            print(f"Erreur lors de l'analyse de sentiment des actualités : {e}")
         print("Dernières actualités récupérées :")
         for news in news_list[:5]:  # Limiter l'affichage à 5 articles
-            print(f"- {news['title']} ({news['published_date']})")
-            print(f"  Lien : {news['link']}")
+            published = time.strftime("%Y-%m-%d %H:%M", time.gmtime(news["published"])) if news["published"] else "?"
+            print(f"- {news['title']} ({published})")
+            print(f"  Lien : {news['url']}")
     else:
-        print("Aucune actualité disponible.")
-
-    # 1. Initialisation du WebSocket pour BTC/USDT
-    print("Connexion au WebSocket pour les données en temps réel...")
-    symbol = "BTCUSDT"
-    ws_client = WebSocketClient(symbol=symbol, on_message_callback=handle_realtime_data)
-    ws_client.start()
-
-    print("WebSocket démarré. En attente des données en temps réel...")
-
-    # 2. Récupérer les données du marché via HTTP
-    print(f"Récupération des données pour {symbol} via HTTP...")
-    price_data = MarketData.get_ticker_price(symbol)
-    price = float(price_data["price"])
-    print(f"Prix actuel (HTTP) : {price} USD")
+        print("Aucune nouvelle actualité.")
 
-    # 3. Récupération des données historiques depuis Binance
-    print(f"Récupération des données historiques pour {symbol}...")
-    interval = Client.KLINE_INTERVAL_1MINUTE  # Intervalle de 1 minute
-    limit = seq_length  # Nombre de bougies à récupérer
 
+def fetch_and_save_reddit(limit=10):
+    """
+    Récupère les nouvelles discussions Reddit et les ajoute à data/reddit_data.csv.
+    :param limit: Nombre de posts lus au premier passage ; ensuite, tous les posts publiés depuis le précédent.
+    """
+    print("Récupération des discussions Reddit...")
     try:
-        historical_data = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-        historical_prices = [float(data[4]) for data in historical_data]
-        price_buffer.extend(historical_prices)
-        print("Données historiques récupérées :", historical_prices)
+        with timer.phase("import praw"):
+            from app.analysis.fetch_reddit_data import save_reddit_to_csv
+            from app.analysis.ingestion import ingest_reddit
+        with timer.phase("discussions Reddit"):
+            reddit_data = ingest_reddit(subreddit="cryptocurrency", limit=limit)
+        save_reddit_to_csv(reddit_data, "data/reddit_data.csv")
+        print("Nouvelles discussions Reddit :")
+        print(reddit_data.head())
     except Exception as e:
-        print(f"Erreur lors de la récupération des données historiques : {e}")
-        return
+        print(f"Erreur lors de la récupération des discussions Reddit : {e}")
+
+
+def print_indicators(prices):
+    """Calcule et affiche le RSI et le MACD d'une liste de prix de clôture."""
+    with timer.phase("import pandas_ta"):
+        from app.analysis.technical_indicators import TechnicalIndicators
 
-    # 4. Calcul des indicateurs techniques
     print("Calcul des indicateurs techniques...")
-    
+
     # Calcul du RSI
     print("Calcul du RSI...")
-    rsi_df = TechnicalIndicators.calculate_rsi(historical_prices)
+    rsi_df = TechnicalIndicators.calculate_rsi(prices)
     print(rsi_df.tail())  # Affiche les derniers résultats pour plus de clarté
 
     # Calcul du MACD
     print("Calcul du MACD...")
-    print("Prix de clôture utilisés pour le MACD :", historical_prices)
-    macd_df = TechnicalIndicators.calculate_macd(historical_prices)
+    print("Prix de clôture utilisés pour le MACD :", prices)
+    macd_df = TechnicalIndicators.calculate_macd(prices)
     print("Résultat du MACD :", macd_df.tail())
 
-    # 5. Calcul des niveaux d'entrée, Take-Profit et Stop-Loss
-    print("Calcul des niveaux d'entrée, Take-Profit et Stop-Loss...")
-    decision = Strategy.calculate_entry(price, stop_loss_percentage=2, take_profit_percentage=4)
-    print(f"Décision de trading : {decision}")
 
-    # 6. Maintenir la connexion WebSocket active
+def setup_pipeline(symbols, args):
+    """
+    Crée la chaîne de traitement des trades (flux direct ou rejoué) : instrumentation,
+    moteur d'inférence partagé, agrégateur de bougies et indicateurs par paire.
+    """
+    global SYMBOLS, inference_engine, candle_aggregator, metrics, sampled_log
+    SYMBOLS = symbols
+    predict_fn = load_predict_fn(args.backend)
+
+    from app.analysis.streaming_indicators import StreamingMACD, StreamingRSI
+    from app.streaming.candle_aggregator import CandleAggregator
+    from app.streaming.metrics import SampledLogger
+    from app.streaming.metrics import metrics as registry
+    from app.streaming.multi_symbol import MultiSymbolEngine
+
+    metrics = registry
+    sampled_log = SampledLogger(logger, interval=args.log_sample_interval)
+    predict_fn = metrics.timed("predict", predict_fn)
+
+    # Les trades sont regroupés en bougies : l'inférence suit le rythme des bougies, pas des trades
+    candle_aggregator = CandleAggregator(SYMBOLS, interval=args.bar_interval, on_bar=handle_closed_bar)
+    # Une fenêtre non prédite avant la clôture de la bougie suivante est périmée (par défaut)
+    max_window_age_ms = candle_aggregator.interval_ms if args.max_window_age_ms is None else args.max_window_age_ms
+    # Moteur d'inférence partagé (un seul modèle pour toutes les paires), piloté par le runtime
+    inference_engine = MultiSymbolEngine(
+        SYMBOLS,
+        predict_fn=predict_fn,
+        seq_length=seq_length,
+        on_prediction=handle_prediction,
+        max_window_age=max_window_age_ms / 1000.0 if max_window_age_ms > 0 else None,
+    )
+    metrics.gauge("coalesced_ticks", lambda: int(inference_engine.coalesced.sum()))
+    metrics.gauge("dropped_ticks", lambda: int(inference_engine.dropped.sum()))
+    for symbol in SYMBOLS:
+        bar_indicators[symbol] = (StreamingRSI(), StreamingMACD())
+
+
+def run_stream(args):
+    """Sous-commande `stream` : application de trading en temps réel (runtime asyncio)."""
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s : %(message)s")
+    print("Démarrage de l'application de trading...")
+
+    # Charger les variables d'environnement
+    API_KEY, API_SECRET = load_api_keys()
+
+    # Vérification des clés API
+    if not API_KEY or not API_SECRET:
+        print("Clés API Binance manquantes dans le fichier .env.")
+        return
+
+    setup_pipeline([symbol.strip().upper() for symbol in args.symbols.split(",") if symbol.strip()], args)
+
+    with timer.phase("import binance"):
+        from app.analysis.binance_client import get_client
+        from app.data.market_data import MarketData
+        from app.data.websocket_data import WebSocketClient
+    from app.decision.strategy import Strategy
+    from app.streaming.metrics import MetricsServer
+    from app.streaming.runtime import StreamRuntime
+
+    # Enregistrement optionnel des messages bruts, pour les rejouer hors ligne (sous-commande `replay`)
+    recorder = None
+    if args.record:
+        from app.streaming.stream_log import StreamRecorder
+        recorder = StreamRecorder(args.record)
+        print(f"Enregistrement des messages WebSocket dans {args.record}")
+
+    # Client partagé : un seul pool de connexions et un seul budget de poids pour le backfill de toutes les paires
+    print("Initialisation du client Binance...")
+    with timer.phase("client Binance"):
+        client = get_client()
+
+    def backfill(symbol):
+        """Prix courant, bougies historiques, indicateurs et niveaux de décision d'une paire."""
+        # Récupérer les données du marché via HTTP
+        print(f"Récupération des données pour {symbol} via HTTP...")
+        price_data = MarketData.get_ticker_price(symbol)
+        price = float(price_data["price"])
+        print(f"Prix actuel (HTTP) : {price} USD")
+
+        # Récupération des données historiques depuis Binance
+        print(f"Récupération des données historiques pour {symbol}...")
+        interval = args.bar_interval  # Même intervalle que les bougies agrégées en temps réel
+        limit = seq_length + 1  # La dernière bougie renvoyée est en cours et n'est pas utilisée
+        historical_data = client.get_klines(symbol=symbol, interval=interval, limit=limit)
+        historical_prices = [float(data[4]) for data in historical_data[:-1]]
+        inference_engine.prime(symbol, historical_prices)
+        for indicator in bar_indicators[symbol]:
+            indicator.seed(historical_prices)
+        print("Données historiques récupérées :", historical_prices)
+
+        # Calcul des indicateurs techniques
+        print_indicators(historical_prices)
+
+        # Calcul des niveaux d'entrée, Take-Profit et Stop-Loss
+        print("Calcul des niveaux d'entrée, Take-Profit et Stop-Loss...")
+        decision = Strategy.calculate_entry(price, stop_loss_percentage=2, take_profit_percentage=4)
+        print(f"Décision de trading : {decision}")
+
+    def start_streams(callback):
+        """Ouvre une connexion WebSocket par paire ; les messages sont transférés à la boucle asyncio."""
+        print(f"Connexion aux WebSockets pour les données en temps réel : {', '.join(SYMBOLS)}...")
+        ws_clients = []
+        with timer.phase("connexion WebSocket"):
+            for symbol in SYMBOLS:
+                on_message = recorder.wrap(callback, symbol) if recorder is not None else callback
+                ws_client = WebSocketClient(symbol=symbol, on_message_callback=on_message)
+                ws_client.start()
+                ws_clients.append(ws_client)
+        print("WebSockets démarrés. En attente des données en temps réel (Ctrl+C pour arrêter)...")
+        if args.timings:
+            timer.report()
+        return ws_clients
+
+    def stop_streams(ws_clients):
+        for ws_client in ws_clients:
+            ws_client.stop()
+
+    runtime = StreamRuntime(
+        message_handler=handle_realtime_data,
+        step_fn=run_inference_step,
+        coalesce_window=args.coalesce_ms / 1000.0,
+        max_workers=args.workers,
+    )
+    for symbol in SYMBOLS:
+        runtime.add_startup_job(f"backfill {symbol}", backfill, symbol)
+    if not args.skip_social:
+        runtime.add_periodic_job("reddit", args.reddit_interval, fetch_and_save_reddit, 10)
+        runtime.add_periodic_job("actualités", args.news_interval, print_news, RSS_URL)
+    runtime.add_periodic_job("bougies", min(1.0, candle_aggregator.interval_ms / 1000.0), flush_closed_bars,
+                             runtime.request_step)
+    runtime.add_periodic_job("statistiques", args.stats_interval, inference_engine.report)
+    runtime.add_periodic_job("métriques", args.stats_interval, metrics.report)
+    metrics.gauge("queue_depth", runtime.pending_messages)
+    metrics.gauge("dropped_messages", lambda: runtime.dropped_messages)
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = MetricsServer(metrics, port=args.metrics_port).start()
+        print(f"Métriques disponibles sur http://127.0.0.1:{metrics_server.port}/metrics")
+
     try:
-        print("Connexion WebSocket active. Appuyez sur Ctrl+C pour arrêter.")
-        while True:
-            pass  # Maintenir la connexion ouverte
+        asyncio.run(runtime.run(start_streams, stop_streams))
     except KeyboardInterrupt:
         print("\nArrêt demandé par l'utilisateur.")
-        ws_client.stop()
+    if metrics_server is not None:
+        metrics_server.stop()
+    if recorder is not None:
+        recorder.close()
+        print(f"{recorder.messages} messages enregistrés dans {args.record}")
+    metrics.report()
+    print("Statistiques du moteur d'inférence :", inference_engine.stats())
+    print("Statistiques des bougies :", candle_aggregator.stats())
+    if runtime.dropped_messages:
+        print(f"Messages WebSocket abandonnés sous contre-pression : {runtime.dropped_messages}")
+
+
+def run_replay(args):
+    """
+    Sous-commande `replay` : rejoue un journal enregistré avec `stream --record` dans la même chaîne
+    (handle_realtime_data, bougies, inférence), sans connexion à Binance, pour mesurer débit et latence.
+    """
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s : %(message)s")
+    from app.streaming.stream_log import read_stream_names, replay_stream_log
+    global measure_ws_lag
+    logging.getLogger("app.metrics").setLevel(logging.INFO)  # Résumé des latences affiché quel que soit --log-level
+    measure_ws_lag = False
+
+    if args.symbols:
+        symbols = [symbol.strip().upper() for symbol in args.symbols.split(",") if symbol.strip()]
+    else:
+        symbols = sorted(set(read_stream_names(args.path).values()))
+    setup_pipeline(symbols, args)
+
+    speed = None if args.speed == "max" else float(args.speed)
+    print(f"Rejeu de {args.path} ({', '.join(symbols)}) à la vitesse {args.speed}...")
+    # Une passe d'inférence après chaque message : les bougies clôturées sont prédites aussitôt, comme en direct.
+    # La dernière bougie, incomplète, n'est pas clôturée.
+    stats = replay_stream_log(args.path, handle_realtime_data, speed=speed, streams=set(symbols),
+                              after_message=run_inference_step)
+
+    print(f"{stats['messages']} messages ({stats['recorded_seconds']:.1f} s enregistrées) rejoués en "
+          f"{stats['seconds']:.2f} s : {stats['messages_per_s']:.0f} messages/s")
+    if "schedule_lag" in stats:
+        lag = stats["schedule_lag"]
+        print(f"Retard sur le calendrier d'origine : p50 {lag['p50_ms']:.3f} ms, p99 {lag['p99_ms']:.3f} ms, "
+              f"max {lag['max_ms']:.3f} ms")
+    inference_engine.report()
+    metrics.report()
+
+
+def run_indicators(args):
+    """Sous-commande `indicators` : RSI et MACD depuis un CSV ou les bougies Binance."""
+    if args.csv:
+        with timer.phase("import pandas"):
+            import pandas as pd
+        prices = pd.read_csv(args.csv)["close"].tail(args.limit).tolist()
+    else:
+        load_api_keys()
+        with timer.phase("import binance"):
+            from app.analysis.binance_client import get_client
+        client = get_client()
+        print(f"Récupération des données historiques pour {args.symbol}...")
+        with timer.phase(f"historique {args.symbol}"):
+            klines = client.get_klines(symbol=args.symbol, interval=args.interval, limit=args.limit)
+        prices = [float(kline[4]) for kline in klines]
+
+    print_indicators(prices)
+
+
+def run_news(args):
+    """Sous-commande `news` : dernières actualités RSS (et Reddit en option)."""
+    print_news(args.rss_url)
+    if args.reddit:
+        fetch_and_save_reddit(limit=args.reddit_limit)
+
+
+def run_train(args):
+    """Sous-commande `train` : entraînement incrémental du modèle LSTM."""
+    from app.analysis.train_lstm import train_incremental
+
+    with timer.phase("entraînement"):
+        train_incremental(data_folder=args.data_folder, epochs=args.epochs, full_retrain=args.full)
+
+
+def run_sweep(args):
+    """Sous-commande `sweep` : entraînement parallèle de plusieurs configurations LSTM."""
+    from app.analysis.train_sweep import config_grid, run_sweep as sweep
+
+    def values(text, cast):
+        return [cast(value) for value in text.split(",")]
+
+    configs = config_grid(values(args.sequence_lengths, int), values(args.units, int), values(args.dropouts, float),
+                          values(args.batch_sizes, int))
+    with timer.phase("balayage"):
+        results = sweep(configs, data_folder=args.data_folder, output_dir=args.output, epochs=args.epochs,
+                        workers=args.workers, threads_per_worker=args.threads_per_worker)
+    print(results.drop(columns=["checkpoint"], errors="ignore").to_string(index=False))
+
+
+def run_serve(args):
+    """Sous-commande `serve` : serveur de prédiction local partagé (micro-batching entre clients)."""
+    from app.serving.prediction_server import PredictionService, serve
+
+    with timer.phase("chargement du modèle"):
+        service = PredictionService(
+            model_path=MODEL_NPZ_PATH if args.backend == "numpy" else MODEL_PATH,
+            backend=args.backend,
+            max_batch=args.max_batch,
+            max_wait_ms=args.max_wait_ms,
+            watch_interval=args.watch_interval or None,
+        )
+    serve(service, port=args.port, host=args.host, unix_socket=args.unix)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="app.main", description="Crypto Trading Tool")
+    parser.add_argument("--timings", action="store_true", help="Affiche le temps de démarrage par phase.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    stream = subparsers.add_parser("stream", help="Prédictions en temps réel via WebSocket (par défaut).")
+    stream.add_argument("--symbols", default=DEFAULT_SYMBOLS, help="Paires séparées par des virgules.")
+    stream.add_argument("--backend", choices=["graph", "numpy", "server"], default=INFERENCE_BACKEND)
+    stream.add_argument("--bar-interval", default=BAR_INTERVAL,
+                        help="Intervalle des bougies agrégées à partir des trades (1s, 1m, 5m...).")
+    stream.add_argument("--coalesce-ms", type=float, default=COALESCE_MS,
+                        help="Fenêtre (ms) pendant laquelle les ticks sont regroupés en une passe d'inférence.")
+    stream.add_argument("--max-window-age-ms", type=float,
+                        help="Âge maximal (ms) d'une fenêtre prédite, 0 : illimité (défaut : une bougie).")
+    stream.add_argument("--skip-social", action="store_true", help="Ne récupère ni Reddit ni le flux RSS.")
+    stream.add_argument("--workers", type=int, default=4, help="Threads pour les appels bloquants.")
+    stream.add_argument("--news-interval", type=float, default=300, help="Rafraîchissement RSS (secondes).")
+    stream.add_argument("--reddit-interval", type=float, default=600, help="Rafraîchissement Reddit (secondes).")
+    stream.add_argument("--stats-interval", type=float, default=60, help="Rapport du moteur (secondes).")
+    stream.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="Port du point d'accès texte /metrics (0 : désactivé).")
+    stream.add_argument("--log-level", default=LOG_LEVEL, help="DEBUG affiche aussi les prix en temps réel.")
+    stream.add_argument("--log-sample-interval", type=float, default=1.0,
+                        help="Intervalle minimal (secondes) entre deux messages d'une même paire.")
+    stream.add_argument("--record", help="Enregistre les messages WebSocket bruts dans ce journal binaire.")
+    stream.set_defaults(func=run_stream)
+
+    replay = subparsers.add_parser("replay", help="Rejoue un journal de flux enregistré (hors ligne).")
+    replay.add_argument("path", help="Journal créé avec `stream --record`.")
+    replay.add_argument("--speed", default="max", help="1 (temps réel), N (N fois plus vite) ou max.")
+    replay.add_argument("--symbols", help="Paires à rejouer (par défaut toutes celles du journal).")
+    replay.add_argument("--backend", choices=["graph", "numpy", "server"], default=INFERENCE_BACKEND)
+    replay.add_argument("--bar-interval", default=BAR_INTERVAL)
+    replay.add_argument("--max-window-age-ms", type=float)
+    replay.add_argument("--log-level", default="WARNING")
+    replay.add_argument("--log-sample-interval", type=float, default=1.0)
+    replay.set_defaults(func=run_replay)
+
+    indicators = subparsers.add_parser("indicators", help="Calcule le RSI et le MACD.")
+    indicators.add_argument("--symbol", default="BTCUSDT")
+    indicators.add_argument("--interval", default="1m")
+    indicators.add_argument("--limit", type=int, default=100)
+    indicators.add_argument("--csv", help="Fichier CSV avec une colonne 'close' (pas d'appel à Binance).")
+    indicators.set_defaults(func=run_indicators)
+
+    news = subparsers.add_parser("news", help="Affiche les dernières actualités.")
+    news.add_argument("--rss-url", default=RSS_URL)
+    news.add_argument("--reddit", action="store_true", help="Récupère aussi les discussions Reddit.")
+    news.add_argument("--reddit-limit", type=int, default=10)
+    news.set_defaults(func=run_news)
+
+    train = subparsers.add_parser("train", help="Entraîne le modèle LSTM.")
+    train.add_argument("--data-folder", default="data", help="Dossier des fichiers CSV.")
+    train.add_argument("--epochs", type=int, help="Nombre d'époques (par défaut 50, puis 5 pour les mises à jour).")
+    train.add_argument("--full", action="store_true", help="Réentraîne depuis zéro (nouveau scaler et nouveau modèle).")
+    train.set_defaults(func=run_train)
+
+    sweep_parser = subparsers.add_parser("sweep", help="Entraîne plusieurs configurations LSTM en parallèle.")
+    sweep_parser.add_argument("--data-folder", default="data", help="Dossier des fichiers CSV.")
+    sweep_parser.add_argument("--output", default="models/sweep", help="Jeu de données, checkpoints et résultats.")
+    sweep_parser.add_argument("--sequence-lengths", default="30,50,100")
+    sweep_parser.add_argument("--units", default="32,50")
+    sweep_parser.add_argument("--dropouts", default="0.0,0.2")
+    sweep_parser.add_argument("--batch-sizes", default="32,128")
+    sweep_parser.add_argument("--epochs", type=int, default=10)
+    sweep_parser.add_argument("--workers", type=int, help="Processus (par défaut cœurs // threads par processus).")
+    sweep_parser.add_argument("--threads-per-worker", type=int, default=1,
+                              help="Threads de calcul par processus (évite la sursouscription du CPU).")
+    sweep_parser.set_defaults(func=run_sweep)
+
+    serve_parser = subparsers.add_parser("serve", help="Serveur de prédiction local partagé par plusieurs clients.")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--unix", help="Écoute sur ce socket Unix au lieu du port TCP.")
+    serve_parser.add_argument("--backend", choices=["graph", "numpy"], default=INFERENCE_BACKEND)
+    serve_parser.add_argument("--max-batch", type=int, default=256, help="Fenêtres maximales par passe avant.")
+    serve_parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                              help="Attente maximale d'autres requêtes avant d'exécuter un lot.")
+    serve_parser.add_argument("--watch-interval", type=float, default=2.0,
+                              help="Vérification du fichier du modèle pour le rechargement à chaud (0 : désactivé).")
+    serve_parser.set_defaults(func=run_serve)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # Compatibilité : `python app/main.py` lance le flux temps réel
+        args = parser.parse_args((argv if argv is not None else sys.argv[1:]) + ["stream"])
+    args.func(args)
+    if args.timings and args.command != "stream":
+        timer.report()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
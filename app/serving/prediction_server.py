@@ -0,0 +1,467 @@
+import hashlib
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from app.analysis.data_preparation import load_scaler, scaler_path_for
+from app.streaming.metrics import LatencyHistogram
+
+MODEL_PATH = "models/lstm_model.keras"
+MODEL_NPZ_PATH = "models/lstm_model.npz"
+DEFAULT_PORT = 8765
+
+
+def _file_digest(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+# Même règle que les backends en processus (data_preparation.scaled_predict_fn) : les prix bruts
+# sont normalisés avec le scaler sauvegardé avec le modèle, et transmis tels quels s'il n'y en a pas.
+
+def scale_windows(X, scaler):
+    """Prix bruts -> entrée du modèle (feature 0 du scaler, comme à l'entraînement)."""
+    if scaler is None:
+        return X
+    return X * np.float32(scaler.scale_[0]) + np.float32(scaler.min_[0])
+
+
+def unscale_predictions(y, scaler):
+    """Sortie du modèle -> prix."""
+    if scaler is None:
+        return y
+    return (y - np.float32(scaler.min_[0])) / np.float32(scaler.scale_[0])
+
+
+class ModelVersion:
+    """
+    Modèle chargé et scaler sauvegardé avec lui, identifiés ensemble par l'empreinte de leurs fichiers :
+    une requête épinglée sur une version utilise toujours le même couple modèle + scaler.
+    """
+
+    def __init__(self, model_path, backend="numpy", scaler_path=None):
+        """:param scaler_path: Scaler du modèle (par défaut celui sauvegardé à côté par `train`)."""
+        self.model_path = model_path
+        self.backend = backend
+        self.scaler_path = scaler_path or scaler_path_for(model_path)
+        self.version = _file_digest(model_path, self.scaler_path)
+        self.scaler = load_scaler(self.scaler_path)
+        if backend == "numpy":
+            from app.analysis.numpy_lstm import NumpyLSTMModel
+
+            model = NumpyLSTMModel.load(model_path)
+            self.input_shape = model.input_shape
+            self.predict_fn = model.predict
+        else:
+            import tensorflow as tf
+
+            from app.analysis.lstm_model import build_inference_fn
+
+            model = tf.keras.models.load_model(model_path)
+            self.input_shape = tuple(model.input_shape[1:])
+            self.predict_fn = build_inference_fn(model)
+        self.loaded_at = time.time()
+        self.requests = 0
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "backend": self.backend,
+            "model_path": self.model_path,
+            "input_shape": list(self.input_shape),
+            "scaled": self.scaler is not None,
+            "loaded_at": self.loaded_at,
+            "requests": self.requests,
+        }
+
+
+class PendingRequest:
+    __slots__ = ("windows", "version", "raw", "future", "enqueued")
+
+    def __init__(self, windows, version, raw):
+        self.windows = windows
+        self.version = version
+        self.raw = raw
+        self.future = Future()
+        self.enqueued = time.perf_counter_ns()
+
+
+class PredictionService:
+    """
+    Service de prédiction partagé : un seul modèle chargé pour tous les clients.
+
+    Les requêtes concurrentes sont regroupées (micro-batching) par un thread
+    dédié : dès qu'une requête arrive, le lot est complété pendant au plus
+    `max_wait_ms` (ou jusqu'à `max_batch` fenêtres), puis une seule passe
+    avant est exécutée par version de modèle présente dans le lot.
+
+    Chaque requête est épinglée à la version courante lors de son admission
+    (ou à la version demandée) : un remplacement du fichier du modèle charge
+    une nouvelle version en arrière-plan, puis la bascule est atomique ; les
+    requêtes en attente sont servies par leur version, conservée tant que
+    `keep_versions` le permet.
+    """
+
+    def __init__(self, model_path=MODEL_NPZ_PATH, backend="numpy", scaler_path=None, max_batch=256,
+                 max_wait_ms=5.0, keep_versions=3, watch_interval=2.0):
+        """
+        :param max_batch: Nombre maximal de fenêtres par passe avant.
+        :param max_wait_ms: Délai maximal d'attente d'autres requêtes après la première requête d'un lot.
+        :param watch_interval: Intervalle (secondes) de vérification du fichier du modèle, None pour désactiver.
+        """
+        self.model_path = model_path
+        self.backend = backend
+        self.scaler_path = scaler_path or scaler_path_for(model_path)
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.keep_versions = keep_versions
+        self.watch_interval = watch_interval
+
+        self.versions = {}
+        self.current = None
+        self._queue = queue.Queue()
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._file_state = None
+
+        self.batch_sizes = np.zeros(max_batch + 1, dtype=np.int64)  # Nombre de passes par taille de lot
+        self.latency = {"queue": LatencyHistogram(), "forward": LatencyHistogram(), "total": LatencyHistogram()}
+        self.requests = 0
+        self.windows = 0
+        self.errors = 0
+        self.swaps = 0
+        self._started_at = time.monotonic()
+        self.load()
+
+    # --- Versions ---
+
+    def _model_file_state(self):
+        paths = [self.model_path, self.scaler_path]
+        return tuple((os.path.getmtime(p), os.path.getsize(p)) if p and os.path.exists(p) else None for p in paths)
+
+    def load(self):
+        """Charge le fichier du modèle (et son scaler) et en fait la version courante. :return: ModelVersion."""
+        state = self._model_file_state()
+        version = ModelVersion(self.model_path, self.backend, self.scaler_path)
+        with self._swap_lock:
+            if version.version not in self.versions:
+                self.versions[version.version] = version
+            self.current = self.versions[version.version]
+            self._file_state = state
+            # Les versions les plus anciennes sont oubliées ; leurs requêtes en vol gardent une référence
+            for old in sorted(self.versions.values(), key=lambda v: v.loaded_at)[:-self.keep_versions]:
+                del self.versions[old.version]
+        print(f"Modèle {version.version} prêt ({self.backend}, entrée {version.input_shape}).")
+        return self.current
+
+    def _watch(self):
+        pending_state = None
+        while not self._stop.wait(self.watch_interval):
+            try:
+                state = self._model_file_state()
+                if state == self._file_state:
+                    pending_state = None
+                    continue
+                if state != pending_state:
+                    pending_state = state  # Attendre un intervalle sans modification (écriture terminée)
+                    continue
+                previous = self.current.version
+                if self.load().version != previous:
+                    self.swaps += 1
+            except Exception as e:
+                print(f"Rechargement du modèle impossible, version {self.current.version} conservée : {e}")
+
+    # --- Requêtes ---
+
+    def submit(self, windows, version=None, raw=True):
+        """
+        Met une requête en file.
+        :param windows: Tableau (n, seq_length) ou (n, seq_length, features) de fenêtres.
+        :param version: Version épinglée (None : version courante).
+        :param raw: True si les fenêtres sont des prix bruts (normalisation et retour en prix par le scaler de la
+                    version, s'il existe, comme les backends en processus).
+        :return: Future résolue en (prédictions (n,), version utilisée).
+        """
+        with self._swap_lock:
+            pinned = self.current if version is None else self.versions.get(version)
+        if pinned is None:
+            raise KeyError(f"Version de modèle inconnue : {version}")
+        windows = np.asarray(windows, dtype=np.float32)
+        if windows.ndim == 2:
+            windows = windows[..., np.newaxis]
+        if windows.shape[1:] != tuple(pinned.input_shape):
+            raise ValueError(f"Forme {windows.shape[1:]} incompatible avec le modèle {tuple(pinned.input_shape)}.")
+        request = PendingRequest(windows, pinned, raw)
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, windows, version=None, raw=True, timeout=30.0):
+        """Appel bloquant : :return: (prédictions, version)."""
+        return self.submit(windows, version, raw).result(timeout)
+
+    def _collect(self):
+        """Premier request bloquant, puis complète le lot jusqu'à l'échéance ou la taille maximale."""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch, size = [first], len(first.windows)
+        deadline = time.perf_counter() + self.max_wait_s
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.windows)
+        return batch
+
+    def _run_batch(self, batch):
+        by_version = {}
+        for request in batch:
+            by_version.setdefault(request.version.version, []).append(request)
+        for requests in by_version.values():
+            version = requests[0].version
+            inputs = [scale_windows(r.windows, version.scaler) if r.raw else r.windows for r in requests]
+            X = np.concatenate(inputs) if len(inputs) > 1 else inputs[0]
+            start = time.perf_counter_ns()
+            try:
+                outputs = np.asarray(version.predict_fn(X)).reshape(len(X), -1)[:, 0]
+            except Exception as e:
+                self.errors += len(requests)
+                for r in requests:
+                    r.future.set_exception(e)
+                continue
+            done = time.perf_counter_ns()
+            self.latency["forward"].record_ns(done - start)
+            self.batch_sizes[min(len(X), self.max_batch)] += 1
+            version.requests += len(requests)
+
+            offset = 0
+            for r in requests:
+                n = len(r.windows)
+                result = outputs[offset:offset + n]
+                offset += n
+                if r.raw:
+                    result = unscale_predictions(result, version.scaler)
+                self.latency["queue"].record_ns(start - r.enqueued)
+                self.latency["total"].record_ns(done - r.enqueued)
+                r.future.set_result((result, version.version))
+            self.requests += len(requests)
+            self.windows += len(X)
+
+    def _serve(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._run_batch(batch)
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._serve, name="prediction-batcher", daemon=True)]
+        if self.watch_interval:
+            self._threads.append(threading.Thread(target=self._watch, name="model-watcher", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    def stats(self):
+        """File d'attente, distribution des tailles de lot, latences par requête et versions chargées."""
+        passes = int(self.batch_sizes.sum())
+        sizes = np.flatnonzero(self.batch_sizes)
+        elapsed = time.monotonic() - self._started_at
+        return {
+            "current_version": self.current.version,
+            "queue_depth": self._queue.qsize(),
+            "requests": self.requests,
+            "windows": self.windows,
+            "errors": self.errors,
+            "model_swaps": self.swaps,
+            "requests_per_s": self.requests / elapsed if elapsed > 0 else 0.0,
+            "forward_passes": passes,
+            "mean_batch_size": self.windows / passes if passes else 0.0,
+            "batch_sizes": {int(size): int(self.batch_sizes[size]) for size in sizes},
+            "latency": {name: histogram.summary() for name, histogram in self.latency.items()},
+            "versions": [version.describe() for version in self.versions.values()],
+        }
+
+
+# --- Transport HTTP (TCP local ou socket Unix) ---
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Connexions persistantes : pas de nouvelle connexion par prédiction
+
+        def _send(handler, status, payload):
+            body = json.dumps(payload).encode()
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+
+        def do_GET(handler):
+            if handler.path == "/stats":
+                handler._send(200, service.stats())
+            elif handler.path == "/models":
+                handler._send(200, {"current": service.current.version,
+                                    "versions": [v.describe() for v in service.versions.values()]})
+            else:
+                handler._send(404, {"error": "inconnu"})
+
+        def do_POST(handler):
+            length = int(handler.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(handler.rfile.read(length) or b"{}")
+                if handler.path == "/reload":
+                    handler._send(200, service.load().describe())
+                    return
+                if handler.path != "/predict":
+                    handler._send(404, {"error": "inconnu"})
+                    return
+                windows = body["windows"] if "windows" in body else [body["window"]]
+                predictions, version = service.predict(windows, body.get("version"), body.get("raw", True))
+                handler._send(200, {"predictions": predictions.tolist(), "version": version})
+            except (KeyError, ValueError) as e:
+                handler._send(400, {"error": str(e)})
+            except Exception as e:
+                handler._send(500, {"error": str(e)})
+
+        def address_string(handler):
+            return str(handler.client_address[0]) if handler.client_address else "unix"
+
+        def log_message(handler, *args):
+            pass  # Pas de journal par requête
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+
+
+def serve(service, port=DEFAULT_PORT, host="127.0.0.1", unix_socket=None):
+    """
+    Expose le service en HTTP (TCP local, ou socket Unix si `unix_socket` est fourni) jusqu'à Ctrl+C.
+    Points d'accès : POST /predict, POST /reload, GET /stats, GET /models.
+    """
+    handler = _make_handler(service)
+    if unix_socket:
+        server = UnixHTTPServer(unix_socket, handler)
+        where = f"unix:{unix_socket}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        where = f"http://{host}:{server.server_address[1]}"
+    service.start()
+    print(f"Serveur de prédiction à l'écoute sur {where} (lots de {service.max_batch} fenêtres, "
+          f"attente max {service.max_wait_s * 1000:.1f} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nArrêt du serveur de prédiction.")
+    finally:
+        server.server_close()
+        service.stop()
+        if unix_socket and os.path.exists(unix_socket):
+            os.remove(unix_socket)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=30.0):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class PredictionClient:
+    """
+    Client du serveur de prédiction ; une connexion persistante par thread.
+    :param address: "http://127.0.0.1:8765" ou "unix:/chemin/du/socket".
+    """
+
+    def __init__(self, address=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=30.0):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if self.address.startswith("unix:"):
+                connection = _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+            else:
+                host = self.address.split("://", 1)[-1].rstrip("/")
+                connection = http.client.HTTPConnection(host, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = json.loads(response.read())
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # Connexion persistante fermée par le serveur : une nouvelle tentative sur une connexion neuve
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"Serveur de prédiction : {response.status} {data.get('error')}")
+        return data
+
+    def predict(self, windows, version=None, raw=True):
+        """:return: (prédictions (n,), version du modèle utilisée)."""
+        payload = {"windows": np.asarray(windows, dtype=np.float32).tolist(), "raw": raw}
+        if version is not None:
+            payload["version"] = version
+        data = self._request("POST", "/predict", payload)
+        return np.asarray(data["predictions"], dtype=np.float32), data["version"]
+
+    def predict_fn(self, version=None):
+        """Fonction (batch, seq_length, 1) -> (batch, 1) en prix bruts, utilisable par MultiSymbolEngine."""
+        def predict(X):
+            return self.predict(np.asarray(X)[..., 0], version)[0][:, np.newaxis]
+
+        return predict
+
+    def stats(self):
+        return self._request("GET", "/stats")
+
+    def models(self):
+        return self._request("GET", "/models")
@@ -0,0 +1,215 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Dossier racine du stockage binaire : data/store/<SYMBOL>/<interval>/<colonne>.bin + meta.json
+STORE_ROOT = "data/store"
+
+KLINE_SCHEMA = {
+    "timestamp": "int64",  # Heure d'ouverture de la bougie, en millisecondes UTC
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "float64",
+}
+
+
+def to_milliseconds(values):
+    """Convertit une colonne de dates (datetime64 ou texte) ou d'entiers en timestamps int64 (ms)."""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+    return pd.to_datetime(values, utc=True).to_numpy(dtype="datetime64[ms]").astype(np.int64)
+
+
+class ColumnTable:
+    """
+    Table append-only à colonnes typées de largeur fixe.
+
+    Chaque colonne est un fichier binaire brut lu via `np.memmap` ; le nombre
+    de lignes validées est conservé dans meta.json, réécrit de façon atomique
+    après chaque ajout. Une écriture interrompue est donc ignorée (et tronquée)
+    au prochain ajout. Si la table a une colonne 'timestamp', les lignes
+    doivent être ajoutées dans l'ordre chronologique.
+    """
+
+    def __init__(self, path, schema=None):
+        """
+        :param path: Dossier de la table.
+        :param schema: Dictionnaire {colonne: dtype NumPy}, obligatoire à la création.
+        """
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if schema is not None and dict(schema) != meta["schema"]:
+                raise ValueError(f"Le schéma de {path} ne correspond pas : {meta['schema']}")
+            self.schema = meta["schema"]
+            self.rows = meta["rows"]
+        else:
+            if schema is None:
+                raise ValueError(f"Table introuvable : {path}")
+            self.schema = dict(schema)
+            self.rows = 0
+            os.makedirs(path, exist_ok=True)
+            self._write_meta()
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"schema": self.schema, "rows": self.rows}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def append(self, columns):
+        """
+        Ajoute des lignes à la fin de la table.
+        :param columns: DataFrame ou dictionnaire {colonne: valeurs} contenant toutes les colonnes du schéma.
+        :return: Nombre de lignes ajoutées.
+        """
+        arrays = {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype in self.schema.items()}
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError("Toutes les colonnes doivent avoir la même longueur.")
+        count = lengths.pop()
+        if count == 0:
+            return 0
+
+        if "timestamp" in arrays:
+            timestamps = arrays["timestamp"]
+            if np.any(np.diff(timestamps) < 0):
+                raise ValueError("Les timestamps ajoutés doivent être triés.")
+            last = self.last_timestamp()
+            if last is not None and timestamps[0] < last:
+                raise ValueError("Les timestamps ajoutés doivent être postérieurs au dernier timestamp de la table.")
+
+        for name, array in arrays.items():
+            with open(self._column_path(name), "ab") as f:
+                # Écarter les octets d'un ajout précédent non validé
+                f.truncate(self.rows * array.itemsize)
+                f.write(array.tobytes())
+        self.rows += count
+        self._write_meta()
+        return count
+
+    def column(self, name):
+        """Vue mémoire mappée (lecture seule, sans copie) d'une colonne complète."""
+        dtype = np.dtype(self.schema[name])
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(self.rows,))
+
+    def last_timestamp(self):
+        if self.rows == 0 or "timestamp" not in self.schema:
+            return None
+        return int(self.column("timestamp")[-1])
+
+    def time_slice(self, start_ms=None, end_ms=None):
+        """
+        Plage de lignes correspondant à [start_ms, end_ms), trouvée par recherche dichotomique.
+        """
+        timestamps = self.column("timestamp")
+        first = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side="left"))
+        last = self.rows if end_ms is None else int(np.searchsorted(timestamps, end_ms, side="left"))
+        return slice(first, last)
+
+    def read(self, columns=None, start_ms=None, end_ms=None):
+        """
+        Lit des colonnes sur une plage de temps, sous forme de vues mémoire mappées (sans copie).
+        :return: Dictionnaire {colonne: tableau}.
+        """
+        rows = self.time_slice(start_ms, end_ms) if "timestamp" in self.schema else slice(None)
+        return {name: self.column(name)[rows] for name in (columns or self.schema)}
+
+    def to_frame(self, columns=None, start_ms=None, end_ms=None):
+        """Copie une plage de la table dans un DataFrame."""
+        return pd.DataFrame({name: np.array(values) for name, values in self.read(columns, start_ms, end_ms).items()})
+
+
+class MarketDataStore:
+    """
+    Stockage des bougies par paire et par intervalle, au format ColumnTable.
+    """
+
+    def __init__(self, root=STORE_ROOT):
+        self.root = root
+
+    def table(self, symbol, interval, schema=KLINE_SCHEMA):
+        return ColumnTable(os.path.join(self.root, symbol, interval), schema)
+
+    def symbols(self):
+        return sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.root, "*")) if os.path.isdir(path))
+
+    def append_klines(self, symbol, interval, df):
+        """
+        Ajoute des bougies (colonnes timestamp, open, high, low, close, volume).
+        Les bougies déjà présentes (timestamp <= dernier timestamp stocké) sont ignorées.
+        :return: Nombre de bougies ajoutées.
+        """
+        table = self.table(symbol, interval)
+        df = df.assign(timestamp=to_milliseconds(df["timestamp"]))
+        df = df.sort_values("timestamp").drop_duplicates("timestamp", keep="last")
+        last = table.last_timestamp()
+        if last is not None:
+            df = df[df["timestamp"] > last]
+        return table.append(df)
+
+    def close_series(self, symbol, interval, start_ms=None, end_ms=None):
+        """Vue (sans copie) des clôtures d'une paire sur une plage de temps."""
+        return self.table(symbol, interval).read(["close"], start_ms, end_ms)["close"]
+
+
+def symbol_from_filename(path):
+    """Déduit la paire du nom de fichier, ex. data/historical_data_BTCUSDT.csv -> BTCUSDT."""
+    return os.path.splitext(os.path.basename(path))[0].split("_")[-1].upper()
+
+
+def migrate_csv_folder(data_folder="data", store=None, interval="1m"):
+    """
+    Migration unique des fichiers data/*.csv contenant des bougies vers le stockage binaire.
+    Les fichiers sans colonnes 'timestamp' et 'close' (Reddit, actualités...) sont ignorés ;
+    pour les fichiers combinés, seules les lignes de type 'historical' sont migrées.
+    :return: Dictionnaire {fichier: nombre de bougies ajoutées}.
+    """
+    store = store or MarketDataStore()
+    migrated = {}
+    for file in sorted(glob.glob(f"{data_folder}/*.csv")):
+        header = pd.read_csv(file, nrows=0).columns
+        if "timestamp" not in header or "close" not in header:
+            print(f"Ignoré (pas de bougies) : {file}")
+            continue
+        df = pd.read_csv(file, low_memory=False)
+        if "type" in df.columns:
+            df = df[df["type"] == "historical"]
+        for column in KLINE_SCHEMA:
+            if column not in df.columns:
+                df[column] = np.nan
+        df = df.dropna(subset=["timestamp", "close"])
+        migrated[file] = store.append_klines(symbol_from_filename(file), interval, df)
+        print(f"{file} : {migrated[file]} bougies migrées.")
+    return migrated
+
+
+def migrate_kline_partitions(symbol, interval, store=None, klines_root=None):
+    """
+    Importe les partitions Parquet du téléchargeur (data/klines/...) dans le stockage binaire.
+    :return: Nombre de bougies ajoutées.
+    """
+    from app.analysis.kline_downloader import KLINES_ROOT, load_klines
+
+    store = store or MarketDataStore()
+    last = store.table(symbol, interval).last_timestamp()
+    start_ms = None if last is None else last + 1
+    df = load_klines(symbol, interval, start_ms=start_ms, root=klines_root or KLINES_ROOT)
+    return store.append_klines(symbol, interval, df)
+
+
+if __name__ == "__main__":
+    migrate_csv_folder()
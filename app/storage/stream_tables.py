@@ -0,0 +1,164 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.storage.column_store import KLINE_SCHEMA, STORE_ROOT, MarketDataStore, to_milliseconds
+
+# Un flux = une table typée dans data/store/<SYMBOL>/<flux>/ ; les bougies utilisent
+# le dossier de leur intervalle (ex. data/store/BTCUSDT/1m/), partagé avec MarketDataStore.
+STREAM_SCHEMAS = {
+    "order_book": {"timestamp": "int64", "price": "float64", "quantity": "float64", "side": "int8"},
+    "funding_rate": {"timestamp": "int64", "funding_rate": "float64"},
+    "trades": {"timestamp": "int64", "id": "int64", "price": "float64", "quantity": "float64"},
+    "liquidations": {"timestamp": "int64", "price": "float64", "quantity": "float64", "side": "int8"},
+}
+# Colonnes identifiant une ligne au sein d'un même timestamp (par défaut : toutes les colonnes).
+# Les trades agrégés portent leur identifiant Binance `a`, unique même à la milliseconde près ;
+# une bougie (clé "klines", pour tout intervalle) est unique par heure d'ouverture.
+STREAM_KEYS = {"trades": ["timestamp", "id"], "klines": ["timestamp"]}
+SIDES = {"order_book_bid": 1, "order_book_ask": -1, "BUY": 1, "SELL": -1}
+
+
+def _sides(values):
+    return pd.Series(values).map(SIDES).fillna(0).to_numpy(dtype=np.int8)
+
+
+def klines_columns(df):
+    """Colonnes typées des bougies retournées par fetch_historical_data."""
+    return {"timestamp": to_milliseconds(df["timestamp"]), **{c: df[c].astype(float) for c in list(KLINE_SCHEMA)[1:]}}
+
+
+def order_book_columns(df, snapshot_ms):
+    """Colonnes typées du carnet d'ordres (fetch_order_book) ; toutes les lignes portent l'heure du snapshot."""
+    return {
+        "timestamp": np.full(len(df), snapshot_ms, dtype=np.int64),
+        "price": df["price"].astype(float),
+        "quantity": df["quantity"].astype(float),
+        "side": _sides(df["type"]),
+    }
+
+
+def funding_rate_columns(df):
+    """Colonnes typées des taux de financement (fetch_funding_rate)."""
+    return {"timestamp": to_milliseconds(df["fundingTime"]), "funding_rate": df["fundingRate"].astype(float)}
+
+
+def trades_columns(df):
+    """Colonnes typées des trades agrégés (fetch_aggregate_trades)."""
+    return {
+        "timestamp": to_milliseconds(df["T"]),
+        "id": df["a"].astype(np.int64),
+        "price": df["p"].astype(float),
+        "quantity": df["q"].astype(float),
+    }
+
+
+def liquidations_columns(df):
+    """Colonnes typées des liquidations (fetch_liquidations)."""
+    side = df["side"] if "side" in df.columns else pd.Series([""] * len(df))
+    return {
+        "timestamp": to_milliseconds(df["time"]),
+        "price": df["price"].astype(float),
+        "quantity": df["origQty"].astype(float),
+        "side": _sides(side),
+    }
+
+
+class StreamStore:
+    """
+    Stockage séparé et typé de chaque flux de marché d'une paire, avec un manifeste
+    (data/store/<SYMBOL>/manifest.json) décrivant schéma, nombre de lignes et plage de temps de chaque flux.
+    """
+
+    def __init__(self, root=STORE_ROOT):
+        self.root = root
+        self.market_store = MarketDataStore(root)
+
+    def _manifest_path(self, symbol):
+        return os.path.join(self.root, symbol, "manifest.json")
+
+    def manifest(self, symbol):
+        path = self._manifest_path(symbol)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def table(self, symbol, stream):
+        """Table d'un flux : 'order_book', 'funding_rate', 'trades', 'liquidations' ou un intervalle de bougies ('1m')."""
+        return self.market_store.table(symbol, stream, STREAM_SCHEMAS.get(stream, KLINE_SCHEMA))
+
+    def write(self, symbol, stream, columns):
+        """
+        Ajoute des lignes à un flux. Les lignes antérieures au dernier timestamp stocké sont ignorées ;
+        celles qui partagent ce timestamp ne sont ignorées que si elles sont déjà stockées (même clé,
+        voir STREAM_KEYS), pour ne pas perdre les trades d'une même milliseconde lus en deux fois.
+        :param columns: Dictionnaire {colonne: valeurs} conforme au schéma du flux.
+        :return: Nombre de lignes ajoutées.
+        """
+        df = pd.DataFrame(columns)
+        if df.empty:
+            return 0
+        table = self.table(symbol, stream)
+        keys = STREAM_KEYS.get(stream if stream in STREAM_SCHEMAS else "klines", list(table.schema))
+        df = df.sort_values("timestamp", kind="stable").drop_duplicates(keys, keep="last")
+        last = table.last_timestamp()
+        if last is not None:
+            df = df[df["timestamp"] >= last]
+            stored = table.to_frame(keys, start_ms=last)
+            seen = pd.MultiIndex.from_frame(stored.astype(df[keys].dtypes.to_dict()))
+            df = df[~pd.MultiIndex.from_frame(df[keys]).isin(seen)]
+        added = table.append(df)
+        self._update_manifest(symbol, stream, table)
+        return added
+
+    def _update_manifest(self, symbol, stream, table):
+        manifest = self.manifest(symbol)
+        timestamps = table.column("timestamp")
+        manifest[stream] = {
+            "path": stream,
+            "schema": table.schema,
+            "rows": table.rows,
+            "start_ms": int(timestamps[0]) if table.rows else None,
+            "end_ms": int(timestamps[-1]) if table.rows else None,
+        }
+        path = self._manifest_path(symbol)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def view(self, symbol, stream, columns=None, start_ms=None, end_ms=None):
+        """Vues mémoire mappées (sans copie) d'un seul flux sur une plage de temps."""
+        return self.table(symbol, stream).read(columns, start_ms, end_ms)
+
+    def read(self, symbol, stream, columns=None, start_ms=None, end_ms=None):
+        """DataFrame d'un seul flux sur une plage de temps ; les autres flux ne sont pas lus."""
+        return self.table(symbol, stream).to_frame(columns, start_ms, end_ms)
+
+
+def save_stream_tables(symbol, klines=None, order_book=None, funding_rate=None, trades=None, liquidations=None,
+                       interval="1m", root=STORE_ROOT, snapshot_ms=None):
+    """
+    Sauvegarde chaque flux retourné par les fonctions fetch_* dans sa propre table typée.
+    Remplace le CSV mixte de save_combined_data.
+    :return: Dictionnaire {flux: nombre de lignes ajoutées}.
+    """
+    store = StreamStore(root)
+    snapshot_ms = snapshot_ms or int(time.time() * 1000)
+    converters = {
+        interval: (klines, klines_columns),
+        "order_book": (order_book, lambda df: order_book_columns(df, snapshot_ms)),
+        "funding_rate": (funding_rate, funding_rate_columns),
+        "trades": (trades, trades_columns),
+        "liquidations": (liquidations, liquidations_columns),
+    }
+    written = {}
+    for stream, (df, to_columns) in converters.items():
+        if df is None or df.empty:
+            continue
+        written[stream] = store.write(symbol, stream, to_columns(df))
+        print(f"{symbol} / {stream} : {written[stream]} lignes ajoutées.")
+    return written
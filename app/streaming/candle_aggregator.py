@@ -0,0 +1,171 @@
+import threading
+import time
+
+import numpy as np
+
+from app.analysis.kline_downloader import INTERVAL_MS
+from app.streaming.ring_buffer import RingBuffer
+
+BAR_DTYPE = np.dtype([
+    ("timestamp", np.int64),  # Heure d'ouverture de la bougie, en millisecondes UTC
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("trades", np.int64),
+])
+
+
+class CandleAggregator:
+    """
+    Agrège les trades du WebSocket (`p`, `q`, `T`) en bougies OHLCV d'intervalle fixe, par paire.
+
+    La bougie en cours de chaque paire est stockée dans des tableaux typés
+    (une case par paire). Une bougie n'est émise (callback `on_bar`) qu'au
+    passage de la frontière d'intervalle : au premier trade de la bougie
+    suivante, ou lors d'un `flush` périodique si le marché est calme. Les
+    intervalles sans trade produisent des bougies plates de volume nul, comme
+    les klines Binance, pour que le modèle reçoive une bougie par intervalle.
+    Les trades (boucle du flux) et les `flush` (tâche périodique) peuvent venir
+    de threads différents : les bougies sont émises sous le verrou, une à la
+    fois et dans l'ordre, pour que l'état des indicateurs de `on_bar` ne soit
+    jamais mis à jour en parallèle.
+    """
+
+    def __init__(self, symbols, interval="1m", on_bar=None, history=1024, max_gap_bars=1440):
+        """
+        :param symbols: Liste des paires suivies.
+        :param interval: Intervalle des bougies ("1s", "1m", "5m", ...).
+        :param on_bar: Callback appelé avec (symbole, bougie) pour chaque bougie clôturée ;
+                       la bougie est un enregistrement NumPy de type BAR_DTYPE.
+        :param history: Nombre de bougies clôturées conservées par paire.
+        :param max_gap_bars: Nombre maximal de bougies vides générées pour combler un trou.
+        """
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.interval_ms = INTERVAL_MS[interval]
+        self.on_bar = on_bar
+        self.max_gap_bars = max_gap_bars
+
+        n_symbols = len(self.symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._start = np.full(n_symbols, -1, dtype=np.int64)  # -1 : aucune bougie en cours
+        self._open = np.zeros(n_symbols, dtype=np.float64)
+        self._high = np.zeros(n_symbols, dtype=np.float64)
+        self._low = np.zeros(n_symbols, dtype=np.float64)
+        self._close = np.zeros(n_symbols, dtype=np.float64)
+        self._volume = np.zeros(n_symbols, dtype=np.float64)
+        self._trades = np.zeros(n_symbols, dtype=np.int64)
+        self.history = {symbol: RingBuffer(history, dtype=BAR_DTYPE) for symbol in self.symbols}
+        self._lock = threading.RLock()  # Réentrant : `on_bar` peut appeler current_bar / bars_for
+
+        self.trades = 0
+        self.bars = 0
+        self.late_trades = 0
+
+    def on_trade(self, symbol, price, quantity, trade_time_ms):
+        """
+        Ajoute un trade à la bougie en cours de la paire.
+        :return: Nombre de bougies clôturées par ce trade.
+        """
+        i = self._index[symbol]
+        bar_start = trade_time_ms - trade_time_ms % self.interval_ms
+        with self._lock:
+            self.trades += 1
+            current = self._start[i]
+            if bar_start < current:
+                self.late_trades += 1  # Trade d'une bougie déjà émise
+                return 0
+            closed = []
+            if bar_start > current:
+                if current >= 0:
+                    closed = self._close_until(i, bar_start)
+                self._start[i] = bar_start
+                self._volume[i] = 0.0
+                self._trades[i] = 0
+            if self._trades[i] == 0:
+                # Premier trade de la bougie (y compris une bougie ouverte vide par `flush`)
+                self._open[i] = self._high[i] = self._low[i] = self._close[i] = price
+            else:
+                if price > self._high[i]:
+                    self._high[i] = price
+                elif price < self._low[i]:
+                    self._low[i] = price
+                self._close[i] = price
+            self._volume[i] += quantity
+            self._trades[i] += 1
+            self._emit(symbol, closed)
+        return len(closed)
+
+    def on_trade_message(self, data):
+        """
+        Traite un message de trade Binance ({"s", "p", "q", "T"}).
+        :return: Nombre de bougies clôturées.
+        """
+        symbol = data.get("s", self.symbols[0])
+        return self.on_trade(symbol, float(data["p"]), float(data["q"]), int(data["T"]))
+
+    def flush(self, now_ms=None):
+        """
+        Clôture les bougies dont l'intervalle est terminé, même sans nouveau trade.
+        :return: Nombre de bougies clôturées.
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        boundary = now_ms - now_ms % self.interval_ms
+        emitted = 0
+        for symbol in self.symbols:
+            i = self._index[symbol]
+            with self._lock:
+                if self._start[i] < 0 or self._start[i] >= boundary:
+                    continue
+                closed = self._close_until(i, boundary)
+                # La bougie suivante démarre vide : O/H/L/C seront fixés par son premier trade,
+                # ou elle sera émise plate au prix de clôture si l'intervalle se termine sans trade
+                self._start[i] = boundary
+                self._open[i] = self._high[i] = self._low[i] = self._close[i]
+                self._volume[i] = 0.0
+                self._trades[i] = 0
+                self._emit(symbol, closed)
+            emitted += len(closed)
+        return emitted
+
+    def _close_until(self, i, next_start):
+        """Clôture la bougie en cours de la ligne i et les bougies vides jusqu'à `next_start` (exclu)."""
+        bars = [(self._start[i], self._open[i], self._high[i], self._low[i], self._close[i],
+                 self._volume[i], self._trades[i])]
+        close = self._close[i]
+        empty_starts = range(self._start[i] + self.interval_ms, next_start, self.interval_ms)
+        for start in empty_starts[-self.max_gap_bars:] if self.max_gap_bars else ():
+            bars.append((start, close, close, close, close, 0.0, 0))
+        closed = np.array(bars, dtype=BAR_DTYPE)
+        self.history[self.symbols[i]].extend(closed)
+        self.bars += len(closed)
+        return closed
+
+    def _emit(self, symbol, closed):
+        if self.on_bar is not None:
+            for bar in closed:
+                self.on_bar(symbol, bar)
+
+    def current_bar(self, symbol):
+        """Bougie en cours (non clôturée) d'une paire, ou None."""
+        i = self._index[symbol]
+        with self._lock:
+            if self._start[i] < 0:
+                return None
+            return np.array((self._start[i], self._open[i], self._high[i], self._low[i], self._close[i],
+                             self._volume[i], self._trades[i]), dtype=BAR_DTYPE)
+
+    def bars_for(self, symbol, n=None):
+        """Copie des `n` dernières bougies clôturées d'une paire (toutes si n est None)."""
+        buffer = self.history[symbol]
+        return np.array(buffer.latest(len(buffer) if n is None else min(n, len(buffer))))
+
+    def stats(self):
+        return {
+            "trades": self.trades,
+            "bars": self.bars,
+            "late_trades": self.late_trades,
+            "trades_per_bar": self.trades / self.bars if self.bars else 0.0,
+        }
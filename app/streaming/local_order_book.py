@@ -0,0 +1,293 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class BookSide:
+    """
+    Un côté du carnet d'ordres, stocké dans deux tableaux NumPy triés (clés, quantités).
+
+    Les clés sont triées par ordre croissant avec le meilleur prix en dernière
+    position : clé = prix pour les achats (bids), clé = -prix pour les ventes
+    (asks). Le meilleur niveau se lit donc en O(1), une recherche par prix est
+    une recherche dichotomique en O(log n), et les mises à jour — concentrées
+    près du meilleur prix — ne décalent que la fin des tableaux.
+    """
+
+    def __init__(self, is_bid, capacity=1024):
+        """
+        :param is_bid: True pour le côté achat, False pour le côté vente.
+        :param capacity: Nombre initial de niveaux préalloués (doublé si nécessaire).
+        """
+        self.is_bid = is_bid
+        self._sign = 1.0 if is_bid else -1.0
+        self._keys = np.empty(capacity, dtype=np.float64)
+        self._quantities = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self):
+        capacity = 2 * len(self._keys)
+        for name in ("_keys", "_quantities"):
+            array = np.empty(capacity, dtype=np.float64)
+            array[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, array)
+
+    def clear(self):
+        self._size = 0
+
+    def load(self, prices, quantities):
+        """Remplace le contenu par un snapshot (niveaux dans un ordre quelconque, quantités nulles ignorées)."""
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        keep = quantities > 0
+        keys = prices[keep] * self._sign
+        order = np.argsort(keys, kind="stable")
+        while len(self._keys) < len(order):
+            self._grow()
+        self._size = len(order)
+        self._keys[:self._size] = keys[order]
+        self._quantities[:self._size] = quantities[keep][order]
+
+    def update(self, price, quantity):
+        """Fixe la quantité d'un niveau ; une quantité nulle supprime le niveau."""
+        key = price * self._sign
+        size = self._size
+        keys = self._keys
+        index = int(np.searchsorted(keys[:size], key))
+        if index < size and keys[index] == key:
+            if quantity > 0:
+                self._quantities[index] = quantity
+            else:
+                keys[index:size - 1] = keys[index + 1:size]
+                self._quantities[index:size - 1] = self._quantities[index + 1:size]
+                self._size -= 1
+        elif quantity > 0:
+            if size == len(keys):
+                self._grow()
+                keys = self._keys
+            keys[index + 1:size + 1] = keys[index:size]
+            self._quantities[index + 1:size + 1] = self._quantities[index:size]
+            keys[index] = key
+            self._quantities[index] = quantity
+            self._size += 1
+
+    def best(self):
+        """:return: (prix, quantité) du meilleur niveau, ou None si le côté est vide."""
+        if self._size == 0:
+            return None
+        return self._keys[self._size - 1] * self._sign, self._quantities[self._size - 1]
+
+    def quantity_at(self, price):
+        """Quantité affichée à un prix donné (0 si le niveau n'existe pas)."""
+        key = price * self._sign
+        index = int(np.searchsorted(self._keys[:self._size], key))
+        if index < self._size and self._keys[index] == key:
+            return float(self._quantities[index])
+        return 0.0
+
+    def top(self, levels):
+        """:return: (prix, quantités) des `levels` meilleurs niveaux, du meilleur au moins bon."""
+        start = max(0, self._size - levels)
+        return self._keys[start:self._size][::-1] * self._sign, self._quantities[start:self._size][::-1]
+
+    def volume_within(self, price_limit):
+        """Quantité cumulée des niveaux au moins aussi bons que `price_limit`."""
+        start = int(np.searchsorted(self._keys[:self._size], price_limit * self._sign))
+        return float(self._quantities[start:self._size].sum())
+
+
+class LocalOrderBook:
+    """
+    Carnet d'ordres local complet, maintenu à partir du flux Binance de mises à jour
+    différentielles (<symbol>@depth) et d'un snapshot REST (GET /api/v3/depth).
+
+    Synchronisation (procédure documentée par Binance) :
+    1. les événements reçus avant le snapshot sont mis en attente ;
+    2. les événements dont `u` <= lastUpdateId du snapshot sont ignorés ;
+    3. le premier événement appliqué doit couvrir lastUpdateId + 1 (U <= lastUpdateId + 1 <= u) ;
+    4. ensuite chaque événement doit suivre le précédent (U == u précédent + 1, ou
+       `pu` == u précédent pour les futures). Un trou invalide le carnet, qui
+       attend un nouveau snapshot (`needs_snapshot`).
+    """
+
+    def __init__(self, symbol, capacity=1024, max_pending=10000):
+        """
+        :param capacity: Nombre initial de niveaux préalloués par côté.
+        :param max_pending: Nombre maximal d'événements conservés en attente d'un snapshot.
+        """
+        self.symbol = symbol
+        self.bids = BookSide(True, capacity)
+        self.asks = BookSide(False, capacity)
+        self.max_pending = max_pending
+        self.last_update_id = None
+        self.synced = False
+        self._first_event = True
+        self._pending = deque(maxlen=max_pending)
+
+        self.events = 0
+        self.level_updates = 0
+        self.resyncs = 0
+
+    @property
+    def needs_snapshot(self):
+        return not self.synced
+
+    def apply_snapshot(self, snapshot):
+        """
+        Charge un snapshot REST ({"lastUpdateId", "bids", "asks"}) puis rejoue les événements en attente.
+        :return: True si le carnet est synchronisé.
+        """
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        for side, levels in ((self.bids, snapshot["bids"]), (self.asks, snapshot["asks"])):
+            levels = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+            side.load(levels[:, 0], levels[:, 1])
+        self.synced = True
+        self._first_event = True
+
+        pending = list(self._pending)
+        self._pending.clear()
+        for index, event in enumerate(pending):
+            self.on_depth_event(event)
+            if not self.synced:
+                # Trou entre le snapshot et le flux : les événements suivants attendent le prochain snapshot
+                self._pending.extend(pending[index + 1:])
+                break
+        return self.synced
+
+    def sync(self, fetch_snapshot):
+        """
+        (Re)synchronise le carnet.
+        :param fetch_snapshot: Fonction sans argument retournant un snapshot REST,
+                               ex. lambda: get_client().get_order_book(symbol="BTCUSDT", limit=5000).
+        """
+        return self.apply_snapshot(fetch_snapshot())
+
+    def _invalidate(self):
+        self.synced = False
+        self.resyncs += 1
+        self.bids.clear()
+        self.asks.clear()
+
+    def on_depth_event(self, event):
+        """
+        Traite un message du flux de profondeur (éventuellement encapsulé dans {"stream", "data"}).
+        :return: True si l'événement a été appliqué au carnet.
+        """
+        event = event.get("data", event)
+        if not self.synced:
+            self._pending.append(event)  # Les plus anciens sont écartés au-delà de max_pending
+            return False
+
+        first_id, final_id = int(event["U"]), int(event["u"])
+        if final_id <= self.last_update_id:
+            return False  # Déjà inclus dans le snapshot
+        if self._first_event:
+            in_sequence = first_id <= self.last_update_id + 1
+        elif "pu" in event:
+            in_sequence = int(event["pu"]) == self.last_update_id
+        else:
+            in_sequence = first_id == self.last_update_id + 1
+        if not in_sequence:
+            print(f"{self.symbol} : trou dans le flux de profondeur ({self.last_update_id} -> {first_id}), "
+                  f"nouveau snapshot nécessaire.")
+            self._invalidate()
+            self._pending.append(event)
+            return False
+
+        for side, levels in ((self.bids, event["b"]), (self.asks, event["a"])):
+            for price, quantity in levels:
+                side.update(float(price), float(quantity))
+            self.level_updates += len(levels)
+        self.last_update_id = final_id
+        self._first_event = False
+        self.events += 1
+        return True
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def spread(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return None if bid is None or ask is None else ask[0] - bid[0]
+
+    def mid_price(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return None if bid is None or ask is None else (bid[0] + ask[0]) / 2.0
+
+    def microprice(self):
+        """Prix moyen pondéré par la quantité du côté opposé au meilleur niveau."""
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] * ask[1] + ask[0] * bid[1]) / (bid[1] + ask[1])
+
+    def depth_at(self, price, side="bid"):
+        """Quantité affichée à un prix donné, côté 'bid' ou 'ask'."""
+        return (self.bids if side == "bid" else self.asks).quantity_at(price)
+
+    def imbalance(self, levels=1):
+        """
+        Déséquilibre (volume achat - volume vente) / (volume total) sur les `levels` meilleurs niveaux.
+        :return: Valeur entre -1 et 1, ou None si le carnet est vide.
+        """
+        bid_volume = self.bids.top(levels)[1].sum()
+        ask_volume = self.asks.top(levels)[1].sum()
+        total = bid_volume + ask_volume
+        return None if total == 0 else float((bid_volume - ask_volume) / total)
+
+    def depth_within(self, fraction=0.001):
+        """:return: (volume achat, volume vente) à moins de `fraction` du prix médian."""
+        mid = self.mid_price()
+        if mid is None:
+            return 0.0, 0.0
+        return self.bids.volume_within(mid * (1 - fraction)), self.asks.volume_within(mid * (1 + fraction))
+
+
+def replay_depth_file(path, symbol=None, book=None):
+    """
+    Rejoue un enregistrement JSONL de messages de profondeur dans un carnet local, pour mesurer le débit hors ligne.
+    Chaque ligne est soit un snapshot REST (clé "lastUpdateId"), soit un événement du flux de profondeur.
+    :return: Dictionnaire de statistiques (événements, niveaux mis à jour, durée, débits).
+    """
+    with open(path) as f:
+        messages = [json.loads(line) for line in f if line.strip()]
+
+    book = book or LocalOrderBook(symbol or "REPLAY")
+    start = time.perf_counter()
+    for message in messages:
+        if "lastUpdateId" in message:
+            book.apply_snapshot(message)
+        else:
+            book.on_depth_event(message)
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "messages": len(messages),
+        "events": book.events,
+        "level_updates": book.level_updates,
+        "resyncs": book.resyncs,
+        "seconds": elapsed,
+        "events_per_s": book.events / elapsed if elapsed > 0 else 0.0,
+        "updates_per_s": book.level_updates / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"Rejeu de {path} : {stats['events']} événements, {stats['level_updates']} niveaux en {elapsed:.3f} s "
+          f"({stats['events_per_s']:.0f} événements/s, {stats['updates_per_s']:.0f} mises à jour/s).")
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rejoue un enregistrement JSONL de messages de profondeur.")
+    parser.add_argument("path")
+    parser.add_argument("--symbol", default=None)
+    args = parser.parse_args()
+    replay_depth_file(args.path, args.symbol)
@@ -0,0 +1,262 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Histogrammes : 64 sous-intervalles par puissance de deux (erreur relative < 1,6 %),
+# valeurs en nanosecondes jusqu'à 2**40 ns (~18 minutes)
+SUB_BUCKET_BITS = 6
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_VALUE_BITS = 40
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(value):
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    if shift <= 0:
+        return value
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_upper(index):
+    """Plus grande valeur (ns) représentée par un intervalle."""
+    shift = max(0, (index >> SUB_BUCKET_BITS) - 1)
+    return ((index - (shift << SUB_BUCKET_BITS)) << shift) + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Histogramme de latences à intervalles log-linéaires (type HDR) : enregistrement
+    en temps constant, sans allocation, et quantiles (p50, p99...) à ~1,6 % près.
+    """
+
+    def __init__(self):
+        self.size = _bucket_index((1 << MAX_VALUE_BITS) - 1) + 1
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self._lock = threading.Lock()
+
+    def record_ns(self, value):
+        value = min(max(int(value), 0), (1 << MAX_VALUE_BITS) - 1)
+        index = _bucket_index(value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ns += value
+            if value > self.max_ns:
+                self.max_ns = value
+
+    def record(self, seconds):
+        self.record_ns(seconds * 1e9)
+
+    def quantiles(self, quantiles=QUANTILES):
+        """:return: Dictionnaire {quantile: latence en millisecondes}."""
+        with self._lock:
+            counts = np.array(self.counts, dtype=np.int64)
+            count, max_ns = self.count, self.max_ns
+        if count == 0:
+            return {q: 0.0 for q in quantiles}
+        cumulative = np.cumsum(counts)
+        result = {}
+        for q in quantiles:
+            index = int(np.searchsorted(cumulative, max(1, int(np.ceil(q * count)))))
+            result[q] = min(_bucket_upper(index), max_ns) / 1e6
+        return result
+
+    def summary(self):
+        """Nombre de mesures, moyenne, maximum et quantiles, en millisecondes."""
+        with self._lock:
+            count, total, max_ns = self.count, self.total_ns, self.max_ns
+        return {
+            "count": count,
+            "mean_ms": total / count / 1e6 if count else 0.0,
+            "max_ms": max_ns / 1e6,
+            **{f"p{q * 100:g}_ms": value for q, value in self.quantiles().items()},
+        }
+
+
+class MetricsRegistry:
+    """
+    Compteurs, jauges et histogrammes de latence par étape du flux temps réel.
+
+    Les mesures utilisent l'horloge monotone (`time.perf_counter_ns`) ; le coût
+    d'un enregistrement est de l'ordre de la microseconde, ce qui permet de
+    l'utiliser à chaque tick.
+    """
+
+    def __init__(self, prefix="crypto"):
+        self.prefix = prefix
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram())
+        return histogram
+
+    def inc(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name, func):
+        """Enregistre une jauge, évaluée à chaque lecture (ex. taille d'une file d'attente)."""
+        self.gauges[name] = func
+
+    def observe(self, stage, seconds):
+        self.histogram(stage).record(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """Mesure la durée du bloc dans l'histogramme de l'étape."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.histogram(stage).record_ns(time.perf_counter_ns() - start)
+
+    def timed(self, stage, func):
+        """Enveloppe une fonction pour mesurer chacun de ses appels (ex. `predict`)."""
+        histogram = self.histogram(stage)
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record_ns(time.perf_counter_ns() - start)
+
+        return wrapper
+
+    def snapshot(self):
+        """:return: Dictionnaire {counters, gauges, latencies} des valeurs courantes."""
+        gauges = {}
+        for name, func in list(self.gauges.items()):
+            try:
+                gauges[name] = float(func())
+            except Exception:
+                gauges[name] = float("nan")
+        return {
+            "uptime_s": time.monotonic() - self.started_at,
+            "counters": dict(self.counters),
+            "gauges": gauges,
+            "latencies": {stage: histogram.summary() for stage, histogram in list(self.histograms.items())},
+        }
+
+    def render_text(self):
+        """Exporte les métriques au format texte Prometheus."""
+        p = self.prefix
+        snapshot = self.snapshot()
+        lines = [f"{p}_uptime_seconds {snapshot['uptime_s']:.3f}"]
+        for name, value in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE {p}_{name}_total counter", f"{p}_{name}_total {value}"]
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines += [f"# TYPE {p}_{name} gauge", f"{p}_{name} {value:g}"]
+        if self.histograms:
+            lines.append(f"# TYPE {p}_stage_latency_ms summary")
+        for stage, histogram in sorted(self.histograms.items()):
+            for q, value in histogram.quantiles().items():
+                lines.append(f'{p}_stage_latency_ms{{stage="{stage}",quantile="{q:g}"}} {value:.4f}')
+            lines.append(f'{p}_stage_latency_ms_sum{{stage="{stage}"}} {histogram.total_ns / 1e6:.4f}')
+            lines.append(f'{p}_stage_latency_ms_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def report(self, logger=None):
+        """Écrit un résumé (compteurs et p50/p99/max par étape) dans le journal."""
+        logger = logger or logging.getLogger("app.metrics")
+        snapshot = self.snapshot()
+        logger.info("Compteurs : %s | Jauges : %s", snapshot["counters"], snapshot["gauges"])
+        for stage, s in sorted(snapshot["latencies"].items()):
+            logger.info("  %-12s n=%d p50=%.3f ms p99=%.3f ms p99.9=%.3f ms max=%.3f ms",
+                        stage, s["count"], s["p50_ms"], s["p99_ms"], s["p99.9_ms"], s["max_ms"])
+
+
+class MetricsServer:
+    """Point d'accès HTTP local (GET /metrics) exposant un registre au format texte, dans un thread dédié."""
+
+    def __init__(self, registry, port=9108, host="127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.rstrip("/") not in ("", "/metrics"):
+                    handler.send_error(404)
+                    return
+                body = registry.render_text().encode()
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass  # Pas de journal par requête
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SampledLogger:
+    """
+    Journalisation échantillonnée pour le chemin critique : au plus un message par clé
+    et par intervalle, les messages ignorés étant comptés et signalés au message suivant.
+    Le message n'est formaté que s'il est effectivement écrit.
+    """
+
+    def __init__(self, logger, interval=1.0):
+        """
+        :param interval: Intervalle minimal (secondes) entre deux messages d'une même clé.
+        """
+        self.logger = logger
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+
+    def log(self, level, key, msg, *args):
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        if now - self._last.get(key, -self.interval) < self.interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+        self._last[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            msg += " (+%d messages ignorés)"
+            args += (suppressed,)
+        self.logger.log(level, msg, *args)
+
+    def debug(self, key, msg, *args):
+        self.log(logging.DEBUG, key, msg, *args)
+
+    def info(self, key, msg, *args):
+        self.log(logging.INFO, key, msg, *args)
+
+    def warning(self, key, msg, *args):
+        self.log(logging.WARNING, key, msg, *args)
+
+
+# Registre partagé par le flux temps réel
+metrics = MetricsRegistry()
@@ -0,0 +1,180 @@
+import threading
+import time
+
+import numpy as np
+
+from app.streaming.ring_buffer import RingBuffer
+
+
+class MultiSymbolEngine:
+    """
+    Moteur d'inférence multi-paires partageant un seul modèle chargé.
+
+    La fenêtre glissante de chaque paire est un buffer circulaire (ajout en
+    O(1), lecture sans copie des `seq_length` derniers prix). À chaque pas,
+    une seule passe `predict` est exécutée sur toutes les paires dont la
+    fenêtre a avancé depuis le pas précédent (fenêtres copiées dans un tampon
+    de batch préalloué). Les passes sont déclenchées par le runtime
+    (StreamRuntime), qui laisse les ticks s'accumuler pendant sa fenêtre de
+    coalescence :
+
+    - seule la fenêtre la plus récente de chaque paire est prédite ; les ticks
+      intermédiaires sont comptés comme coalescés ;
+    - sous contre-pression, une fenêtre dont le dernier tick est plus ancien
+      que `max_window_age` n'est pas prédite (prédiction périmée) ; ses ticks
+      sont comptés comme abandonnés.
+    """
+
+    def __init__(self, symbols, predict_fn, seq_length=50, on_prediction=None, max_window_age=None):
+        """
+        :param symbols: Liste des paires suivies (ex. ["BTCUSDT", "ETHUSDT"]).
+        :param predict_fn: Fonction prenant un tableau (batch, seq_length, 1) et retournant (batch, 1).
+        :param seq_length: Longueur des séquences attendues par le modèle.
+        :param on_prediction: Callback appelé avec (symbole, dernier prix, prix prédit).
+        :param max_window_age: Âge maximal (secondes) du dernier tick d'une fenêtre au moment de la passe ;
+                               None : les fenêtres ne sont jamais périmées.
+        """
+        self.symbols = list(symbols)
+        self.predict_fn = predict_fn
+        self.seq_length = seq_length
+        self.on_prediction = on_prediction
+        self.max_window_age = max_window_age
+
+        n_symbols = len(self.symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.windows = [RingBuffer(seq_length, dtype=np.float32) for _ in self.symbols]
+        self._dirty = np.zeros(n_symbols, dtype=bool)
+        # Heure d'arrivée du plus ancien tick non encore prédit, par paire
+        self._pending_since = np.zeros(n_symbols, dtype=np.float64)
+        # Ticks reçus depuis la dernière prédiction et heure du plus récent, par paire
+        self._pending_ticks = np.zeros(n_symbols, dtype=np.int64)
+        self._updated_at = np.zeros(n_symbols, dtype=np.float64)
+        self._batch = np.zeros((n_symbols, seq_length, 1), dtype=np.float32)
+
+        self._lock = threading.Lock()  # Fenêtres et paires en attente (threads WebSocket / boucle)
+        self._step_lock = threading.Lock()  # Une seule passe à la fois : tampon de batch et statistiques partagés
+
+        self.ticks = np.zeros(n_symbols, dtype=np.int64)
+        self.predictions = np.zeros(n_symbols, dtype=np.int64)
+        self.coalesced = np.zeros(n_symbols, dtype=np.int64)
+        self.dropped = np.zeros(n_symbols, dtype=np.int64)
+        self.latency_sum = np.zeros(n_symbols, dtype=np.float64)
+        self.latency_max = np.zeros(n_symbols, dtype=np.float64)
+        self.latency_last = np.zeros(n_symbols, dtype=np.float64)
+        self.steps = 0
+        self._started_at = time.monotonic()
+
+    def prime(self, symbol, prices):
+        """Pré-remplit la fenêtre d'une paire avec des prix historiques."""
+        prices = np.asarray(prices, dtype=np.float32)[-self.seq_length:]
+        if len(prices) == 0:
+            return
+        i = self._index[symbol]
+        with self._lock:
+            self.windows[i].extend(prices)
+
+    def push(self, symbol, price):
+        """Ajoute un prix reçu en temps réel pour une paire. Appelé depuis les threads WebSocket."""
+        i = self._index[symbol]
+        now = time.monotonic()
+        with self._lock:
+            window = self.windows[i]
+            window.append(price)
+            self.ticks[i] += 1
+            self._updated_at[i] = now
+            # Tant que la fenêtre n'est pas pleine, la latence part du dernier prix reçu
+            if not self._dirty[i] or window.total <= self.seq_length:
+                self._dirty[i] = True
+                self._pending_since[i] = now
+                self._pending_ticks[i] = 1
+            else:
+                self._pending_ticks[i] += 1
+
+    def step(self):
+        """
+        Exécute une passe d'inférence sur toutes les paires dont la fenêtre a avancé
+        (fenêtre la plus récente de chaque paire, fenêtres périmées ignorées).
+        Les appels concurrents sont sérialisés.
+        :return: Dictionnaire {symbole: prix prédit} pour les paires prédites.
+        """
+        with self._step_lock:
+            with self._lock:
+                rows = np.asarray([i for i in np.flatnonzero(self._dirty)
+                                   if len(self.windows[i]) == self.seq_length], dtype=np.int64)
+                if self.max_window_age is not None and len(rows):
+                    stale = rows[time.monotonic() - self._updated_at[rows] > self.max_window_age]
+                    self.dropped[stale] += self._pending_ticks[stale]
+                    self._pending_ticks[stale] = 0
+                    self._dirty[stale] = False
+                    rows = rows[~np.isin(rows, stale)]
+                if not len(rows):
+                    return {}
+                count = len(rows)
+                for k, i in enumerate(rows):
+                    self._batch[k, :, 0] = self.windows[i].latest(self.seq_length)
+                pending_since = self._pending_since[rows]
+                self.coalesced[rows] += self._pending_ticks[rows] - 1
+                self._pending_ticks[rows] = 0
+                self._dirty[rows] = False
+
+            predictions = np.asarray(self.predict_fn(self._batch[:count])).reshape(count, -1)[:, 0]
+            latency = time.monotonic() - pending_since
+
+            self.steps += 1
+            self.predictions[rows] += 1
+            self.latency_sum[rows] += latency
+            self.latency_last[rows] = latency
+            np.maximum.at(self.latency_max, rows, latency)
+
+            results = {}
+            for k, row in enumerate(rows):
+                symbol = self.symbols[row]
+                results[symbol] = float(predictions[k])
+                if self.on_prediction is not None:
+                    self.on_prediction(symbol, float(self._batch[k, -1, 0]), results[symbol])
+            return results
+
+    def stats(self):
+        """
+        Retourne le débit agrégé, les ticks coalescés et abandonnés, et la latence (tick -> prédiction)
+        par paire, en millisecondes.
+        """
+        elapsed = time.monotonic() - self._started_at
+        total_predictions = int(self.predictions.sum())
+        per_symbol = {}
+        for i, symbol in enumerate(self.symbols):
+            n = int(self.predictions[i])
+            per_symbol[symbol] = {
+                "ticks": int(self.ticks[i]),
+                "predictions": n,
+                "coalesced": int(self.coalesced[i]),
+                "dropped": int(self.dropped[i]),
+                "latency_mean_ms": 1000 * self.latency_sum[i] / n if n else 0.0,
+                "latency_max_ms": 1000 * self.latency_max[i],
+                "latency_last_ms": 1000 * self.latency_last[i],
+            }
+        return {
+            "steps": self.steps,
+            "ticks": int(self.ticks.sum()),
+            "predictions": total_predictions,
+            "coalesced": int(self.coalesced.sum()),
+            "dropped": int(self.dropped.sum()),
+            "mean_batch_size": total_predictions / self.steps if self.steps else 0.0,
+            "predictions_per_sec": total_predictions / elapsed if elapsed > 0 else 0.0,
+            "symbols": per_symbol,
+        }
+
+    def report(self):
+        """Affiche le débit agrégé, les ticks coalescés/abandonnés et la latence moyenne/max par paire."""
+        s = self.stats()
+        print(
+            f"Moteur multi-paires : {s['ticks']} ticks, {s['predictions']} prédictions en {s['steps']} passes "
+            f"(batch moyen {s['mean_batch_size']:.1f}), {s['coalesced']} coalescés, {s['dropped']} abandonnés, "
+            f"{s['predictions_per_sec']:.1f} prédictions/s"
+        )
+        for symbol, symbol_stats in s["symbols"].items():
+            print(
+                f"  {symbol} : latence moyenne {symbol_stats['latency_mean_ms']:.1f} ms, "
+                f"max {symbol_stats['latency_max_ms']:.1f} ms, {symbol_stats['coalesced']} coalescés, "
+                f"{symbol_stats['dropped']} abandonnés"
+            )
@@ -0,0 +1,67 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class RingBuffer:
+    """
+    Buffer circulaire préalloué pour les prix reçus en temps réel.
+
+    Chaque valeur est écrite deux fois (positions i et i + capacity), ce qui
+    permet de lire les n dernières valeurs comme une vue contiguë, sans copie
+    ni réallocation, quel que soit l'endroit où se trouve la tête d'écriture.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        """
+        :param capacity: Nombre maximal de valeurs conservées.
+        :param dtype: Type NumPy des valeurs stockées.
+        """
+        if capacity <= 0:
+            raise ValueError("La capacité du buffer doit être strictement positive.")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._head = 0  # Prochaine position d'écriture
+        self._total = 0  # Nombre total de valeurs écrites depuis la création
+
+    def __len__(self):
+        return min(self._total, self.capacity)
+
+    @property
+    def total(self):
+        """Nombre total de valeurs écrites (y compris celles déjà écrasées)."""
+        return self._total
+
+    def append(self, value):
+        """Ajoute une valeur en O(1)."""
+        self._data[self._head] = value
+        self._data[self._head + self.capacity] = value
+        self._head += 1
+        if self._head == self.capacity:
+            self._head = 0
+        self._total += 1
+
+    def extend(self, values):
+        """Ajoute plusieurs valeurs (seules les `capacity` dernières sont gardées)."""
+        values = np.asarray(values, dtype=self._data.dtype).ravel()
+        if len(values) > self.capacity:
+            self._total += len(values) - self.capacity
+            values = values[-self.capacity:]
+        for value in values:
+            self.append(value)
+
+    def latest(self, n):
+        """
+        Retourne une vue (sans copie) sur les n dernières valeurs, de la plus ancienne à la plus récente.
+        :param n: Nombre de valeurs, au plus len(buffer).
+        """
+        if n > len(self):
+            raise ValueError(f"Seulement {len(self)} valeurs disponibles, {n} demandées.")
+        end = self._head + self.capacity
+        return self._data[end - n:end]
+
+    def windows(self, window_length, count):
+        """
+        Retourne les `count` dernières fenêtres glissantes de longueur `window_length`.
+        :return: Vue de forme (count, window_length), la dernière ligne étant la plus récente.
+        """
+        return sliding_window_view(self.latest(window_length + count - 1), window_length)
@@ -0,0 +1,139 @@
+import asyncio
+import functools
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StreamRuntime:
+    """
+    Runtime asyncio du flux temps réel.
+
+    Le consommateur WebSocket, l'inférence, le backfill des bougies et les
+    rafraîchissements périodiques (actualités, Reddit) tournent comme des
+    tâches coopératives. Les appels bloquants (SDK Binance, praw, requests,
+    predict) sont exécutés dans un pool de threads borné. Aucune boucle
+    active : au repos, le processus attend sur des événements.
+
+    Coalescence : le premier tick après une passe arme la tâche d'inférence,
+    qui attend `coalesce_window` avant la passe suivante ; tous les ticks
+    arrivés entre-temps sont prédits en une seule passe (voir
+    MultiSymbolEngine pour le compte des ticks coalescés et abandonnés).
+    """
+
+    def __init__(self, message_handler, step_fn, coalesce_window=0.05, max_workers=4, queue_size=10000):
+        """
+        :param message_handler: Fonction appelée (dans la boucle asyncio) pour chaque message WebSocket.
+        :param step_fn: Fonction bloquante exécutant une passe d'inférence.
+        :param coalesce_window: Durée (secondes) pendant laquelle les ticks sont accumulés avant une passe.
+        :param max_workers: Nombre maximal de threads pour les appels bloquants.
+        :param queue_size: Nombre maximal de messages en attente ; au-delà, les plus anciens sont abandonnés.
+        """
+        self.message_handler = message_handler
+        self.step_fn = step_fn
+        self.coalesce_window = coalesce_window
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="runtime")
+        self.dropped_messages = 0
+
+        self._startup_jobs = []
+        self._periodic_jobs = []
+        self._loop = None
+        self._queue = None
+        self._tick = None
+        self._stop = None
+
+    def add_startup_job(self, name, func, *args):
+        """Ajoute un appel bloquant exécuté une fois avant l'ouverture des WebSockets (ex. backfill)."""
+        self._startup_jobs.append((name, func, args))
+
+    def add_periodic_job(self, name, interval, func, *args):
+        """Ajoute un appel bloquant répété toutes les `interval` secondes (ex. actualités)."""
+        self._periodic_jobs.append((name, interval, func, args))
+
+    async def run_blocking(self, func, *args):
+        """Exécute un appel bloquant dans le pool de threads sans bloquer la boucle."""
+        return await self._loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    def request_step(self):
+        """
+        Demande une passe d'inférence depuis n'importe quel thread (ex. bougies clôturées par une tâche
+        périodique). La passe est exécutée par la tâche d'inférence : jamais deux passes en parallèle.
+        """
+        if self._tick is not None:
+            self._loop.call_soon_threadsafe(self._tick.set)
+
+    def pending_messages(self):
+        """Nombre de messages WebSocket en attente de traitement."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def threadsafe_callback(self, data):
+        """Callback à passer aux WebSockets : transfère le message de leur thread vers la boucle asyncio."""
+        self._loop.call_soon_threadsafe(self._enqueue, data)
+
+    async def run(self, start_streams, stop_streams):
+        """
+        Exécute le runtime jusqu'à SIGINT/SIGTERM.
+        :param start_streams: Fonction bloquante recevant le callback et retournant les clients WebSocket.
+        :param stop_streams: Fonction bloquante recevant les clients WebSocket à fermer.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tick = asyncio.Event()
+        self._stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows ou thread secondaire : KeyboardInterrupt reste disponible
+
+        tasks = [asyncio.create_task(self._periodic(*job), name=job[0]) for job in self._periodic_jobs]
+        clients = []
+        try:
+            await asyncio.gather(*(self._run_job(name, func, args) for name, func, args in self._startup_jobs))
+            clients = await self.run_blocking(start_streams, self.threadsafe_callback)
+            tasks.append(asyncio.create_task(self._consume(), name="websocket"))
+            tasks.append(asyncio.create_task(self._infer(), name="inference"))
+            await self._stop.wait()
+        finally:
+            print("Arrêt du runtime...")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if clients:
+                await self.run_blocking(stop_streams, clients)
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _enqueue(self, data):
+        if self._queue.full():
+            # Sous contre-pression, le message le plus ancien est abandonné
+            self._queue.get_nowait()
+            self.dropped_messages += 1
+        self._queue.put_nowait(data)
+
+    async def _consume(self):
+        while True:
+            data = await self._queue.get()
+            self.message_handler(data)
+            self._tick.set()
+
+    async def _infer(self):
+        while True:
+            await self._tick.wait()
+            # Laisser les ticks s'accumuler pendant la fenêtre de coalescence
+            await asyncio.sleep(self.coalesce_window)
+            self._tick.clear()
+            try:
+                await self.run_blocking(self.step_fn)
+            except Exception as e:
+                print(f"Erreur lors de l'inférence : {e}")
+
+    async def _run_job(self, name, func, args):
+        try:
+            await self.run_blocking(func, *args)
+        except Exception as e:
+            print(f"Erreur dans la tâche {name} : {e}")
+
+    async def _periodic(self, name, interval, func, args):
+        while True:
+            await self._run_job(name, func, args)
+            await asyncio.sleep(interval)
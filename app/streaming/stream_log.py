@@ -0,0 +1,220 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from app.streaming.metrics import LatencyHistogram
+
+# Journal binaire en ajout seul : en-tête de fichier, puis enregistrements
+#   <type: u8><flux: u16><réception: i64 ns Unix><taille: u32><données>
+# Un enregistrement STREAM déclare le nom d'un flux (données = nom UTF-8) avant son premier message ;
+# un enregistrement MESSAGE contient le message brut (JSON compact UTF-8) tel que reçu du WebSocket.
+MAGIC = b"CSTRLOG1"
+RECORD = struct.Struct("<BHqI")
+MESSAGE = 0
+STREAM = 1
+
+
+class StreamRecorder:
+    """
+    Enregistre les messages bruts des WebSockets avec leur heure de réception dans un journal binaire compact.
+
+    Le fichier est ouvert en ajout : un enregistrement interrompu peut être repris dans le même
+    fichier, et un arrêt brutal ne perd au plus que le dernier enregistrement partiel (ignoré à la
+    relecture). L'écriture est protégée par un verrou : les callbacks de plusieurs threads
+    WebSocket peuvent partager le même enregistreur.
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        """
+        :param flush_interval: Intervalle maximal (secondes) entre deux vidages du tampon sur disque.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.streams = {}
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._resume(path)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def _resume(self, path):
+        """
+        Reprise d'un journal existant : les flux déjà déclarés gardent leur identifiant, et un dernier
+        enregistrement incomplet (arrêt brutal) est tronqué pour que les suivants restent lisibles.
+        """
+        end = len(MAGIC)
+        for kind, stream_id, _, payload in _records(path):
+            end += RECORD.size + len(payload)
+            if kind == STREAM:
+                self.streams[payload.decode("utf-8")] = stream_id
+        size = os.path.getsize(path)
+        if size < len(MAGIC):
+            end = 0  # En-tête lui-même incomplet : le journal est réécrit
+        if end < size:
+            os.truncate(path, end)
+
+    def _stream_id(self, stream):
+        stream_id = self.streams.get(stream)
+        if stream_id is None:
+            stream_id = self.streams[stream] = len(self.streams)
+            name = stream.encode("utf-8")
+            self._file.write(RECORD.pack(STREAM, stream_id, time.time_ns(), len(name)) + name)
+        return stream_id
+
+    def record(self, data, stream="default", received_ns=None):
+        """
+        Ajoute un message au journal.
+        :param data: Message brut (str ou bytes) ou déjà décodé (dictionnaire, sérialisé en JSON compact).
+        :param received_ns: Heure de réception (ns Unix), par défaut maintenant.
+        """
+        received_ns = time.time_ns() if received_ns is None else received_ns
+        if isinstance(data, str):
+            payload = data.encode("utf-8")
+        elif isinstance(data, bytes):
+            payload = data
+        else:
+            payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            stream_id = self._stream_id(stream)
+            self._file.write(RECORD.pack(MESSAGE, stream_id, received_ns, len(payload)))
+            self._file.write(payload)
+            self.messages += 1
+            self.bytes += RECORD.size + len(payload)
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = now
+
+    def wrap(self, callback, stream="default"):
+        """
+        Enveloppe un callback WebSocket : chaque message est enregistré à sa réception puis transmis.
+        Exemple : WebSocketClient(symbol, on_message_callback=recorder.wrap(callback, symbol)).
+        """
+        def recording_callback(data):
+            self.record(data, stream)
+            return callback(data)
+
+        return recording_callback
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _records(path):
+    """Parcourt les enregistrements (type, flux, réception ns, données brutes) d'un journal mappé en mémoire."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= len(MAGIC):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} n'est pas un journal de flux ({MAGIC.decode()}).")
+            offset, end = len(MAGIC), len(data)
+            while offset + RECORD.size <= end:
+                kind, stream_id, received_ns, size = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                if offset + size > end:
+                    break  # Dernier enregistrement incomplet (arrêt brutal pendant l'écriture)
+                yield kind, stream_id, received_ns, data[offset:offset + size]
+                offset += size
+
+
+def read_stream_names(path):
+    """:return: Dictionnaire {identifiant: nom} des flux déclarés dans un journal."""
+    return {stream_id: payload.decode("utf-8") for kind, stream_id, _, payload in _records(path) if kind == STREAM}
+
+
+def read_stream_log(path, streams=None, decode=True):
+    """
+    Relit un journal dans l'ordre d'enregistrement.
+    :param streams: Noms des flux à relire (None : tous).
+    :param decode: Décode les messages JSON (sinon bytes bruts).
+    :return: Générateur de tuples (heure de réception ns, nom du flux, message).
+    """
+    names = {}
+    for kind, stream_id, received_ns, payload in _records(path):
+        if kind == STREAM:
+            names[stream_id] = payload.decode("utf-8")
+            continue
+        stream = names.get(stream_id, str(stream_id))
+        if streams is not None and stream not in streams:
+            continue
+        yield received_ns, stream, json.loads(payload) if decode else payload
+
+
+def replay_stream_log(path, callback, speed=1.0, streams=None, after_message=None):
+    """
+    Renvoie les messages d'un journal au callback qui les recevait en direct (ex. handle_realtime_data).
+    Les messages sont décodés avant le chronométrage : seul le traitement du callback est mesuré.
+    :param speed: 1.0 = temps réel, N = N fois plus vite, None = aussi vite que possible.
+    :param after_message: Fonction appelée sans argument après chaque message (ex. une passe d'inférence).
+    :return: Statistiques (messages, durée, messages/s, retard sur le calendrier d'origine).
+    """
+    messages = list(read_stream_log(path, streams))
+    lag = LatencyHistogram()
+    if not messages:
+        return {"messages": 0, "seconds": 0.0, "messages_per_s": 0.0, "recorded_seconds": 0.0}
+
+    first_ns = messages[0][0]
+    started = time.perf_counter()
+    for received_ns, _, data in messages:
+        if speed is not None:
+            # Attendre l'heure relative de réception d'origine, mise à l'échelle
+            delay = (received_ns - first_ns) / 1e9 / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                lag.record(-delay)
+        callback(data)
+        if after_message is not None:
+            after_message()
+    elapsed = time.perf_counter() - started
+
+    stats = {
+        "messages": len(messages),
+        "seconds": elapsed,
+        "messages_per_s": len(messages) / elapsed if elapsed > 0 else 0.0,
+        "recorded_seconds": (messages[-1][0] - first_ns) / 1e9,
+        "speed": speed,
+    }
+    if speed is not None:
+        # Retard accumulé sur le calendrier d'origine : > 0 si le traitement ne suit pas le débit du flux
+        stats["schedule_lag"] = lag.summary()
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Résumé d'un journal de flux WebSocket.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    counts, first, last = {}, None, None
+    for received_ns, stream, _ in read_stream_log(args.path, decode=False):
+        counts[stream] = counts.get(stream, 0) + 1
+        first = received_ns if first is None else first
+        last = received_ns
+    total = sum(counts.values())
+    duration = (last - first) / 1e9 if total else 0.0
+    print(f"{args.path} : {total} messages sur {duration:.1f} s ({os.path.getsize(args.path) / 1e6:.1f} Mo)")
+    for stream, count in sorted(counts.items()):
+        print(f"  {stream:<16} {count} messages")
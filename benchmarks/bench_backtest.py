@@ -0,0 +1,46 @@
+"""
+Mesure le temps d'un balayage de paramètres Stop-Loss / Take-Profit du backtester vectorisé.
+
+Usage : python -m benchmarks.bench_backtest --bars 2000000 --grid 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.decision.backtest import Backtester, sweep
+from benchmarks.synthetic import synthetic_klines
+
+
+def synthetic_signals(n_bars, probability=0.01, seed=1):
+    """Signaux d'entrée aléatoires (une bougie sur 100 en moyenne)."""
+    return np.random.default_rng(seed).random(n_bars) < probability
+
+
+def run(n_bars, grid, workers=None):
+    bars = synthetic_klines(n_bars)
+    signals = synthetic_signals(n_bars)
+    start = time.perf_counter()
+    backtester = Backtester(bars["high"], bars["low"], bars["close"], max_holding=1440)
+    build = time.perf_counter() - start
+
+    stop_losses = np.linspace(0.5, 5.0, grid)
+    take_profits = np.linspace(0.5, 10.0, grid)
+    start = time.perf_counter()
+    results = sweep(backtester, signals, stop_losses, take_profits, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{n_bars} bougies, {int(signals.sum())} signaux, {len(results)} combinaisons :")
+    print(f"  tables creuses            {build:8.2f} s")
+    print(f"  balayage                  {elapsed:8.2f} s ({len(results) / elapsed:.1f} combinaisons/s)")
+    print(results.head())
+    return {"build_s": build, "sweep_s": elapsed, "combinations": len(results)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bars", type=int, default=2_000_000)
+    parser.add_argument("--grid", type=int, default=10, help="Valeurs par paramètre (grille grid x grid).")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.bars, args.grid, args.workers)
@@ -0,0 +1,69 @@
+"""
+Compare la latence par appel (p50/p99) des différents chemins d'inférence du modèle LSTM.
+
+Usage : python -m benchmarks.bench_inference --model models/lstm_model.keras --calls 500
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from app.analysis.lstm_model import build_inference_fn, export_inference_artifact, load_inference_artifact
+
+
+def measure_latency(predict_fn, X, calls, warmup=20):
+    """
+    Mesure la latence de `predict_fn(X)` sur plusieurs appels.
+    :return: Dictionnaire avec p50, p99 et moyenne en millisecondes.
+    """
+    for _ in range(warmup):
+        predict_fn(X)
+    timings = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        predict_fn(X)
+        timings[i] = time.perf_counter() - start
+    timings *= 1000
+    return {
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "mean_ms": float(timings.mean()),
+    }
+
+
+def run(model_path, calls=500, batch_size=1):
+    model = tf.keras.models.load_model(model_path)
+    X = np.random.default_rng(0).random((batch_size,) + tuple(model.input_shape[1:]), dtype=np.float32)
+
+    paths = {
+        "keras_predict": lambda x: model.predict(x, verbose=0),
+        "keras_call": lambda x: model(x, training=False).numpy(),
+        "tf_function": build_inference_fn(model),
+    }
+    with tempfile.TemporaryDirectory() as export_dir:
+        export_inference_artifact(model, export_dir)
+        paths["saved_model"] = load_inference_artifact(export_dir)
+
+        results = {}
+        for name, predict_fn in paths.items():
+            results[name] = measure_latency(predict_fn, X, calls)
+
+    baseline = results["keras_predict"]["p50_ms"]
+    print(f"\nLatence par appel (batch={batch_size}, {calls} appels) :")
+    for name, r in results.items():
+        print(
+            f"  {name:<14} p50={r['p50_ms']:8.3f} ms  p99={r['p99_ms']:8.3f} ms  "
+            f"(x{baseline / r['p50_ms']:.1f} vs predict)"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="models/lstm_model.keras")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+    run(args.model, calls=args.calls, batch_size=args.batch_size)
@@ -0,0 +1,30 @@
+"""
+Mesure le débit du carnet d'ordres local en rejouant un enregistrement synthétique de messages de profondeur.
+
+Usage : python -m benchmarks.bench_order_book --events 200000 --levels 5000
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from app.streaming.local_order_book import replay_depth_file
+from benchmarks.synthetic import synthetic_depth_messages
+
+
+def run(n_events, n_levels):
+    messages = synthetic_depth_messages(n_events, n_levels)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "depth.jsonl")
+        with open(path, "w") as f:
+            for message in messages:
+                f.write(json.dumps(message) + "\n")
+        return replay_depth_file(path, "SYNTHETIC")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--levels", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.events, args.levels)
@@ -0,0 +1,56 @@
+"""
+Compare le temps de chargement des clôtures depuis un CSV (pd.read_csv) et depuis le stockage binaire mappé.
+
+Usage : python -m benchmarks.bench_store --bars 2000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from app.storage.column_store import KLINE_SCHEMA, MarketDataStore
+from benchmarks.synthetic import synthetic_klines
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(n_bars):
+    df = synthetic_klines(n_bars)[list(KLINE_SCHEMA)]
+    with tempfile.TemporaryDirectory() as folder:
+        csv_path = os.path.join(folder, "historical_data_BTCUSDT.csv")
+        df.to_csv(csv_path, index=False)
+        store = MarketDataStore(os.path.join(folder, "store"))
+        store.append_klines("BTCUSDT", "1m", df)
+
+        csv_full, _ = timed(lambda: pd.read_csv(csv_path))
+        csv_close, _ = timed(lambda: pd.read_csv(csv_path, usecols=["close"])["close"].to_numpy())
+        # La somme force la lecture effective des pages mappées
+        store_close, _ = timed(lambda: float(store.close_series("BTCUSDT", "1m").sum()))
+        middle = int(df["timestamp"].iloc[n_bars // 2])
+        store_range, _ = timed(lambda: float(store.close_series("BTCUSDT", "1m", middle, middle + 86_400_000).sum()))
+
+        csv_size = os.path.getsize(csv_path)
+        store_size = sum(os.path.getsize(os.path.join(folder, "store", "BTCUSDT", "1m", f"{c}.bin"))
+                         for c in df.columns)
+
+    print(f"Chargement de {n_bars} bougies :")
+    print(f"  pd.read_csv (toutes colonnes)   {csv_full * 1000:9.1f} ms")
+    print(f"  pd.read_csv (close)             {csv_close * 1000:9.1f} ms")
+    print(f"  stockage binaire (close)        {store_close * 1000:9.1f} ms")
+    print(f"  stockage binaire (1 jour)       {store_range * 1000:9.3f} ms")
+    print(f"  Taille disque : CSV {csv_size / 1e6:.1f} Mo, binaire {store_size / 1e6:.1f} Mo")
+    return {"csv_full_s": csv_full, "csv_close_s": csv_close, "store_close_s": store_close,
+            "store_range_s": store_range, "csv_bytes": csv_size, "store_bytes": store_size}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bars", type=int, default=2_000_000)
+    args = parser.parse_args()
+    run(args.bars)
@@ -0,0 +1,157 @@
+"""
+Clients hors ligne pour les benchmarks : Binance, Reddit (praw) et flux RSS sont remplacés par des
+objets servant des données synthétiques, et toute connexion réseau non locale est refusée.
+"""
+import json
+import socket
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from benchmarks import synthetic
+
+
+class OfflineError(RuntimeError):
+    """Connexion réseau tentée pendant un benchmark hors ligne."""
+
+
+@contextmanager
+def offline():
+    """Refuse toute connexion sortante (hors boucle locale) pendant le bloc."""
+    connect = socket.socket.connect
+
+    def guarded_connect(sock, address):
+        host = address[0] if isinstance(address, tuple) else address
+        if isinstance(host, str) and host not in ("127.0.0.1", "::1", "localhost") and sock.family != socket.AF_UNIX:
+            raise OfflineError(f"Connexion réseau interdite pendant le benchmark : {address}")
+        return connect(sock, address)
+
+    with mock.patch.object(socket.socket, "connect", guarded_connect):
+        yield
+
+
+class StubBinanceClient:
+    """
+    Client Binance hors ligne (interface de BinanceRestClient) servant des données synthétiques :
+    les bougies sont générées une fois puis découpées par plage, comme l'API.
+    """
+
+    weight_budget = None  # Pas de limitation de débit hors ligne
+
+    def __init__(self, n_bars=1000, n_trades=500, n_levels=100, interval_ms=60_000, seed=0):
+        self.klines = synthetic.synthetic_klines(n_bars, seed, interval_ms)
+        self.timestamps = self.klines["timestamp"].to_numpy()
+        self.rows = synthetic.binance_kline_rows(self.klines)
+        self.trades = synthetic.aggregate_trade_rows(synthetic.synthetic_trades(n_trades, seed))
+        self.depth = synthetic.order_book_snapshot(n_levels, seed)
+        self.funding = synthetic.funding_rate_rows(1000, seed)
+        self.liquidations = synthetic.liquidation_rows(100, seed)
+        self.calls = 0
+
+    def get_klines(self, symbol, interval, startTime=None, endTime=None, limit=500, **kwargs):
+        self.calls += 1
+        start = 0 if startTime is None else np.searchsorted(self.timestamps, startTime)
+        end = len(self.rows) if endTime is None else np.searchsorted(self.timestamps, endTime, side="right")
+        return self.rows[start:min(end, start + limit)]
+
+    def get_order_book(self, symbol, limit=100, **kwargs):
+        self.calls += 1
+        return {"lastUpdateId": self.depth["lastUpdateId"],
+                "bids": self.depth["bids"][:limit], "asks": self.depth["asks"][:limit]}
+
+    def get_aggregate_trades(self, symbol, limit=500, **kwargs):
+        self.calls += 1
+        return self.trades[-limit:]
+
+    def futures_funding_rate(self, symbol, limit=1000, **kwargs):
+        self.calls += 1
+        return self.funding[-limit:]
+
+    def futures_liquidation_orders(self, symbol, limit=50, **kwargs):
+        self.calls += 1
+        return self.liquidations[-limit:]
+
+    def get_symbol_ticker(self, symbol, **kwargs):
+        return {"symbol": symbol, "price": str(self.klines["close"].iloc[-1])}
+
+
+class StubResponse:
+    """Réponse HTTP minimale (interface de requests.Response utilisée par le projet)."""
+
+    def __init__(self, payload=None, status_code=200, headers=None):
+        self._content = json.dumps(payload).encode() if payload is not None else b""
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self._content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code}", response=self)
+
+
+class StubFeedSession:
+    """
+    Session HTTP servant un flux JSON synthétique, avec validateurs ETag :
+    une requête conditionnelle sur un flux inchangé reçoit 304, comme avec un vrai serveur.
+    """
+
+    def __init__(self, n_items=100, seed=0):
+        self.payload = synthetic.rss_feed(n_items, seed)
+        self.etag = f'"{n_items}-{seed}"'
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        self.requests += 1
+        if headers and headers.get("If-None-Match") == self.etag:
+            return StubResponse(status_code=304, headers={"ETag": self.etag})
+        return StubResponse(self.payload, headers={"ETag": self.etag})
+
+
+class StubReddit:
+    """Remplace praw.Reddit : `reddit.subreddit(nom).new(limit)` / `.hot(limit)` retournent des posts synthétiques."""
+
+    def __init__(self, n_posts=100, seed=0):
+        self.posts = [SimpleNamespace(**post) for post in synthetic.reddit_posts(n_posts, seed)]
+
+    def subreddit(self, name):
+        posts = self.posts
+        return SimpleNamespace(new=lambda limit=100: iter(posts[:limit]), hot=lambda limit=100: iter(posts[:limit]))
+
+
+@contextmanager
+def stubbed_services(binance=None, feed_session=None, reddit=None):
+    """
+    Installe les clients hors ligne à la place des clients réels utilisés par les fetchers :
+    `get_client()` (Binance), `requests.get` et la session partagée des flux, et `praw.Reddit`.
+    Les clients peuvent être remplacés pendant le bloc (ex. `services.binance = StubBinanceClient(n_bars=10**6)`).
+    :return: Espace de noms {binance, feed_session, reddit} des clients installés.
+    """
+    import requests
+
+    import app.analysis.fetch_historical_data as fetch_historical_data
+    from app.analysis import binance_client, ingestion
+
+    services = SimpleNamespace(binance=binance or StubBinanceClient(), feed_session=feed_session or StubFeedSession(),
+                               reddit=reddit or StubReddit())
+    get_client = lambda: services.binance  # noqa: E731
+    patches = [
+        mock.patch.object(binance_client, "get_client", get_client),
+        # Les modules qui ont importé get_client directement utilisent aussi le client hors ligne
+        mock.patch.object(fetch_historical_data, "get_client", get_client),
+        mock.patch.object(ingestion, "get_session", lambda: services.feed_session),
+        mock.patch.object(requests, "get", lambda *args, **kwargs: services.feed_session.get(*args, **kwargs)),
+        mock.patch.dict("sys.modules", {"praw": SimpleNamespace(Reddit=lambda **kwargs: services.reddit)}),
+    ]
+    with offline():
+        for patch in patches:
+            patch.start()
+        try:
+            yield services
+        finally:
+            for patch in reversed(patches):
+                patch.stop()
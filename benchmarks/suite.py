@@ -0,0 +1,472 @@
+"""
+Suite de benchmarks reproductible des chemins critiques, hors ligne, sur données synthétiques.
+
+Chaque cas est exécuté dans un sous-processus séparé (mémoire de pointe isolée) pour chaque taille ;
+les résultats (temps, débit, RSS de pointe, commit) sont écrits en JSON et comparables entre commits.
+
+Usage :
+  python -m benchmarks.suite run --sizes 1k,100k,1M [--cases prepare_data,backtest] [--output fichier.json]
+  python -m benchmarks.suite compare benchmarks/results/<avant>.json benchmarks/results/<après>.json
+  python -m benchmarks.suite list
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import synthetic
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_SIZES = "1k,100k"
+SEQUENCE_LENGTH = 50
+
+CASES = {}
+
+
+class SkipCase(Exception):
+    """Cas non exécutable dans cet environnement (dépendance absente, taille hors limite)."""
+
+
+def case(name, unit, max_size=None):
+    """
+    Enregistre un cas. La fonction décorée reçoit (taille, dossier temporaire, clients hors ligne de
+    stubs.stubbed_services), prépare les données (non chronométré) et retourne
+    (fonction chronométrée, nombre d'éléments traités par appel).
+    """
+    def register(setup):
+        CASES[name] = {"setup": setup, "unit": unit, "max_size": max_size, "doc": (setup.__doc__ or "").strip()}
+        return setup
+    return register
+
+
+def parse_size(text):
+    """"1k" -> 1000, "2.5M" -> 2500000."""
+    text = text.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+# --- Cas ---
+
+@case("prepare_data", "barres")
+def _prepare_data(size, folder, services):
+    """data_preparation.prepare_data : lecture CSV, normalisation et fenêtres de 50 bougies."""
+    from app.analysis.data_preparation import prepare_data
+
+    synthetic.synthetic_klines(size).to_csv(os.path.join(folder, "historical_data_BTCUSDT.csv"), index=False)
+    return lambda: prepare_data(folder, sequence_length=SEQUENCE_LENGTH), size
+
+
+@case("technical_indicators", "barres", max_size=1_000_000)
+def _technical_indicators(size, folder, services):
+    """TechnicalIndicators (pandas_ta) : RSI + MACD sur une paire."""
+    try:
+        from app.analysis.technical_indicators import TechnicalIndicators
+    except ImportError as e:
+        raise SkipCase(str(e))
+    prices = synthetic.random_walk(size).tolist()
+
+    def run():
+        TechnicalIndicators.calculate_rsi(prices)
+        TechnicalIndicators.calculate_macd(prices)
+    return run, size
+
+
+@case("batch_indicators", "barres")
+def _batch_indicators(size, folder, services):
+    """BatchIndicators : RSI + MACD vectorisés sur 10 paires."""
+    from app.analysis.batch_indicators import BatchIndicators
+
+    prices = np.stack([synthetic.random_walk(max(size // 10, 1), seed) for seed in range(10)])
+
+    def run():
+        BatchIndicators.rsi(prices)
+        BatchIndicators.macd(prices)
+    return run, prices.size
+
+
+def _lstm_windows(size):
+    from app.analysis.data_preparation import make_windows, normalize_series
+
+    series, _ = normalize_series(synthetic.random_walk(size + SEQUENCE_LENGTH).astype(np.float32))
+    X, _ = make_windows(series, SEQUENCE_LENGTH)
+    return np.ascontiguousarray(X)
+
+
+@case("lstm_predict", "fenêtres", max_size=1_000_000)
+def _lstm_predict(size, folder, services):
+    """LSTMModel.predict (model.predict Keras) sur des fenêtres de 50 clôtures."""
+    from app.analysis.lstm_model import LSTMModel
+
+    model, X = LSTMModel(SEQUENCE_LENGTH), _lstm_windows(size)
+    model.predict(X[:32])  # Préchauffage (traçage du graphe)
+    return lambda: model.predict(X), len(X)
+
+
+@case("lstm_predict_fast", "fenêtres", max_size=1_000_000)
+def _lstm_predict_fast(size, folder, services):
+    """LSTMModel.predict_fast (graphe compilé) sur des fenêtres de 50 clôtures, par lots de 1024."""
+    from app.analysis.lstm_model import LSTMModel
+
+    model, X = LSTMModel(SEQUENCE_LENGTH), _lstm_windows(size)
+    model.predict_fast(X[:1024])
+
+    def run():
+        for start in range(0, len(X), 1024):
+            model.predict_fast(X[start:start + 1024])
+    return run, len(X)
+
+
+@case("fetch_klines", "barres")
+def _fetch_klines(size, folder, services):
+    """kline_downloader : téléchargement parallèle (client Binance hors ligne), partitions Parquet et relecture."""
+    import pandas as pd
+
+    from app.analysis.kline_downloader import download_klines, load_klines
+    from benchmarks.stubs import StubBinanceClient
+
+    client = StubBinanceClient(n_bars=size)
+    start_time = pd.Timestamp(synthetic.START_MS, unit="ms").strftime("%Y-%m-%d %H:%M:%S")
+    end_ms = synthetic.START_MS + size * 60_000
+
+    def run():
+        with tempfile.TemporaryDirectory(dir=folder) as root:
+            download_klines(client, "BTCUSDT", "1m", start_time=start_time, end_ms=end_ms, root=root)
+            return load_klines("BTCUSDT", "1m", root=root)
+    return run, size
+
+
+@case("fetch_streams", "trades")
+def _fetch_streams(size, folder, services):
+    """fetch_historical_data : carnet d'ordres, trades agrégés, financement et liquidations (client hors ligne)."""
+    from app.analysis import fetch_historical_data as fetchers
+    from benchmarks.stubs import StubBinanceClient
+
+    services.binance = StubBinanceClient(n_bars=1, n_trades=size, n_levels=5000)
+
+    def run():
+        fetchers.fetch_order_book("BTCUSDT", limit=5000)
+        fetchers.fetch_aggregate_trades("BTCUSDT", limit=size)
+        fetchers.fetch_funding_rate("BTCUSDT")
+        fetchers.fetch_liquidations("BTCUSDT")
+    return run, size
+
+
+@case("ingest_feed", "articles", max_size=1_000_000)
+def _ingest_feed(size, folder, services):
+    """ingestion.ingest_feed : analyse du flux JSON et insertion des nouveaux articles (SQLite)."""
+    from app.analysis.ingestion import IngestionStore, ingest_feed
+    from benchmarks.stubs import StubFeedSession
+
+    services.feed_session = StubFeedSession(size)
+
+    def run():
+        with tempfile.TemporaryDirectory(dir=folder) as root:
+            store = IngestionStore(os.path.join(root, "ingestion.sqlite"))
+            ingest_feed("https://example.com/feed.json", store)
+            store.close()
+    return run, size
+
+
+@case("fetch_rss_feed", "articles", max_size=1_000_000)
+def _fetch_rss_feed(size, folder, services):
+    """fetch_coinmarketcap_news.fetch_rss_feed : requête (flux hors ligne) et extraction des articles."""
+    from app.analysis.fetch_coinmarketcap_news import fetch_rss_feed
+    from benchmarks.stubs import StubFeedSession
+
+    services.feed_session = StubFeedSession(size)
+    return fetch_rss_feed, size
+
+
+@case("ingest_reddit", "posts", max_size=1_000_000)
+def _ingest_reddit(size, folder, services):
+    """ingestion.ingest_reddit : lecture des posts (praw hors ligne) et insertion (SQLite)."""
+    from app.analysis.ingestion import IngestionStore, ingest_reddit
+    from benchmarks.stubs import StubReddit
+
+    services.reddit = StubReddit(size)
+
+    def run():
+        with tempfile.TemporaryDirectory(dir=folder) as root:
+            store = IngestionStore(os.path.join(root, "ingestion.sqlite"))
+            ingest_reddit(store, limit=size)  # praw.Reddit remplacé par le client hors ligne
+            store.close()
+    return run, size
+
+
+@case("sentiment", "textes", max_size=1_000_000)
+def _sentiment(size, folder, services):
+    """analyze_social_data.score_texts : scores VADER (un processus, sans cache)."""
+    try:
+        import vaderSentiment  # noqa: F401
+    except ImportError as e:
+        raise SkipCase(str(e))
+    from app.analysis.analyze_social_data import score_texts
+
+    texts = [f"{title} #{i}" for i, title in enumerate(synthetic.synthetic_headlines(size))]
+    return lambda: score_texts(texts, workers=1), size
+
+
+@case("candle_aggregator", "trades")
+def _candle_aggregator(size, folder, services):
+    """CandleAggregator.on_trade_message : agrégation de messages de trade en bougies 1s."""
+    from app.streaming.candle_aggregator import CandleAggregator
+
+    messages = synthetic.trade_messages(synthetic.synthetic_trades(size))
+
+    def run():
+        aggregator = CandleAggregator(["BTCUSDT"], interval="1s")
+        for message in messages:
+            aggregator.on_trade_message(message)
+    return run, size
+
+
+@case("order_book", "événements", max_size=1_000_000)
+def _order_book(size, folder, services):
+    """LocalOrderBook : snapshot de 5000 niveaux puis événements diff-depth."""
+    from app.streaming.local_order_book import LocalOrderBook
+
+    messages = synthetic.synthetic_depth_messages(size, n_levels=5000)
+
+    def run():
+        book = LocalOrderBook("BTCUSDT")
+        book.apply_snapshot(messages[0])
+        for message in messages[1:]:
+            book.on_depth_event(message)
+    return run, size
+
+
+@case("column_store", "barres")
+def _column_store(size, folder, services):
+    """MarketDataStore : ajout de bougies puis lecture mappée des clôtures."""
+    from app.storage.column_store import KLINE_SCHEMA, MarketDataStore
+
+    df = synthetic.synthetic_klines(size)[list(KLINE_SCHEMA)]
+
+    def run():
+        with tempfile.TemporaryDirectory(dir=folder) as root:
+            store = MarketDataStore(root)
+            store.append_klines("BTCUSDT", "1m", df)
+            return float(store.close_series("BTCUSDT", "1m").sum())
+    return run, size
+
+
+@case("feature_pipeline", "barres")
+def _feature_pipeline(size, folder, services):
+    """feature_pipeline.build_feature_matrix : sentiment aligné sur les bougies (un événement pour 10 bougies)."""
+    from app.analysis.feature_pipeline import build_feature_matrix
+
+    bars = synthetic.synthetic_klines(size)[["timestamp", "close"]]
+    rng = np.random.default_rng(0)
+    n_events = max(size // 10, 1)
+    events = (np.sort(rng.integers(synthetic.START_MS, synthetic.START_MS + size * 60_000, n_events)),
+              rng.uniform(-1, 1, n_events))
+    return lambda: build_feature_matrix(bars, 60_000, {"social": events, "news": events}), size
+
+
+@case("backtest", "barres")
+def _backtest(size, folder, services):
+    """Backtester : tables creuses et une stratégie SL/TP (un signal pour 100 bougies)."""
+    from app.decision.backtest import Backtester
+
+    bars = synthetic.synthetic_klines(size)
+    signals = np.random.default_rng(1).random(size) < 0.01
+
+    def run():
+        backtester = Backtester(bars["high"], bars["low"], bars["close"], max_holding=1440)
+        return backtester.run(signals, 2.0, 4.0)
+    return run, size
+
+
+# --- Exécution ---
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Ko sous Linux
+
+
+def run_in_process(name, size, repeat):
+    """Exécute un cas dans le processus courant (sous-processus lancé par `run`). :return: Résultat (dictionnaire)."""
+    spec = CASES[name]
+    result = {"case": name, "size": size, "unit": spec["unit"]}
+    if spec["max_size"] is not None and size > spec["max_size"]:
+        return {**result, "skipped": f"taille > {spec['max_size']}"}
+
+    from benchmarks.stubs import stubbed_services
+
+    with stubbed_services() as services, tempfile.TemporaryDirectory() as folder, \
+            contextlib.redirect_stdout(io.StringIO()):
+        try:
+            start = time.perf_counter()
+            func, items = spec["setup"](size, folder, services)
+            setup_s = time.perf_counter() - start
+        except SkipCase as e:
+            return {**result, "skipped": str(e)}
+        setup_rss = _peak_rss_mb()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    return {
+        **result,
+        "items": items,
+        "repeat": repeat,
+        "setup_s": setup_s,
+        "median_s": median,
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "throughput_per_s": items / median if median > 0 else None,
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def environment():
+    """Commit, versions et machine : de quoi comparer deux exécutions en connaissance de cause."""
+    import pandas as pd
+
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, timeout=30,
+                                  cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(cases, sizes, repeat=3, output=None, timeout=3600):
+    """
+    Exécute chaque cas pour chaque taille dans un sous-processus et écrit les résultats en JSON.
+    :return: Chemin du fichier de résultats.
+    """
+    meta = environment()
+    results = []
+    for name in cases:
+        for size in sizes:
+            command = [sys.executable, "-m", "benchmarks.suite", "_child", name, str(size), "--repeat", str(repeat)]
+            try:
+                completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout,
+                                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                lines = completed.stdout.strip().splitlines()
+                result = json.loads(lines[-1]) if completed.returncode == 0 and lines else {
+                    "case": name, "size": size, "error": (completed.stderr.strip().splitlines() or ["?"])[-1]}
+            except subprocess.TimeoutExpired:
+                result = {"case": name, "size": size, "error": f"délai dépassé ({timeout} s)"}
+            results.append(result)
+            print(format_result(result), flush=True)
+
+    output = output or os.path.join(RESULTS_DIR, f"{meta['commit'] or 'local'}{'-dirty' if meta['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"Résultats écrits dans {output}")
+    return output
+
+
+def format_result(result):
+    label = f"{result['case']:<22} {result['size']:>10}"
+    if "skipped" in result:
+        return f"{label}  ignoré ({result['skipped']})"
+    if "error" in result:
+        return f"{label}  ERREUR : {result['error']}"
+    return (f"{label}  {result['median_s'] * 1000:10.1f} ms  {result['throughput_per_s']:14,.0f} {result['unit']}/s"
+            f"  RSS {result['peak_rss_mb']:8.1f} Mo (données {result['setup_rss_mb']:.1f} Mo)")
+
+
+def compare(base_path, new_path, threshold=0.10):
+    """
+    Compare deux fichiers de résultats (temps médian et RSS de pointe par cas et par taille).
+    :param threshold: Ralentissement relatif au-delà duquel un cas est signalé comme régression.
+    :return: Liste des régressions (cas, taille, rapport).
+    """
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    baseline = {(r["case"], r["size"]): r for r in base["results"] if "median_s" in r}
+
+    print(f"Référence : {base['meta']['commit']} ({base['meta']['date']})  ->  "
+          f"{new['meta']['commit']} ({new['meta']['date']})")
+    regressions = []
+    for result in new["results"]:
+        before = baseline.get((result["case"], result["size"]))
+        if before is None or "median_s" not in result:
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        rss_delta = result["peak_rss_mb"] - before["peak_rss_mb"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  RÉGRESSION"
+            regressions.append((result["case"], result["size"], ratio))
+        elif ratio < 1 - threshold:
+            flag = "  amélioration"
+        print(f"{result['case']:<22} {result['size']:>10}  {before['median_s'] * 1000:10.1f} ms -> "
+              f"{result['median_s'] * 1000:10.1f} ms  x{ratio:5.2f}  RSS {rss_delta:+8.1f} Mo{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Exécute la suite et écrit les résultats en JSON.")
+    run.add_argument("--cases", default="all", help="Cas séparés par des virgules (voir `list`).")
+    run.add_argument("--sizes", default=DEFAULT_SIZES, help="Tailles séparées par des virgules (1k à 10M).")
+    run.add_argument("--repeat", type=int, default=3, help="Répétitions chronométrées (médiane retenue).")
+    run.add_argument("--output", help="Fichier de résultats (par défaut benchmarks/results/<commit>.json).")
+    run.add_argument("--timeout", type=float, default=3600, help="Durée maximale d'un cas (secondes).")
+
+    diff = subparsers.add_parser("compare", help="Compare deux fichiers de résultats.")
+    diff.add_argument("base")
+    diff.add_argument("new")
+    diff.add_argument("--threshold", type=float, default=0.10, help="Ralentissement relatif toléré (0.10 = 10 %).")
+
+    subparsers.add_parser("list", help="Liste les cas disponibles.")
+
+    child = subparsers.add_parser("_child")  # Usage interne : un cas, une taille
+    child.add_argument("case")
+    child.add_argument("size", type=int)
+    child.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        for name, spec in CASES.items():
+            print(f"{name:<22} {spec['doc']}")
+    elif args.command == "_child":
+        print(json.dumps(run_in_process(args.case, args.size, args.repeat)))
+    elif args.command == "compare":
+        if compare(args.base, args.new, args.threshold):
+            sys.exit(1)
+    else:
+        cases = list(CASES) if args.cases == "all" else [name.strip() for name in args.cases.split(",")]
+        unknown = [name for name in cases if name not in CASES]
+        if unknown:
+            parser.error(f"cas inconnus : {', '.join(unknown)}")
+        run_suite(cases, [parse_size(size) for size in args.sizes.split(",")], args.repeat, args.output, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
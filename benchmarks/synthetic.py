@@ -0,0 +1,163 @@
+"""
+Générateurs de données de marché synthétiques et reproductibles (graine fixe) pour les benchmarks :
+bougies OHLCV, trades, carnet d'ordres, et réponses brutes Binance / Reddit / flux RSS.
+"""
+import numpy as np
+import pandas as pd
+
+START_MS = 1_600_000_000_000
+
+
+def random_walk(n, seed=0, start=100.0, volatility=1e-3):
+    """Prix positifs générés par marche aléatoire géométrique."""
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0.0, volatility, n)))
+
+
+def synthetic_klines(n_bars, seed=0, interval_ms=60_000, start_ms=START_MS):
+    """DataFrame de bougies synthétiques (marche aléatoire) au format de klines_to_frame."""
+    rng = np.random.default_rng(seed)
+    close = random_walk(n_bars, seed)
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0.0, 5e-4, (2, n_bars)))
+    volume = rng.lognormal(1.0, 1.0, n_bars)
+    timestamps = start_ms + interval_ms * np.arange(n_bars, dtype=np.int64)
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + spread[0]),
+        "low": np.minimum(open_, close) * (1 - spread[1]),
+        "close": close,
+        "volume": volume,
+        "close_time": timestamps + interval_ms - 1,
+        "quote_asset_volume": volume * close,
+        "number_of_trades": rng.poisson(50, n_bars).astype(np.int64),
+        "taker_buy_base_asset_volume": volume / 2,
+        "taker_buy_quote_asset_volume": volume * close / 2,
+    })
+
+
+def binance_kline_rows(df):
+    """Lignes brutes de GET /api/v3/klines (nombres en chaînes, comme l'API) à partir de synthetic_klines."""
+    rows = df.astype({column: str for column in df.columns if df[column].dtype == np.float64})
+    rows = rows.assign(ignore="0")
+    return rows.to_numpy().tolist()
+
+
+def synthetic_trades(n_trades, seed=0, start_ms=START_MS, trades_per_second=20.0):
+    """
+    Trades synthétiques : horodatages croissants (arrivées de Poisson), prix en marche aléatoire,
+    quantités log-normales.
+    :return: Dictionnaire de tableaux {timestamp, price, quantity, is_buyer_maker}.
+    """
+    rng = np.random.default_rng(seed)
+    gaps = rng.exponential(1000.0 / trades_per_second, n_trades)
+    return {
+        "timestamp": start_ms + np.cumsum(gaps).astype(np.int64),
+        "price": random_walk(n_trades, seed, volatility=1e-4),
+        "quantity": rng.lognormal(-1.0, 1.0, n_trades),
+        "is_buyer_maker": rng.random(n_trades) < 0.5,
+    }
+
+
+def trade_messages(trades, symbol="BTCUSDT"):
+    """Messages WebSocket de trade Binance ({"e": "trade", "s", "p", "q", "T", ...})."""
+    return [
+        {"e": "trade", "E": int(t), "s": symbol, "t": i, "p": f"{p:.8f}", "q": f"{q:.8f}", "T": int(t), "m": bool(m)}
+        for i, (t, p, q, m) in enumerate(zip(trades["timestamp"], trades["price"], trades["quantity"],
+                                             trades["is_buyer_maker"]))
+    ]
+
+
+def aggregate_trade_rows(trades):
+    """Réponse brute de GET /api/v3/aggTrades."""
+    return [
+        {"a": i, "p": f"{p:.8f}", "q": f"{q:.8f}", "f": i, "l": i, "T": int(t), "m": bool(m), "M": True}
+        for i, (t, p, q, m) in enumerate(zip(trades["timestamp"], trades["price"], trades["quantity"],
+                                             trades["is_buyer_maker"]))
+    ]
+
+
+def order_book_snapshot(n_levels, seed=0, mid=100.0, tick=0.01, last_update_id=1000):
+    """Réponse brute de GET /api/v3/depth avec `n_levels` niveaux de chaque côté."""
+    rng = np.random.default_rng(seed)
+    return {
+        "lastUpdateId": last_update_id,
+        "bids": [[f"{mid - tick * (i + 1):.2f}", f"{rng.random() * 5:.4f}"] for i in range(n_levels)],
+        "asks": [[f"{mid + tick * (i + 1):.2f}", f"{rng.random() * 5:.4f}"] for i in range(n_levels)],
+    }
+
+
+def synthetic_depth_messages(n_events, n_levels=5000, updates_per_event=10, tick=0.01, seed=0):
+    """
+    Snapshot initial suivi de `n_events` événements diff-depth, concentrés près du meilleur prix
+    (environ 10 % de suppressions), au format Binance.
+    """
+    rng = np.random.default_rng(seed)
+    mid = 100.0
+    messages = [order_book_snapshot(n_levels, seed, mid, tick)]
+    update_id = 990  # Les premiers événements chevauchent le snapshot, comme en production
+    for _ in range(n_events):
+        distances = np.minimum(rng.geometric(0.05, updates_per_event), n_levels)
+        quantities = np.where(rng.random(updates_per_event) < 0.1, 0.0, rng.random(updates_per_event) * 5)
+        is_bid = rng.random(updates_per_event) < 0.5
+        bids = [[f"{mid - tick * d:.2f}", f"{q:.4f}"] for d, q, b in zip(distances, quantities, is_bid) if b]
+        asks = [[f"{mid + tick * d:.2f}", f"{q:.4f}"] for d, q, b in zip(distances, quantities, is_bid) if not b]
+        messages.append({"e": "depthUpdate", "U": update_id + 1, "u": update_id + 3, "b": bids, "a": asks})
+        update_id += 3
+    return messages
+
+
+def funding_rate_rows(n, seed=0, start_ms=START_MS):
+    """Réponse brute de GET /fapi/v1/fundingRate (un taux toutes les 8 heures)."""
+    rng = np.random.default_rng(seed)
+    return [{"symbol": "BTCUSDT", "fundingTime": start_ms + i * 28_800_000, "fundingRate": f"{r:.8f}"}
+            for i, r in enumerate(rng.normal(1e-4, 1e-4, n))]
+
+
+def liquidation_rows(n, seed=0, start_ms=START_MS):
+    """Réponse brute de GET /fapi/v1/forceOrders."""
+    rng = np.random.default_rng(seed)
+    return [{"symbol": "BTCUSDT", "time": start_ms + i * 60_000, "price": f"{p:.2f}", "origQty": f"{q:.3f}",
+             "side": "SELL" if s else "BUY"}
+            for i, (p, q, s) in enumerate(zip(random_walk(n, seed), rng.lognormal(0, 1, n), rng.random(n) < 0.5))]
+
+
+WORDS = ("bitcoin", "ethereum", "pump", "dump", "bullish", "bearish", "crash", "moon", "great", "terrible",
+         "ETF", "regulation", "hack", "adoption", "rally", "sell-off", "whales", "halving", "record", "fear")
+
+
+def synthetic_headlines(n, seed=0, words_per_title=8):
+    """Titres pseudo-aléatoires tirés d'un vocabulaire crypto (avec des doublons, comme les vrais flux)."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(WORDS), (n, words_per_title))
+    return [" ".join(WORDS[i] for i in row).capitalize() for row in picks]
+
+
+def rss_feed(n_items, seed=0, start_ms=START_MS):
+    """Corps JSON d'un flux rss.app / politepol avec `n_items` articles, du plus récent au plus ancien."""
+    titles = synthetic_headlines(n_items, seed)
+    items = []
+    for i, title in enumerate(titles):
+        published = pd.Timestamp(start_ms + (n_items - i) * 60_000, unit="ms", tz="UTC")
+        items.append({
+            "id": f"item-{i}",
+            "title": title,
+            "url": f"https://example.com/news/{i}",
+            "link": f"https://example.com/news/{i}",
+            "description": f"<p>{title}. More &amp; more details.</p>",
+            "date_published": published.isoformat(),
+            "pubDate": published.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        })
+    return {"version": "https://jsonfeed.org/version/1.1", "items": items}
+
+
+def reddit_posts(n_posts, seed=0, start_ms=START_MS):
+    """Posts Reddit synthétiques (attributs de praw.models.Submission), du plus récent au plus ancien."""
+    rng = np.random.default_rng(seed)
+    titles = synthetic_headlines(n_posts, seed)
+    return [
+        {"id": f"t3_{i}", "title": title, "score": int(score), "num_comments": int(comments),
+         "created_utc": (start_ms / 1000) + (n_posts - i) * 60.0, "url": f"https://reddit.com/r/cryptocurrency/{i}"}
+        for i, (title, score, comments) in enumerate(zip(titles, rng.poisson(100, n_posts), rng.poisson(20, n_posts)))
+    ]
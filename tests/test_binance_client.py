@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.analysis.binance_client import BinanceAPIError, BinanceRestClient
+from app.analysis.kline_downloader import download_klines
+from benchmarks import synthetic
+
+
+class StubBinanceServer:
+    """
+    Serveur HTTP local imitant l'API Binance : chaque requête reçoit la prochaine réponse
+    programmée (statut, en-têtes, corps JSON), puis 200 avec les bougies synthétiques.
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.klines = synthetic.binance_kline_rows(synthetic.synthetic_klines(10))
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                status, headers, payload = server.responses.pop(0) if server.responses else (200, {}, server.klines)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = StubBinanceServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client(server):
+    client = BinanceRestClient(base_url=server.url, futures_url=server.url + "/futures", retries=3, backoff=0.01)
+    yield client
+    client.close()
+
+
+def test_used_weight_header_syncs_budget(server, client):
+    server.responses.append((200, {"X-MBX-USED-WEIGHT-1M": "1100"}, server.klines))
+
+    assert client.get_klines(symbol="BTCUSDT", interval="1m") == server.klines
+    assert client.weight_budget.tokens <= 1200 - 1100 + 1
+
+
+def test_429_waits_for_retry_after(server, client):
+    server.responses.append((429, {"Retry-After": "1"}, {"code": -1003, "msg": "Too many requests"}))
+
+    started = time.monotonic()
+    assert client.get_klines(symbol="BTCUSDT", interval="1m") == server.klines
+    assert time.monotonic() - started >= 1.0
+    assert len(server.requests) == 2
+
+
+def test_5xx_is_retried_then_raised(server, client):
+    server.responses += [(503, {}, {"code": -1001, "msg": "Internal error"})] * 2
+    assert client.get_klines(symbol="BTCUSDT", interval="1m") == server.klines
+    assert len(server.requests) == 3
+
+    server.requests.clear()
+    server.responses += [(502, {}, {})] * 3
+    with pytest.raises(BinanceAPIError) as error:
+        client.get_klines(symbol="BTCUSDT", interval="1m")
+    assert error.value.status_code == 502
+    assert len(server.requests) == 3
+
+
+def test_client_error_is_not_retried(server, client):
+    server.responses.append((400, {}, {"code": -1121, "msg": "Invalid symbol."}))
+
+    with pytest.raises(BinanceAPIError) as error:
+        client.get_klines(symbol="NOPE", interval="1m")
+    assert error.value.code == -1121
+    assert len(server.requests) == 1
+
+
+def test_signed_request_without_keys_is_refused(server, client):
+    with pytest.raises(ValueError, match="clés API"):
+        client.futures_liquidation_orders(symbol="BTCUSDT")
+    assert server.requests == []
+
+
+def test_chunk_download_relies_on_client_retries(server, client, tmp_path):
+    server.responses += [(500, {}, {})] * 10
+
+    with pytest.raises(BinanceAPIError):
+        # Une seule tranche de 1000 bougies
+        download_klines(client, "BTCUSDT", "1m", start_time="2019-12-31 19:20", end_ms=1_577_820_000_000 + 60_000_000,
+                        root=str(tmp_path), max_workers=1, retries=5)
+    assert len(server.requests) == client.retries  # Pas de seconde boucle de tentatives autour du client
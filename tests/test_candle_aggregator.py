@@ -0,0 +1,33 @@
+from app.streaming.candle_aggregator import CandleAggregator
+
+
+def _bar(bar):
+    return (int(bar["timestamp"]), float(bar["open"]), float(bar["high"]), float(bar["low"]), float(bar["close"]),
+            float(bar["volume"]), int(bar["trades"]))
+
+
+def test_bar_opened_by_flush_takes_ohlc_from_its_first_trade():
+    bars = []
+    aggregator = CandleAggregator(["BTCUSDT"], "1m", on_bar=lambda symbol, bar: bars.append(_bar(bar)))
+    aggregator.on_trade("BTCUSDT", 100.0, 1.0, 0)
+    aggregator.on_trade("BTCUSDT", 101.0, 1.0, 30_000)
+    assert aggregator.flush(60_000) == 1
+
+    aggregator.on_trade("BTCUSDT", 105.0, 2.0, 70_000)
+    aggregator.on_trade("BTCUSDT", 104.0, 1.0, 80_000)
+    aggregator.on_trade("BTCUSDT", 106.0, 1.0, 130_000)
+
+    assert bars == [
+        (0, 100.0, 101.0, 100.0, 101.0, 2.0, 2),
+        (60_000, 105.0, 105.0, 104.0, 104.0, 3.0, 2),  # Ni ouverture ni plus bas à l'ancienne clôture 101
+    ]
+
+
+def test_interval_without_trades_after_flush_is_flat_at_previous_close():
+    bars = []
+    aggregator = CandleAggregator(["BTCUSDT"], "1m", on_bar=lambda symbol, bar: bars.append(_bar(bar)))
+    aggregator.on_trade("BTCUSDT", 100.0, 1.0, 0)
+    aggregator.flush(60_000)
+    aggregator.flush(120_000)
+
+    assert bars[-1] == (60_000, 100.0, 100.0, 100.0, 100.0, 0.0, 0)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from app.analysis.data_preparation import prepare_data, prepare_data_from_store, prepare_new_data
+from app.storage.column_store import MarketDataStore
+
+
+def _klines(closes):
+    return pd.DataFrame({"timestamp": np.arange(len(closes), dtype=np.int64) * 60_000, "open": closes,
+                         "high": closes, "low": closes, "close": closes, "volume": 1.0})
+
+
+def test_store_windows_do_not_cross_symbols(tmp_path):
+    store = MarketDataStore(str(tmp_path))
+    store.append_klines("BTCUSDT", "1m", _klines(np.arange(10, 16, dtype=float)))
+    store.append_klines("ETHUSDT", "1m", _klines(np.arange(100, 105, dtype=float)))
+
+    X, y, scaler = prepare_data_from_store(["BTCUSDT", "ETHUSDT"], sequence_length=3, store_root=str(tmp_path))
+
+    def prices(values):
+        return np.round(scaler.inverse_transform(values.reshape(-1, 1)).ravel()).tolist()
+
+    assert len(X) == (6 - 3) + (5 - 3)
+    assert [prices(window) for window in X] == [[10, 11, 12], [11, 12, 13], [12, 13, 14],
+                                                [100, 101, 102], [101, 102, 103]]
+    assert prices(y) == [13, 14, 15, 103, 104]
+
+
+def test_prepare_data_shapes_and_new_files(tmp_path):
+    pd.DataFrame({"close": np.arange(10, dtype=float)}).to_csv(tmp_path / "a.csv", index=False)
+    pd.DataFrame({"close": np.arange(8, dtype=float)}).to_csv(tmp_path / "b.csv", index=False)
+
+    X, y, _ = prepare_data(str(tmp_path), sequence_length=3)
+    assert X.shape == ((10 - 3) + (8 - 3), 3, 1) and y.shape == (12, 1)
+
+    X, y, _, new_files = prepare_new_data(str(tmp_path), exclude_files=["a.csv"], sequence_length=3)
+    assert X.shape == (8 - 3, 3, 1)
+    assert new_files == [str(tmp_path / "b.csv")]
@@ -0,0 +1,149 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+import requests
+
+from app.analysis.ingestion import IngestionStore, ingest_feed, ingest_reddit
+from benchmarks import synthetic
+
+
+class FakeFeedServer:
+    """Serveur HTTP local servant un flux JSON avec validateur ETag (304 si inchangé)."""
+
+    def __init__(self, items):
+        self.items = items
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps({"items": server.items}).encode()
+                etag = f'"{hash(body)}"'
+                server.requests.append(dict(self.headers))
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/feed.json"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = IngestionStore(str(tmp_path / "ingestion.sqlite"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def feed():
+    server = FakeFeedServer(synthetic.rss_feed(5)["items"])
+    yield server
+    server.close()
+
+
+def test_feed_unchanged_returns_304(store, feed):
+    session = requests.Session()
+    assert len(ingest_feed(feed.url, store, session=session)) == 5
+
+    assert ingest_feed(feed.url, store, session=session) == []
+    assert feed.requests[-1]["If-None-Match"]
+    assert len(store.items(feed.url)) == 5
+
+
+def test_feed_deduplicates_and_keeps_backdated_items(store, feed):
+    session = requests.Session()
+    ingest_feed(feed.url, store, session=session)
+
+    backdated = dict(feed.items[-1], id="late-item", title="Article indexé en retard")
+    backdated["date_published"] = "2000-01-01T00:00:00+00:00"
+    feed.items = feed.items + [backdated]
+    added = ingest_feed(feed.url, store, session=session)
+
+    assert [item["item_id"] for item in added] == ["late-item"]
+    assert len(store.items(feed.url)) == 6
+
+
+class CountingReddit:
+    """Remplace praw.Reddit et compte les posts lus dans le listing `new`."""
+
+    def __init__(self, posts):
+        self.posts = posts
+        self.read = 0
+
+    def subreddit(self, name):
+        def new(limit=100):
+            # limit=None : praw pagine le listing jusqu'au bout
+            for post in self.posts[:limit]:
+                self.read += 1
+                yield SimpleNamespace(**post)
+
+        return SimpleNamespace(new=new)
+
+
+def test_reddit_stops_at_high_water(store):
+    posts = synthetic.reddit_posts(20)
+    reddit = CountingReddit(posts[5:])
+    first = ingest_reddit(store, reddit=reddit)
+    assert first["item_id"].tolist() == [post["id"] for post in posts[5:]]
+
+    reddit.posts, reddit.read = posts, 0
+    added = ingest_reddit(store, reddit=reddit)
+
+    assert len(added) == 5
+    assert reddit.read == 7  # Le post de la marque haute est relu, la lecture s'arrête au suivant
+    assert len(store.items("reddit/cryptocurrency")) == 20
+
+
+def test_reddit_reads_past_limit_until_high_water(store):
+    posts = synthetic.reddit_posts(50)
+    reddit = CountingReddit(posts[40:])
+    ingest_reddit(store, limit=10, reddit=reddit)
+
+    reddit.posts = posts
+    added = ingest_reddit(store, limit=10, reddit=reddit)
+
+    assert len(added) == 40  # Plus de `limit` posts publiés entre deux passages : aucun n'est perdu
+    assert len(store.items("reddit/cryptocurrency")) == 50
+
+
+def test_reddit_posts_in_the_same_second_as_high_water_are_kept(store):
+    posts = synthetic.reddit_posts(5)
+    reddit = CountingReddit(posts[1:])
+    ingest_reddit(store, reddit=reddit)
+
+    reddit.posts = [dict(posts[0], created_utc=posts[1]["created_utc"])] + posts[1:]
+    assert ingest_reddit(store, reddit=reddit)["item_id"].tolist() == [posts[0]["id"]]
+
+
+def test_reddit_csv_deduplicates_by_post_id(tmp_path):
+    pytest.importorskip("praw")
+    from app.analysis.fetch_reddit_data import save_reddit_to_csv
+
+    path = str(tmp_path / "reddit_data.csv")
+    rows = [{"item_id": "a", "title": "Même lien", "score": 1, "comments": 0, "created": "2024-01-01", "url": "u"}]
+    save_reddit_to_csv(pd.DataFrame(rows), path)
+    rows += [dict(rows[0], item_id="b")]
+    save_reddit_to_csv(pd.DataFrame(rows), path)
+
+    assert pd.read_csv(path)["item_id"].tolist() == ["a", "b"]
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from app.analysis.binance_client import BinanceAPIError
+from app.analysis.kline_downloader import (bar_open_ms, download_klines, existing_partitions, parse_start_time,
+                                           plan_chunks)
+from benchmarks import synthetic
+
+START_MS = 1_577_820_000_000
+CHUNK_MS = 60_000_000  # 1000 bougies 1m
+
+
+class FailingKlinesClient:
+    """Client sans budget propre : la tranche `fail_at` échoue, les suivantes sont lentes."""
+
+    def __init__(self, fail_at):
+        self.fail_at = fail_at
+        self.calls = []
+        self.lock = threading.Lock()
+        self.klines = synthetic.binance_kline_rows(synthetic.synthetic_klines(10))
+
+    def get_klines(self, startTime, **kwargs):
+        with self.lock:
+            self.calls.append(startTime)
+            index = len(self.calls) - 1
+        if self.fail_at is not None and index == self.fail_at:
+            raise BinanceAPIError(400, -1121, "Invalid symbol.")
+        if self.fail_at is not None and index > self.fail_at:
+            time.sleep(0.5)
+        return self.klines
+
+
+def test_weekly_bars_open_on_monday():
+    sunday = parse_start_time("2026-10-18 12:00")
+    assert bar_open_ms(sunday, "1w") == parse_start_time("2026-10-12")
+    assert bar_open_ms(sunday, "3d") % 259_200_000 == 0
+
+
+def test_monthly_chunks_follow_the_calendar():
+    start, end = parse_start_time("2020-02-15"), parse_start_time("2024-03-20")
+    end = bar_open_ms(end, "1M")
+
+    assert end == parse_start_time("2024-03-01")
+    assert plan_chunks(start, end, "1M") == [(parse_start_time("1970-01-01"), end)]
+    assert bar_open_ms(parse_start_time("2024-02-29 23:59"), "1M") == parse_start_time("2024-02-01")
+
+
+def test_start_time_in_milliseconds_is_kept():
+    assert parse_start_time(1_577_820_000_000) == 1_577_820_000_000
+
+
+def test_failed_chunk_cancels_pending_chunks_and_keeps_written_ones(tmp_path):
+    client = FailingKlinesClient(fail_at=1)
+    end_ms = START_MS + 5 * CHUNK_MS  # Cinq tranches
+
+    with pytest.raises(BinanceAPIError):
+        download_klines(client, "BTCUSDT", "1m", start_time=START_MS, end_ms=end_ms, root=str(tmp_path),
+                        max_workers=1, retries=1)
+    # Tranche 0 écrite, tranche 1 en échec, tranche 2 déjà commencée ; les deux dernières sont annulées
+    assert len(client.calls) == 3
+    assert sorted(existing_partitions("BTCUSDT", "1m", str(tmp_path))) == [START_MS, START_MS + 2 * CHUNK_MS]
+
+    # Reprise : seules les trois tranches manquantes sont téléchargées
+    assert download_klines(FailingKlinesClient(fail_at=None), "BTCUSDT", "1m", start_time=START_MS, end_ms=end_ms,
+                           root=str(tmp_path)) == 3
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.streaming.multi_symbol import MultiSymbolEngine
+from app.streaming.runtime import StreamRuntime
+
+
+def _last_price(X):
+    return X[:, -1, :]
+
+
+def _engine(**kwargs):
+    engine = MultiSymbolEngine(["BTCUSDT", "ETHUSDT"], _last_price, seq_length=3, **kwargs)
+    engine.prime("BTCUSDT", [1.0, 2.0, 3.0])
+    engine.prime("ETHUSDT", [10.0, 20.0, 30.0])
+    return engine
+
+
+def test_step_predicts_latest_window_and_counts_coalesced_ticks():
+    engine = _engine()
+    for price in (4.0, 5.0, 6.0):
+        engine.push("BTCUSDT", price)
+    engine.push("ETHUSDT", 40.0)
+
+    assert engine.step() == {"BTCUSDT": 6.0, "ETHUSDT": 40.0}
+    assert engine.step() == {}
+    stats = engine.stats()
+    assert (stats["coalesced"], stats["dropped"]) == (2, 0)
+    assert stats["symbols"]["BTCUSDT"]["coalesced"] == 2
+
+
+def test_stale_windows_are_skipped_and_counted_as_dropped():
+    engine = _engine(max_window_age=0.05)
+    engine.push("BTCUSDT", 4.0)
+    engine.push("BTCUSDT", 5.0)
+    time.sleep(0.1)
+    engine.push("ETHUSDT", 40.0)
+
+    assert engine.step() == {"ETHUSDT": 40.0}
+    assert engine.stats()["dropped"] == 2
+
+    engine.push("BTCUSDT", 6.0)  # Une nouvelle fenêtre fraîche est de nouveau prédite
+    assert engine.step() == {"BTCUSDT": 6.0}
+
+
+def test_runtime_coalesces_ticks_within_window_into_one_step():
+    engine = _engine()
+    runtime = StreamRuntime(lambda price: engine.push("BTCUSDT", price), engine.step, coalesce_window=0.2)
+
+    def start_streams(callback):
+        for price in range(4, 24):
+            callback(float(price))
+        return ["ws"]
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(runtime.run(start_streams, lambda clients: None), 0.5)
+
+    asyncio.run(run())
+    stats = engine.stats()
+    assert (stats["steps"], stats["predictions"], stats["coalesced"]) == (1, 1, 19)
+    assert np.isclose(engine.windows[0].latest(1)[0], 23.0)
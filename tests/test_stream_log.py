@@ -0,0 +1,36 @@
+import os
+
+from app.streaming.stream_log import StreamRecorder, read_stream_log
+
+
+def _trade(i):
+    return {"e": "trade", "s": "BTCUSDT", "p": f"{100 + i}.0", "q": "1.0", "T": i}
+
+
+def test_resume_after_crash_truncates_partial_record(tmp_path):
+    path = str(tmp_path / "session.bin")
+    with StreamRecorder(path) as recorder:
+        for i in range(5):
+            recorder.record(_trade(i), "BTCUSDT")
+    # Arrêt brutal pendant l'écriture du dernier message
+    os.truncate(path, os.path.getsize(path) - 3)
+
+    with StreamRecorder(path) as recorder:
+        for i in range(5, 10):
+            recorder.record(_trade(i), "BTCUSDT")
+        recorder.record(_trade(10), "ETHUSDT")
+
+    messages = list(read_stream_log(path))
+    assert [data["T"] for _, _, data in messages] == [0, 1, 2, 3, 5, 6, 7, 8, 9, 10]
+    assert [stream for _, stream, _ in messages] == ["BTCUSDT"] * 9 + ["ETHUSDT"]
+
+
+def test_resume_after_crash_in_header(tmp_path):
+    path = str(tmp_path / "session.bin")
+    with open(path, "wb") as f:
+        f.write(b"CSTR")
+
+    with StreamRecorder(path) as recorder:
+        recorder.record(_trade(0), "BTCUSDT")
+
+    assert [data["T"] for _, _, data in read_stream_log(path)] == [0]
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from app.storage.stream_tables import StreamStore, klines_columns, liquidations_columns, trades_columns
+
+
+def _trades(rows):
+    return pd.DataFrame([{"a": a, "T": t, "p": f"{100 + a}.0", "q": "1.0"} for a, t in rows])
+
+
+def test_overlapping_trade_fetches_keep_same_millisecond_trades(tmp_path):
+    store = StreamStore(str(tmp_path))
+    assert store.write("BTCUSDT", "trades", trades_columns(_trades([(1, 1000), (2, 1000), (3, 2000)]))) == 3
+
+    # Le second lot recouvre le premier et contient un trade de la même milliseconde que le dernier stocké
+    second = _trades([(2, 1000), (3, 2000), (4, 2000), (5, 3000)])
+    assert store.write("BTCUSDT", "trades", trades_columns(second)) == 2
+
+    trades = store.read("BTCUSDT", "trades")
+    assert trades["id"].tolist() == [1, 2, 3, 4, 5]
+    assert store.manifest("BTCUSDT")["trades"]["rows"] == 5
+
+
+def test_streams_without_id_deduplicate_whole_rows(tmp_path):
+    store = StreamStore(str(tmp_path))
+    liquidations = pd.DataFrame({"time": [1000, 2000], "price": ["10", "11"], "origQty": ["1", "2"],
+                                 "side": ["BUY", "SELL"]})
+    store.write("BTCUSDT", "liquidations", liquidations_columns(liquidations))
+
+    same_millisecond = pd.DataFrame({"time": [2000, 2000], "price": ["11", "12"], "origQty": ["2", "3"],
+                                     "side": ["SELL", "SELL"]})
+    assert store.write("BTCUSDT", "liquidations", liquidations_columns(same_millisecond)) == 1
+    assert store.read("BTCUSDT", "liquidations")["price"].tolist() == [10.0, 11.0, 12.0]
+
+
+def test_refetched_kline_at_last_timestamp_is_not_duplicated(tmp_path):
+    store = StreamStore(str(tmp_path))
+    bars = pd.DataFrame({"timestamp": pd.to_datetime([0, 60_000], unit="ms"), "open": 1.0, "high": 2.0, "low": 0.5,
+                         "close": [1.5, 1.6], "volume": [10.0, 3.0]})
+    store.write("BTCUSDT", "1m", klines_columns(bars))
+
+    # La dernière bougie, encore ouverte au premier appel, revient avec un volume mis à jour
+    refetched = bars.iloc[1:].assign(close=1.7, volume=5.0)
+    next_bar = bars.iloc[1:].assign(timestamp=pd.to_datetime([120_000], unit="ms"))
+    assert store.write("BTCUSDT", "1m", klines_columns(pd.concat([refetched, next_bar]))) == 1
+    assert store.read("BTCUSDT", "1m")["timestamp"].tolist() == [0, 60_000, 120_000]